@@ -0,0 +1,88 @@
+"""Time loading and editing a large website configuration.
+
+A config with N synthetic websites is loaded cold (YAML parse), warm (from
+the parsed config cache) and then edited: one update, and a batch of
+updates and removals saved once.
+
+Usage:
+    python -m benchmarks.config_load --sites 10000 --edits 1000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import yaml
+from src.utils.config import Config
+
+def build_config(sites: int) -> dict:
+    """Build a config document with synthetic websites."""
+    return {
+        'websites': [
+            {
+                'name': f"Site {index}",
+                'url': f"https://Site{index % 50}.example.org/careers/{index}#jobs",
+                'frequency': 'daily',
+                'content': {
+                    'selectors': ['.job-listing', "a[href*='vacancy']", '.content h2'],
+                    'exclude': ['.advertisement', '.footer']
+                },
+                'notification': {
+                    'threshold': {'added': 1, 'removed': 1, 'changed': 0.05},
+                    'email': {'to': '${DEFAULT_EMAIL_RECIPIENTS}'}
+                }
+            }
+            for index in range(sites)
+        ],
+        'email': {'service': 'gmail', 'from': '${GMAIL_FROM_EMAIL}'}
+    }
+
+def timed(label: str, action) -> None:
+    """Run an action and print how long it took."""
+    start = time.perf_counter()
+    action()
+    print(f"  {label:<28} {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+def main() -> None:
+    """Write a large config and time loading and editing it."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sites', type=int, default=10000, help='Websites in the config')
+    parser.add_argument('--edits', type=int, default=1000, help='Updates and removals in the batch')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        config_path = Path(work_dir) / 'websites.yml'
+        cache_dir = str(Path(work_dir) / 'cache')
+        config_path.write_text(yaml.safe_dump(build_config(args.sites), sort_keys=False), encoding='utf-8')
+        print(f"{args.sites} websites, {config_path.stat().st_size / 1e6:.1f} MB of YAML")
+        
+        timed('load (pure-Python YAML)', lambda: yaml.safe_load(config_path.read_text(encoding='utf-8')))
+        timed('load (cold, fills cache)', lambda: Config(str(config_path), cache_dir))
+        config = None
+        
+        def load_warm() -> None:
+            nonlocal config
+            config = Config(str(config_path), cache_dir)
+        
+        timed('load (cached)', load_warm)
+        middle = f"Site {args.sites // 2}"
+        timed('lookup by name x 10000', lambda: [config.get_website(middle) for _ in range(10000)])
+        timed(
+            'update one website',
+            lambda: config.update_website(middle, {**config.get_website(middle, raw=True), 'frequency': 'hourly'})
+        )
+        
+        def bulk_edit() -> None:
+            with config.batch():
+                for index in range(0, args.edits, 2):
+                    name = f"Site {index}"
+                    config.update_website(name, {**config.get_website(name, raw=True), 'frequency': 'weekly'})
+                for index in range(1, args.edits, 2):
+                    config.remove_website(f"Site {index}")
+        
+        timed(f"batch of {args.edits} edits", bulk_edit)
+        timed('reload after batch', lambda: Config(str(config_path), cache_dir))
+        print(f"  {len(Config(str(config_path), cache_dir).get_websites())} websites after the batch")
+
+if __name__ == '__main__':
+    main()
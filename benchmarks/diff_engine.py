@@ -0,0 +1,95 @@
+"""Compare the line-hash diff engine with the old set-based comparison.
+
+Each scenario edits a synthetic page of job listings. Both approaches are
+timed, and the changes they report are compared with the edits that were
+actually made: the set comparison can't see reordered or duplicated lines.
+
+Usage:
+    python -m benchmarks.diff_engine --lines 10000 50000 --repeat 3
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+from src.detector.diff_analyzer import analyze_changes
+
+def set_diff(previous_content: str, current_content: str) -> Dict:
+    """The comparison WebsiteMonitor used before the diff engine."""
+    prev_lines = set(previous_content.splitlines())
+    curr_lines = set(current_content.splitlines())
+    added = curr_lines - prev_lines
+    removed = prev_lines - curr_lines
+    total_lines = len(prev_lines | curr_lines)
+    changes = len(added) + len(removed)
+    return {
+        'added': list(added),
+        'removed': list(removed),
+        'moved': [],
+        'change_percentage': round((changes / total_lines * 100) if total_lines > 0 else 0, 2)
+    }
+
+def make_page(lines: int) -> List[str]:
+    """Build the lines of a synthetic career page, including repeated lines."""
+    page = []
+    for i in range(lines):
+        page.append(f"Position {i} - Officer, grade P{i % 5}, location {i % 17}" if i % 4 else 'Apply now')
+    return page
+
+def scenarios(lines: int, rng: random.Random) -> List[Tuple[str, List[str], List[str], str]]:
+    """Build (name, old lines, new lines, expected) scenarios."""
+    page = make_page(lines)
+    result = []
+    
+    edited = list(page)
+    for _ in range(10):
+        edited[rng.randrange(lines)] = f"Position closed {rng.random()}"
+    result.append(('10 edits', page, edited, '10 added, 10 removed'))
+    
+    reordered = list(page)
+    for _ in range(10):
+        reordered.insert(rng.randrange(lines), reordered.pop(rng.randrange(lines)))
+    result.append(('10 moves', page, reordered, '10 moved, nothing added'))
+    
+    duplicated = page + ['Apply now'] * 5
+    result.append(('5 repeated lines added', page, duplicated, '5 added'))
+    
+    appended = page + [f"New position {i}" for i in range(100)]
+    result.append(('100 lines appended', page, appended, '100 added'))
+    return result
+
+def best_of(repeat: int, func: Callable, *args) -> Tuple[float, Dict]:
+    """Run func repeat times and return the best time and the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def summary(result: Dict) -> str:
+    """Describe a diff result in a few words."""
+    return f"+{len(result['added'])} -{len(result['removed'])} ~{len(result['moved'])} ({result['change_percentage']}%)"
+
+def main() -> None:
+    """Time both approaches on every scenario."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 10000, 50000], help='Page sizes in lines')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario (best is reported)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the edits')
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    print(f"{'scenario':<26} {'lines':>7} {'set':>9} {'engine':>9}  {'set result':<24} {'engine result':<24} expected")
+    for lines in args.lines:
+        for name, old, new, expected in scenarios(lines, rng):
+            previous_content, current_content = '\n'.join(old), '\n'.join(new)
+            set_time, set_result = best_of(args.repeat, set_diff, previous_content, current_content)
+            engine_time, engine_result = best_of(args.repeat, analyze_changes, previous_content, current_content)
+            print(
+                f"{name:<26} {lines:>7} {set_time * 1000:7.1f}ms {engine_time * 1000:7.1f}ms  "
+                f"{summary(set_result):<24} {summary(engine_result):<24} {expected}"
+            )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""Drive the real WebsiteMonitor end to end against the local server.
+
+Every round the server changes a fraction of its pages and the monitor
+checks all sites. The first round stores the initial snapshots; later
+rounds go through conditional GETs, parsing, diffing and persistence.
+The report gives sites per second, p50/p99 latency of each stage and the
+peak RSS, and compares them with a stored baseline of the same scenario.
+
+Usage:
+    python -m benchmarks.end_to_end --sites 200 --rounds 5 --change-rate 0.2
+    python -m benchmarks.end_to_end --pages benchmarks/pages --save-baseline
+    python -m benchmarks.end_to_end --check  # exit 1 on a regression
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import yaml
+from .parse_backends import load_pages
+from .server import LocalSiteServer
+from src.monitor import WebsiteMonitor
+
+DEFAULT_BASELINES = 'benchmarks/baselines.json'
+
+SYNTHETIC_SELECTORS = ['.main-content h1', '.job-listing']
+SYNTHETIC_EXCLUDE = ['.location']
+
+# Stages timed by WebsiteMonitor, in pipeline order
+STAGES = ['check', 'fetch', 'dns', 'connect', 'ttfb', 'download', 'parse', 'match', 'diff', 'persist']
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Get a nearest-rank percentile.
+    
+    Args:
+        values: Samples
+        fraction: Percentile between 0 and 1
+    
+    Returns:
+        float: Percentile value, 0 without samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+def peak_rss_mib() -> Optional[float]:
+    """Get the peak resident set size of this process, None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def scenario_name(args: argparse.Namespace) -> str:
+    """Describe the benchmark parameters as a baseline key."""
+    pages = f"recorded-{Path(args.pages).name}" if args.pages else f"{args.sites}x{args.items}"
+    return (
+        f"{args.engine}-w{args.workers}-p{args.parse_workers}-{pages}-r{args.rounds}-"
+        f"c{args.change_rate}-l{args.latency}"
+    )
+
+def build_websites(server: LocalSiteServer, args: argparse.Namespace, recorded: List[Dict]) -> List[Dict[str, Any]]:
+    """Build the website configurations pointing at the local server."""
+    if recorded:
+        return [
+            {
+                'name': page['name'],
+                'url': server.recorded_url_for(f"p{index}"),
+                'content': {'selectors': list(page['plan'].selectors), 'exclude': list(page['plan'].exclude)}
+            }
+            for index, page in enumerate(recorded)
+        ]
+    return [
+        {
+            'name': f"Site {index}",
+            'url': server.url_for(index),
+            'content': {'selectors': SYNTHETIC_SELECTORS, 'exclude': SYNTHETIC_EXCLUDE}
+        }
+        for index in range(args.sites)
+    ]
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every round and collect the measurements.
+    
+    Returns:
+        Dict[str, Any]: Throughput, stage percentiles, peak RSS and check outcomes
+    """
+    recorded = load_pages(args.pages) if args.pages else []
+    pages = {f"p{index}": page['html'] for index, page in enumerate(recorded)}
+    timings: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[str, int] = defaultdict(int)
+    round_times = []
+    cwd = os.getcwd()
+    
+    with tempfile.TemporaryDirectory() as work_dir, LocalSiteServer(
+        latency=args.latency,
+        items=args.items,
+        change_rate=args.change_rate,
+        pages=pages,
+        seed=args.seed
+    ) as server:
+        websites = build_websites(server, args, recorded)
+        config_path = Path(work_dir) / 'websites.yml'
+        with open(config_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump({
+                'monitoring': {
+                    'engine': args.engine,
+                    'max_workers': args.workers,
+                    'per_domain_limit': args.workers,
+                    'max_in_flight': args.workers,
+                    'parse_workers': args.parse_workers,
+                    'rate_limit': {'requests_per_minute': 0}
+                },
+                'storage': {'path': str(Path(work_dir) / 'history.db')},
+                'websites': websites
+            }, f)
+        
+        # The monitor keeps its data directory relative to the working directory
+        os.chdir(work_dir)
+        monitor = WebsiteMonitor(str(config_path))
+        try:
+            for round_index in range(args.rounds):
+                if round_index:
+                    server.advance()
+                start = time.perf_counter()
+                if args.engine == 'async':
+                    asyncio.run(monitor.start_monitoring_async())
+                else:
+                    monitor.start_monitoring()
+                round_times.append(time.perf_counter() - start)
+                for stage, values in monitor.metrics.samples.items():
+                    timings[stage].extend(values)
+                for outcome, count in monitor.run_stats.items():
+                    outcomes[outcome] += count
+        finally:
+            monitor.close()
+            os.chdir(cwd)
+    
+    later = round_times[1:]
+    return {
+        'sites': len(websites),
+        'initial_sites_per_second': round(len(websites) / round_times[0], 1),
+        'sites_per_second': round(len(websites) * len(later) / sum(later), 1) if later else None,
+        'stages': {
+            stage: {
+                'count': len(timings[stage]),
+                'p50_ms': round(percentile(timings[stage], 0.5) * 1000, 3),
+                'p99_ms': round(percentile(timings[stage], 0.99) * 1000, 3)
+            }
+            for stage in STAGES if timings.get(stage)
+        },
+        'peak_rss_mib': round(peak_rss_mib() or 0, 1) or None,
+        'outcomes': dict(outcomes)
+    }
+
+def compare(result: Dict[str, Any], baseline: Optional[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Print the result next to its baseline.
+    
+    Args:
+        result: Measurements of this run
+        baseline: Stored measurements of the same scenario, if any
+        tolerance: Relative slowdown (e.g. 0.2 for 20%) reported as a regression
+    
+    Returns:
+        List[str]: Descriptions of the regressions
+    """
+    rows = [
+        ('initial sites/s', result['initial_sites_per_second'], (baseline or {}).get('initial_sites_per_second'), True),
+        ('sites/s', result['sites_per_second'], (baseline or {}).get('sites_per_second'), True),
+        ('peak RSS MiB', result['peak_rss_mib'], (baseline or {}).get('peak_rss_mib'), False)
+    ]
+    for stage, values in result['stages'].items():
+        stored = ((baseline or {}).get('stages') or {}).get(stage) or {}
+        rows.append((f"{stage} p50 ms", values['p50_ms'], stored.get('p50_ms'), False))
+        rows.append((f"{stage} p99 ms", values['p99_ms'], stored.get('p99_ms'), False))
+    
+    regressions = []
+    print(f"{'metric':<18} {'current':>12} {'baseline':>12} {'change':>9}")
+    for metric, current, stored, higher_is_better in rows:
+        if current is None:
+            continue
+        if not stored:
+            print(f"{metric:<18} {current:12.3f} {'-':>12}")
+            continue
+        change = (current - stored) / stored
+        worse = -change if higher_is_better else change
+        flag = ''
+        if worse > tolerance:
+            flag = '  REGRESSION'
+            regressions.append(f"{metric}: {stored} -> {current}")
+        print(f"{metric:<18} {current:12.3f} {stored:12.3f} {change:+8.1%}{flag}")
+    return regressions
+
+def main() -> None:
+    """Run the benchmark, report it and update or check the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sites', type=int, default=100, help='Synthetic sites to monitor')
+    parser.add_argument('--items', type=int, default=200, help='Job listings per synthetic page')
+    parser.add_argument('--pages', default=None, help='Directory of recorded pages (replaces synthetic sites)')
+    parser.add_argument('--latency', type=float, default=0.01, help='Server delay per request in seconds')
+    parser.add_argument('--change-rate', type=float, default=0.2, help='Fraction of pages changed per round')
+    parser.add_argument('--rounds', type=int, default=4, help='Monitoring runs (the first stores initial snapshots)')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent checks')
+    parser.add_argument('--parse-workers', default=0, help="Parse processes (0, a number or 'auto')")
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for page changes')
+    parser.add_argument('--baselines', default=DEFAULT_BASELINES, help='Baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the scenario baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative slowdown reported as a regression')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 on a regression')
+    args = parser.parse_args()
+    if args.parse_workers != 'auto':
+        args.parse_workers = int(args.parse_workers)
+    
+    logging.getLogger('website_tracker').setLevel(logging.WARNING)
+    baselines_path = Path(args.baselines).resolve()
+    if args.pages:
+        args.pages = str(Path(args.pages).resolve())
+    scenario = scenario_name(args)
+    baselines = json.loads(baselines_path.read_text(encoding='utf-8')) if baselines_path.exists() else {}
+    
+    result = run_benchmark(args)
+    print(f"Scenario {scenario}: {result['sites']} sites, outcomes {result['outcomes']}")
+    regressions = compare(result, baselines.get(scenario), args.tolerance)
+    
+    if args.save_baseline:
+        baselines[scenario] = result
+        baselines_path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        print(f"Baseline saved to {baselines_path}")
+    if regressions and args.check:
+        print(f"{len(regressions)} regressions beyond {args.tolerance:.0%}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
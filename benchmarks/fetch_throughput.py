@@ -0,0 +1,82 @@
+"""Compare threaded and asyncio fetch throughput against the local server.
+
+Usage:
+    python -m benchmarks.fetch_throughput --sites 1000 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from .server import LocalSiteServer
+from src.monitor import AsyncContentFetcher, ConnectionManager, ContentFetcher, RateLimiter
+
+SELECTORS = ['.job-listing']
+
+def run_threaded(urls: List[str], workers: int) -> Tuple[float, Dict[str, Any]]:
+    """Fetch all URLs with ContentFetcher on a thread pool.
+    
+    Returns:
+        Tuple[float, Dict[str, Any]]: Elapsed seconds and connection stats
+    """
+    start = time.perf_counter()
+    connections = ConnectionManager(per_host=workers)
+    with ContentFetcher(rate_limiter=RateLimiter(requests_per_minute=0), connection_manager=connections) as fetcher:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda url: fetcher.fetch_content(url, SELECTORS), urls))
+    return time.perf_counter() - start, connections.stats.since()
+
+async def _fetch_all(urls: List[str], in_flight: int, connections: ConnectionManager) -> None:
+    """Fetch all URLs with AsyncContentFetcher on one event loop."""
+    slots = asyncio.Semaphore(in_flight)
+    
+    async with AsyncContentFetcher(
+        rate_limiter=RateLimiter(requests_per_minute=0),
+        max_connections=in_flight,
+        connection_manager=connections
+    ) as fetcher:
+        async def fetch(url: str):
+            async with slots:
+                return await fetcher.fetch_content(url, SELECTORS)
+        
+        await asyncio.gather(*(fetch(url) for url in urls))
+
+def run_async(urls: List[str], in_flight: int) -> Tuple[float, Dict[str, Any]]:
+    """Fetch all URLs with AsyncContentFetcher.
+    
+    Returns:
+        Tuple[float, Dict[str, Any]]: Elapsed seconds and connection stats
+    """
+    start = time.perf_counter()
+    connections = ConnectionManager()
+    asyncio.run(_fetch_all(urls, in_flight, connections))
+    return time.perf_counter() - start, connections.stats.since()
+
+def main() -> None:
+    """Run the throughput comparison."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sites', type=int, default=500, help='Number of distinct pages to fetch')
+    parser.add_argument('--latency', type=float, default=0.1, help='Server delay per request in seconds')
+    parser.add_argument('--items', type=int, default=50, help='Job listings per page')
+    parser.add_argument('--workers', type=int, default=32, help='Threads for the threaded engine')
+    parser.add_argument('--in-flight', type=int, default=500, help='Concurrent requests for the async engine')
+    args = parser.parse_args()
+    
+    with LocalSiteServer(latency=args.latency, items=args.items) as server:
+        urls = [server.url_for(i) for i in range(args.sites)]
+        results = {
+            f"threads ({args.workers} workers)": run_threaded(urls, args.workers),
+            f"asyncio ({args.in_flight} in flight)": run_async(urls, args.in_flight),
+        }
+    
+    print(f"{args.sites} pages, {args.latency * 1000:.0f} ms server latency")
+    for engine, (elapsed, connections) in results.items():
+        print(
+            f"  {engine:<28} {elapsed:8.2f} s  {args.sites / elapsed:9.1f} sites/s  "
+            f"{connections['new_connections']:5} connections ({connections['reuse_ratio']:.0%} reused), "
+            f"{connections['pool_waits']} pool waits"
+        )
+
+if __name__ == '__main__':
+    main()
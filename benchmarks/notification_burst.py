@@ -0,0 +1,94 @@
+"""Send a burst of site changes through the notification dispatcher.
+
+Every run reports a change on each site. The dispatcher batches them into
+digests over a local SMTP stand-in; for comparison the same changes are
+also sent as one email per site over one connection each.
+
+Usage:
+    python -m benchmarks.notification_burst --sites 500 --runs 3 --latency 0.02
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from .smtp_server import LocalSmtpServer
+from src.notification import NotificationDispatcher, SmtpTransport
+
+def synthetic_change(site: str, run: int, lines: int) -> Dict[str, Any]:
+    """Build the change a run found on a site."""
+    return {
+        'website': site,
+        'timestamp': f"2024-01-0{run + 1}T00:00:00",
+        'previous_check': f"2024-01-0{run}T00:00:00",
+        'changes': True,
+        'added': [{'line_number': i + 1, 'text': f"New position {run}.{i} at {site}"} for i in range(lines)],
+        'removed': [],
+        'moved': [],
+        'change_percentage': 5.0
+    }
+
+def build_websites(sites: int, groups: int) -> List[Dict[str, Any]]:
+    """Build website configurations spread over recipient groups."""
+    return [
+        {
+            'name': f"Site {index}",
+            'notification': {
+                'threshold': {'added': 1},
+                'email': {'to': [f"team{index % groups}@example.com"]}
+            }
+        }
+        for index in range(sites)
+    ]
+
+def main() -> None:
+    """Run the burst through the dispatcher and through per-site emails."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sites', type=int, default=500, help='Sites that change in every run')
+    parser.add_argument('--runs', type=int, default=3, help='Monitoring runs within one batch interval')
+    parser.add_argument('--groups', type=int, default=2, help='Distinct recipient lists')
+    parser.add_argument('--lines', type=int, default=3, help='Added lines per change')
+    parser.add_argument('--latency', type=float, default=0.02, help='SMTP server delay per message in seconds')
+    args = parser.parse_args()
+    
+    logging.getLogger('website_tracker').setLevel(logging.WARNING)
+    websites = build_websites(args.sites, args.groups)
+    runs = [[synthetic_change(website['name'], run, args.lines) for website in websites] for run in range(args.runs)]
+    
+    with tempfile.TemporaryDirectory() as work_dir, LocalSmtpServer(latency=args.latency) as server:
+        transport = SmtpTransport('127.0.0.1', server.port)
+        dispatcher = NotificationDispatcher(
+            transport,
+            'tracker@example.com',
+            websites,
+            batch_interval=3600,
+            max_emails=50,
+            period=3600,
+            outbox_path=str(Path(work_dir) / 'outbox.db')
+        )
+        start = time.perf_counter()
+        for run, changes in enumerate(runs):
+            # Runs a minute apart; the last one comes after the batch interval is up
+            dispatcher.dispatch(changes, now=1000.0 + run * 60 + (3600 if run == len(runs) - 1 else 0))
+        batched = time.perf_counter() - start
+        dispatcher.close()
+        batched_emails, batched_connections = len(server.messages), server.connections
+        
+        start = time.perf_counter()
+        for changes in runs:
+            for change in changes:
+                transport.send([dispatcher._message(['team0@example.com'], [change])])
+        naive = time.perf_counter() - start
+    
+    total = args.sites * args.runs
+    print(f"{total} changes from {args.sites} sites over {args.runs} runs, {args.groups} recipient lists")
+    print(f"  {'digests':<16} {batched_emails:6} emails {batched_connections:6} connections {batched:8.2f} s")
+    print(
+        f"  {'email per change':<16} {len(server.messages) - batched_emails:6} emails "
+        f"{server.connections - batched_connections:6} connections {naive:8.2f} s"
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Compare HTML parser backends on recorded or synthetic pages.
+
+Recorded pages come from ``python -m benchmarks.record_pages``. Without
+``--pages`` a set of synthetic career pages of increasing size is used.
+
+Usage:
+    python -m benchmarks.parse_backends --pages benchmarks/pages --repeat 5
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from .server import render_page
+from src.monitor.text_extractor import PARSER_BACKENDS, available_parsers, compile_plan
+
+SYNTHETIC_SELECTORS = ['.job-listing', '.main-content h1', '[class*="job"]']
+SYNTHETIC_EXCLUDE = ['.footer', '.location']
+
+def load_pages(pages_dir: Optional[str] = None) -> List[Dict]:
+    """Load recorded pages, or build synthetic ones.
+    
+    Args:
+        pages_dir: Directory containing manifest.json and HTML files
+        
+    Returns:
+        List[Dict]: Pages with 'name', 'html' and a compiled selector 'plan'
+    """
+    if not pages_dir:
+        return [
+            {
+                'name': f"synthetic-{items}",
+                'html': render_page('bench', items),
+                'plan': compile_plan(SYNTHETIC_SELECTORS, SYNTHETIC_EXCLUDE)
+            }
+            for items in (10, 100, 1000, 5000)
+        ]
+    
+    base = Path(pages_dir)
+    with open(base / 'manifest.json', 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return [
+        {
+            'name': entry['name'],
+            'html': (base / entry['file']).read_text(encoding='utf-8'),
+            'plan': compile_plan(entry['selectors'], entry.get('exclude'))
+        }
+        for entry in manifest
+    ]
+
+def main() -> None:
+    """Time every installed backend and check they agree."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', default=None, help='Directory of recorded pages')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per page and backend (best is reported)')
+    args = parser.parse_args()
+    
+    backends = available_parsers()
+    pages = load_pages(args.pages)
+    mismatches = 0
+    
+    print(f"{'page':<32} {'KiB':>8} " + ' '.join(f"{name:>12}" for name in backends))
+    for page in pages:
+        timings = {}
+        outputs = {}
+        for name in backends:
+            extract = PARSER_BACKENDS[name]
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                outputs[name] = extract(page['html'], page['plan'])
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        
+        size_kib = len(page['html'].encode('utf-8')) / 1024
+        print(f"{page['name'][:32]:<32} {size_kib:8.1f} " + ' '.join(f"{timings[name] * 1000:10.1f}ms" for name in backends))
+        
+        reference = outputs['html.parser']
+        for name in backends:
+            if outputs[name] != reference:
+                mismatches += 1
+                print(f"  ! {name} extracted different text than html.parser")
+    
+    print(f"\n{len(pages)} pages, {len(backends)} backends, {mismatches} mismatches")
+
+if __name__ == '__main__':
+    main()
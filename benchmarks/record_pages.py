@@ -0,0 +1,50 @@
+"""Record the raw HTML of configured websites for offline benchmarks.
+
+Usage:
+    python -m benchmarks.record_pages --config config/websites.yml --out benchmarks/pages
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+import requests
+from src.monitor.content_fetcher import DEFAULT_HEADERS
+from src.utils.config import Config
+
+def main() -> None:
+    """Download each configured page and write a manifest next to it."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default=None, help='Path to websites.yml')
+    parser.add_argument('--out', default='benchmarks/pages', help='Directory for recorded pages')
+    args = parser.parse_args()
+    
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = []
+    
+    with requests.Session() as session:
+        for website in Config(args.config).get_websites():
+            name = website.get('name', 'Unknown')
+            try:
+                response = session.get(website['url'], headers=DEFAULT_HEADERS, timeout=30)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                print(f"Skipping {name}: {e}")
+                continue
+            
+            file_name = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_') + '.html'
+            (out_dir / file_name).write_text(response.text, encoding='utf-8')
+            manifest.append({
+                'name': name,
+                'file': file_name,
+                'selectors': website.get('content', {}).get('selectors', []),
+                'exclude': website.get('content', {}).get('exclude', [])
+            })
+            print(f"Recorded {name} ({len(response.content)} bytes)")
+    
+    with open(out_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
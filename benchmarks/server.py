@@ -0,0 +1,221 @@
+"""Local HTTP server serving synthetic and recorded career pages for offline benchmarks."""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import socket
+import threading
+from typing import Dict, Optional
+from aiohttp import web
+
+def render_page(site_id: str, items: int = 50, version: int = 0) -> str:
+    """Render a deterministic synthetic career page.
+    
+    Args:
+        site_id: Identifier used to vary the page content
+        items: Number of job listings on the page
+        version: Number of changes since the first version; each one adds a
+            new listing at the top
+        
+    Returns:
+        str: HTML document
+    """
+    listings = '\n'.join(
+        [
+            f'<li class="job-listing"><a href="/jobs/{site_id}/new{v}">New position {v} at site {site_id}</a>'
+            '<span class="location">Remote</span></li>'
+            for v in range(version, 0, -1)
+        ] + [
+            f'<li class="job-listing"><a href="/jobs/{site_id}/{i}">Position {i} at site {site_id}</a>'
+            f'<span class="location">Office {i % 7}</span></li>'
+            for i in range(items)
+        ]
+    )
+    return (
+        '<html><head><title>Careers</title><style>.job-listing{color:red}</style></head>'
+        '<body><div class="header">Header</div>'
+        f'<div class="main-content"><h1>Open positions at site {site_id}</h1>'
+        f'<ul>{listings}</ul><script>var tracker = "{site_id}";</script></div>'
+        '<div class="footer">Footer</div></body></html>'
+    )
+
+class LocalSiteServer:
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        items: int = 50,
+        change_rate: float = 0.0,
+        pages: Optional[Dict[str, str]] = None,
+        seed: int = 0
+    ):
+        """Initialize the local site server.
+        
+        The server runs an aiohttp application on its own event loop in a
+        background thread, so it can serve thousands of concurrent requests
+        without one thread per connection.
+        
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds to wait before answering each request
+            items: Number of job listings on each synthetic page
+            change_rate: Fraction of pages that change on each advance()
+            pages: Recorded HTML by page name, served at /page/<name>
+            seed: Random seed for choosing the pages that change
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.items = items
+        self.change_rate = change_rate
+        self.pages = dict(pages or {})
+        self.versions: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._seen_sites = set()
+        self.requests_served = 0
+        self.not_modified_served = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+    
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+    
+    def url_for(self, site_id) -> str:
+        """Get the URL of a synthetic site.
+        
+        Args:
+            site_id: Site identifier
+            
+        Returns:
+            str: Page URL
+        """
+        return f"{self.base_url}/site/{site_id}"
+    
+    def recorded_url_for(self, name: str) -> str:
+        """Get the URL of a recorded page.
+        
+        Args:
+            name: Page name (a key of pages)
+            
+        Returns:
+            str: Page URL
+        """
+        return f"{self.base_url}/page/{name}"
+    
+    def advance(self) -> int:
+        """Start a new round in which a change_rate fraction of the pages changed.
+        
+        Synthetic pages gain a listing. Recorded pages only gain a comment,
+        so their body changes but their extracted text doesn't.
+        
+        Returns:
+            int: Number of pages changed
+        """
+        keys = [f"site/{site_id}" for site_id in sorted(self._seen_sites)] + [f"page/{name}" for name in self.pages]
+        changed = [key for key in keys if self._rng.random() < self.change_rate]
+        for key in changed:
+            self.versions[key] = self.versions.get(key, 0) + 1
+        return len(changed)
+    
+    async def _respond(self, request: web.Request, html: str) -> web.Response:
+        """Answer with a page, honouring If-None-Match."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.requests_served += 1
+        etag = '"' + hashlib.sha1(html.encode('utf-8')).hexdigest()[:16] + '"'
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified_served += 1
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(text=html, content_type='text/html', headers={'ETag': etag})
+    
+    async def _handle_site(self, request: web.Request) -> web.Response:
+        """Serve one synthetic page."""
+        site_id = request.match_info['site_id']
+        self._seen_sites.add(site_id)
+        return await self._respond(request, render_page(site_id, self.items, self.versions.get(f"site/{site_id}", 0)))
+    
+    async def _handle_page(self, request: web.Request) -> web.Response:
+        """Serve one recorded page."""
+        name = request.match_info['name']
+        if name not in self.pages:
+            raise web.HTTPNotFound()
+        version = self.versions.get(f"page/{name}", 0)
+        html = self.pages[name] + (f"<!-- version {version} -->" if version else '')
+        return await self._respond(request, html)
+    
+    def _build_app(self) -> web.Application:
+        """Build the aiohttp application."""
+        app = web.Application()
+        app.router.add_get('/site/{site_id}', self._handle_site)
+        app.router.add_get('/page/{name}', self._handle_page)
+        return app
+    
+    def _run(self, sock: socket.socket) -> None:
+        """Run the server loop until stopped."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        runner = web.AppRunner(self._build_app(), access_log=None)
+        self._loop.run_until_complete(runner.setup())
+        self._loop.run_until_complete(web.SockSite(runner, sock, backlog=4096).start())
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(runner.cleanup())
+            self._loop.close()
+    
+    def start(self) -> str:
+        """Start serving in a background thread.
+        
+        Returns:
+            str: Base URL of the server
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._run, args=(sock,), daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.base_url
+    
+    def stop(self) -> None:
+        """Stop the server and wait for its thread to exit."""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+    
+    def __enter__(self):
+        """Context manager enter."""
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.stop()
+
+def main() -> None:
+    """Serve synthetic pages until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of delay per request')
+    parser.add_argument('--items', type=int, default=50, help='Job listings per page')
+    args = parser.parse_args()
+    
+    server = LocalSiteServer(args.host, args.port, args.latency, args.items)
+    print(f"Serving synthetic pages at {server.start()}/site/<id> (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
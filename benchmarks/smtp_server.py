@@ -0,0 +1,145 @@
+"""Local SMTP stand-in that records messages instead of delivering them."""
+
+import argparse
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from email.message import Message
+from typing import List, Optional
+
+class _SmtpSession(socketserver.StreamRequestHandler):
+    """Speak just enough SMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+    
+    def reply(self, line: str) -> None:
+        """Send a one-line reply."""
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+    
+    def handle(self) -> None:
+        """Serve one connection until QUIT."""
+        server: 'LocalSmtpServer' = self.server.owner
+        server._connection_opened()
+        self.reply('220 localhost stand-in ready')
+        recipients: List[str] = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self.wfile.write(b'250-localhost\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n')
+            elif verb == 'HELO':
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip().strip('<>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for data_line in self.rfile:
+                    if data_line in (b'.\r\n', b'.\n'):
+                        break
+                    data.append(data_line[1:] if data_line.startswith(b'..') else data_line)
+                if server.latency:
+                    time.sleep(server.latency)
+                server._received(message_from_bytes(b''.join(data)), recipients)
+                self.reply('250 OK queued')
+            elif verb == 'RSET':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+class LocalSmtpServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0):
+        """Initialize the SMTP stand-in.
+        
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Seconds to wait before accepting each message, to mimic
+                a remote server's round trip
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.messages: List[Message] = []
+        self.envelopes: List[List[str]] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def _connection_opened(self) -> None:
+        """Count a new connection."""
+        with self._lock:
+            self.connections += 1
+    
+    def _received(self, message: Message, recipients: List[str]) -> None:
+        """Record a delivered message."""
+        with self._lock:
+            self.messages.append(message)
+            self.envelopes.append(recipients)
+    
+    def start(self) -> int:
+        """Start serving in a background thread.
+        
+        Returns:
+            int: Port the server listens on
+        """
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), _SmtpSession)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.port
+    
+    def stop(self) -> None:
+        """Stop the server and wait for its thread to exit."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+    
+    def __enter__(self):
+        """Context manager enter."""
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.stop()
+
+def main() -> None:
+    """Run the stand-in until interrupted, printing each message received."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    args = parser.parse_args()
+    
+    with LocalSmtpServer(args.host, args.port) as server:
+        print(f"SMTP stand-in listening on {args.host}:{server.port}")
+        seen = 0
+        try:
+            while True:
+                time.sleep(0.5)
+                for message in server.messages[seen:]:
+                    print(f"{message['To']}: {message['Subject']} ({len(message.get_payload())} chars)")
+                seen = len(server.messages)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == '__main__':
+    main()
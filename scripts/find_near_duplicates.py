@@ -0,0 +1,35 @@
+"""List monitored sites whose latest snapshots are nearly identical.
+
+Uses the similarity fingerprints stored with each snapshot, so no content
+is compared. Run from the repository root:
+
+    python -m scripts.find_near_duplicates --min-similarity 0.8
+"""
+
+import argparse
+import os
+from src.detector.fingerprint import find_near_duplicates
+from src.detector.history_manager import DEFAULT_HISTORY_PATH, HistoryManager
+from src.utils.config import Config
+
+def main():
+    """Print near-duplicate site pairs from the snapshot history."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default=os.environ.get('WEBSITE_TRACKER_CONFIG'), help='Config file')
+    parser.add_argument('--min-similarity', type=float, default=0.9, help='Minimum estimated similarity (0-1)')
+    args = parser.parse_args()
+    
+    storage_config = Config(args.config).get_storage_config()
+    history = HistoryManager(storage_config.get('path', DEFAULT_HISTORY_PATH))
+    try:
+        fingerprints = history.latest_fingerprints()
+    finally:
+        history.close()
+    
+    pairs = find_near_duplicates(fingerprints, args.min_similarity)
+    for first, second, score in pairs:
+        print(f"{score:6.1%}  {first}  {second}")
+    print(f"\n{len(pairs)} near-duplicate pairs among {len(fingerprints)} sites")
+
+if __name__ == '__main__':
+    main()
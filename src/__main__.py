@@ -1,55 +1,185 @@
 """Main entry point for website tracker."""
 
+import argparse
+import asyncio
+import signal
 import sys
 import os
-from typing import NoReturn
+import threading
+from typing import Any, Dict, List, NoReturn, Optional
+from .detector.diff_report import write_diff_report
 from .monitor import WebsiteMonitor
-from .utils import Logger
+from .monitor.profiling import DEFAULT_PROFILE_DIR, profile_websites
+from .monitor.sharding import DEFAULT_REPORT_PATH, merge_shards, parse_shard, shard_path, write_report
+from .notification import NotificationDispatcher
+from .utils import Config, Logger
 
 logger = Logger.get_logger()
 
+def log_changes(changes: List[Dict[str, Any]]) -> None:
+    """Write the changes found by a monitoring run to a report and log a summary.
+    
+    Args:
+        changes: Changes detected, one entry per website
+    """
+    try:
+        report_file = write_diff_report(changes)
+    except Exception as e:
+        logger.error("Error writing change report: %s", e)
+        report_file = None
+    logger.info("Detected changes in %d websites, details in %s", len(changes), report_file)
+    for change in changes:
+        logger.info(
+            "%s: %d added, %d removed, %d moved lines (%s%%)",
+            change['website'],
+            len(change['added']),
+            len(change['removed']),
+            len(change.get('moved') or []),
+            change['change_percentage']
+        )
+
+def report_changes(changes: List[Dict[str, Any]], dispatcher: Optional[NotificationDispatcher]) -> None:
+    """Log the changes of a run and hand them to the notification dispatcher.
+    
+    The dispatcher is called even when nothing changed, so digests queued by
+    earlier runs go out once their batch interval is up.
+    
+    Args:
+        changes: Changes detected, may be empty
+        dispatcher: Notification dispatcher, None if email is not configured
+    """
+    if changes:
+        log_changes(changes)
+    else:
+        logger.info("No changes detected in any monitored websites")
+    if dispatcher is not None:
+        dispatcher.dispatch(changes)
+
+def run_daemon(monitor: WebsiteMonitor, dispatcher: Optional[NotificationDispatcher]) -> None:
+    """Check websites on their schedule until SIGINT or SIGTERM.
+    
+    Args:
+        monitor: Monitor whose sessions stay open between checks
+        dispatcher: Notification dispatcher, None if email is not configured
+    """
+    logger.info("Running as a daemon, press Ctrl+C to stop")
+    
+    def on_run(changes: List[Dict[str, Any]]) -> None:
+        if changes:
+            log_changes(changes)
+        if dispatcher is not None:
+            dispatcher.dispatch(changes)
+    
+    if monitor.engine == 'async':
+        async def serve() -> None:
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, stop.set)
+            await monitor.run_scheduled_async(on_run, stop)
+        
+        asyncio.run(serve())
+    else:
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        monitor.run_scheduled(on_run, stop)
+    logger.info("Daemon stopped")
+
 def main() -> NoReturn:
     """Main entry point."""
+    parser = argparse.ArgumentParser(prog='python -m src', description='Website content tracker')
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help="Keep running and check each website when its frequency makes it due"
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='I/N',
+        help="Only check shard I of N, with its own history and change report"
+    )
+    parser.add_argument(
+        '--merge',
+        type=int,
+        metavar='N',
+        help="Merge the history and change reports of N shards, then exit"
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='*',
+        metavar='SITE',
+        help=f"Check the named websites (all if none are named) one at a time under cProfile "
+             f"and tracemalloc, writing a report per website to {DEFAULT_PROFILE_DIR}/"
+    )
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=25,
+        metavar='N',
+        help="Functions and allocation sites listed per profile report (default 25)"
+    )
+    args = parser.parse_args()
+    
     try:
         # Get config path from environment or use default
         config_path = os.environ.get('WEBSITE_TRACKER_CONFIG')
         
+        if args.merge:
+            logger.info("Merging %s shards", args.merge)
+            config = Config(config_path)
+            changes = merge_shards(config, args.merge)
+            dispatcher = NotificationDispatcher.from_config(config)
+            try:
+                report_changes(changes, dispatcher)
+            finally:
+                if dispatcher is not None:
+                    dispatcher.close()
+            sys.exit(0)
+        
         # Initialize and run monitor
         logger.info("Starting website content tracker")
-        monitor = WebsiteMonitor(config_path)
+        if args.shard:
+            logger.info("Running shard %s/%s", args.shard[0], args.shard[1])
+        # Work done in parse worker processes wouldn't show up in a profile
+        monitor = WebsiteMonitor(
+            config_path,
+            shard=args.shard,
+            parse_workers=0 if args.profile is not None else None
+        )
+        # Shards leave notifying to the merge step, which sees all their changes
+        dispatcher = None
+        if args.profile is None and not args.shard:
+            dispatcher = NotificationDispatcher.from_config(monitor.config)
         
         try:
-            changes = monitor.start_monitoring()
-            
-            # Log results
-            if changes:
-                logger.info(f"Detected changes in {len(changes)} websites:")
-                for change in changes:
-                    website = change['website']
-                    logger.info(f"\nChanges for {website}:")
-                    logger.info(f"Time: {change['timestamp']}")
-                    logger.info(f"Change percentage: {change['change_percentage']}%")
-                    
-                    if change['added']:
-                        logger.info("\nAdded content:")
-                        for item in change['added']:
-                            logger.info(f"+ {item}")
-                    
-                    if change['removed']:
-                        logger.info("\nRemoved content:")
-                        for item in change['removed']:
-                            logger.info(f"- {item}")
+            if args.profile is not None:
+                changes = profile_websites(monitor, args.profile, args.profile_top)
+            elif args.daemon:
+                run_daemon(monitor, dispatcher)
+                sys.exit(0)
+            elif monitor.engine == 'async':
+                changes = asyncio.run(monitor.start_monitoring_async())
             else:
-                logger.info("No changes detected in any monitored websites")
+                changes = monitor.start_monitoring()
+            
+            if args.shard:
+                write_report(shard_path(DEFAULT_REPORT_PATH, args.shard), changes)
+            
+            # Log results and notify
+            report_changes(changes, dispatcher)
             
             # Exit with success status
             sys.exit(0)
-            
+        
         finally:
             monitor.close()
-            
+            if dispatcher is not None:
+                dispatcher.close()
+    
     except Exception as e:
-        logger.error(f"Error running website tracker: {str(e)}", exc_info=True)
+        logger.error("Error running website tracker: %s", e, exc_info=True)
         sys.exit(1)
 
 if __name__ == '__main__':
@@ -0,0 +1,7 @@
+"""Change detection and content history package."""
+
+from .diff_analyzer import analyze_changes, diff_opcodes
+from .fingerprint import find_near_duplicates, fingerprint, similarity
+from .history_manager import HistoryManager
+
+__all__ = ['HistoryManager', 'analyze_changes', 'diff_opcodes', 'find_near_duplicates', 'fingerprint', 'similarity']
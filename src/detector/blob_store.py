@@ -0,0 +1,186 @@
+import difflib
+import hashlib
+import json
+import lzma
+import sqlite3
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+DEFAULT_COMPRESSION = 'zlib'
+
+# Pages at least this large are stored as a delta against the previous version
+DEFAULT_DELTA_MIN_BYTES = 32 * 1024
+
+# Longest chain of deltas before a full copy is stored again, bounding reads
+MAX_DELTA_CHAIN = 16
+
+CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    'zlib': (lambda data: zlib.compress(data, 9), zlib.decompress),
+    'lzma': (lzma.compress, lzma.decompress),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    base TEXT,
+    depth INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+def blob_digest(content: str) -> str:
+    """Get the address of a piece of content (SHA-256 of its UTF-8 text).
+    
+    Args:
+        content: Text content
+    
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def make_delta(base: str, content: str) -> List[list]:
+    """Describe content as line copies from base plus inserted lines.
+    
+    Args:
+        base: Previous version
+        content: New version
+    
+    Returns:
+        List[list]: Operations, ``['=', start, end]`` copies base lines and
+        ``['+', line, ...]`` inserts new lines
+    """
+    base_lines = base.splitlines(keepends=True)
+    lines = content.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, base_lines, lines).get_opcodes():
+        if tag == 'equal':
+            ops.append(['=', i1, i2])
+        elif j2 > j1:
+            ops.append(['+'] + lines[j1:j2])
+    return ops
+
+def apply_delta(base: str, ops: List[list]) -> str:
+    """Rebuild content from its base and the operations of make_delta().
+    
+    Args:
+        base: Previous version
+        ops: Delta operations
+    
+    Returns:
+        str: New version
+    """
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if op[0] == '=':
+            parts.extend(base_lines[op[1]:op[2]])
+        else:
+            parts.extend(op[1:])
+    return ''.join(parts)
+
+class BlobStore:
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        compression: str = DEFAULT_COMPRESSION,
+        delta_min_bytes: int = DEFAULT_DELTA_MIN_BYTES
+    ):
+        """Content-addressed, compressed content storage in an SQLite database.
+        
+        Each distinct content is stored once under its SHA-256 digest. Large
+        contents are stored as a compressed line delta against the previous
+        version when that is smaller than a compressed full copy.
+        
+        The store does no locking of its own; callers serialize access to
+        the connection.
+        
+        Args:
+            conn: Open database connection
+            compression: Codec for new blobs ('zlib' or 'lzma')
+            delta_min_bytes: Minimum size for delta storage (0 disables deltas)
+        """
+        if compression not in CODECS:
+            logger.warning("Unknown compression '%s', falling back to %s", compression, DEFAULT_COMPRESSION)
+            compression = DEFAULT_COMPRESSION
+        self.conn = conn
+        self.compression = compression
+        self.delta_min_bytes = delta_min_bytes
+        self.conn.executescript(_SCHEMA)
+    
+    def put(self, content: str, digest: Optional[str] = None, base: Optional[str] = None) -> str:
+        """Store content unless a blob with the same digest exists.
+        
+        Args:
+            content: Text content
+            digest: Precomputed blob_digest() of the content
+            base: Digest of the previous version, used for delta storage
+        
+        Returns:
+            str: Digest the content is stored under
+        """
+        digest = digest or blob_digest(content)
+        if self.conn.execute('SELECT 1 FROM blobs WHERE hash = ?', (digest,)).fetchone():
+            return digest
+        
+        compress = CODECS[self.compression][0]
+        raw = content.encode('utf-8')
+        data, base_digest, depth = compress(raw), None, 0
+        
+        if base and base != digest and self.delta_min_bytes and len(raw) >= self.delta_min_bytes:
+            row = self.conn.execute('SELECT depth FROM blobs WHERE hash = ?', (base,)).fetchone()
+            if row and row[0] < MAX_DELTA_CHAIN:
+                ops = make_delta(self.get(base), content)
+                delta = compress(json.dumps(ops, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+                if len(delta) < len(data):
+                    data, base_digest, depth = delta, base, row[0] + 1
+        
+        self.conn.execute(
+            'INSERT INTO blobs (hash, codec, base, depth, size, data) VALUES (?, ?, ?, ?, ?, ?)',
+            (digest, self.compression, base_digest, depth, len(raw), data)
+        )
+        return digest
+    
+    def get(self, digest: str, cache: Optional[Dict[str, str]] = None) -> str:
+        """Load content by digest, resolving delta chains.
+        
+        Args:
+            digest: Blob digest
+            cache: Optional dict of already decoded blobs, updated in place
+        
+        Returns:
+            str: Text content
+        
+        Raises:
+            KeyError: If no blob has the digest
+        """
+        if cache is not None and digest in cache:
+            return cache[digest]
+        
+        row = self.conn.execute('SELECT codec, base, data FROM blobs WHERE hash = ?', (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"Missing content blob {digest}")
+        codec, base, data = row
+        raw = CODECS[codec][1](data).decode('utf-8')
+        content = apply_delta(self.get(base, cache), json.loads(raw)) if base else raw
+        
+        if cache is not None:
+            cache[digest] = content
+        return content
+    
+    def stats(self) -> Dict[str, int]:
+        """Get storage statistics.
+        
+        Returns:
+            Dict[str, int]: 'blobs', 'deltas', 'size' (uncompressed bytes) and
+            'stored' (compressed bytes)
+        """
+        blobs, deltas, size, stored = self.conn.execute(
+            'SELECT COUNT(*), COUNT(base), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs'
+        ).fetchone()
+        return {'blobs': blobs, 'deltas': deltas, 'size': size, 'stored': stored}
@@ -0,0 +1,230 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Regions that patience diff can't anchor fall back to Myers. Past this many
+# edits the region is reported as replaced instead of searched further.
+MAX_MYERS_COST = 1000
+
+Opcode = Tuple[str, int, int, int, int]
+
+# A run of matching lines: (old start, new start, length)
+Block = Tuple[int, int, int]
+
+def _line_ids(old_lines: Sequence[str], new_lines: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """Map lines to small integers so comparisons are cheap and exact.
+    
+    Args:
+        old_lines: Lines of the previous version
+        new_lines: Lines of the current version
+    
+    Returns:
+        Tuple[List[int], List[int]]: Line ids of both versions
+    """
+    ids: Dict[str, int] = {}
+    old = [ids.setdefault(line, len(ids)) for line in old_lines]
+    new = [ids.setdefault(line, len(ids)) for line in new_lines]
+    return old, new
+
+def _myers(a: List[int], b: List[int], alo: int, ahi: int, blo: int, bhi: int, matches: List[Block]) -> None:
+    """Find a shortest edit script between two regions (Myers' O(ND) algorithm).
+    
+    Matched runs are appended to matches. If the regions differ by more than
+    MAX_MYERS_COST edits nothing is matched.
+    """
+    n, m = ahi - alo, bhi - blo
+    max_d = min(n + m, MAX_MYERS_COST)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+    
+    for d in range(max_d + 1):
+        trace.append(v[:])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                _myers_backtrack(trace, n, m, offset, alo, blo, matches)
+                return
+
+def _myers_backtrack(trace: List[List[int]], x: int, y: int, offset: int, alo: int, blo: int, matches: List[Block]) -> None:
+    """Walk the Myers trace back from the end, collecting diagonal runs."""
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[offset + prev_k] if d > 0 else 0
+        prev_y = prev_x - prev_k if d > 0 else 0
+        run = min(x - prev_x, y - prev_y)
+        if run > 0:
+            x -= run
+            y -= run
+            matches.append((alo + x, blo + y, run))
+        x, y = prev_x, prev_y
+
+def _longest_increasing(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Get the longest run of pairs increasing in both positions.
+    
+    Args:
+        pairs: (old position, new position) pairs sorted by old position
+    
+    Returns:
+        List[Tuple[int, int]]: Longest subsequence increasing in new position
+    """
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        slot = bisect_left(tails, j)
+        if slot == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[slot] = j
+            tail_index[slot] = index
+        previous[index] = tail_index[slot - 1] if slot else -1
+    
+    result = []
+    index = tail_index[-1] if tail_index else -1
+    while index >= 0:
+        result.append(pairs[index])
+        index = previous[index]
+    result.reverse()
+    return result
+
+def _patience(a: List[int], b: List[int], alo: int, ahi: int, blo: int, bhi: int, matches: List[Block]) -> None:
+    """Match two regions using patience diff, falling back to Myers.
+    
+    Common leading and trailing lines are matched first. The rest is split
+    around lines that occur exactly once on both sides, which anchors the
+    diff on distinctive lines and keeps it linear for typical pages.
+    """
+    start = alo
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        alo += 1
+        blo += 1
+    if alo > start:
+        matches.append((start, blo - (alo - start), alo - start))
+    end = ahi
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+    if ahi < end:
+        matches.append((ahi, bhi, end - ahi))
+    if alo == ahi or blo == bhi:
+        return
+    
+    old_counts = Counter(a[alo:ahi])
+    new_counts = Counter(b[blo:bhi])
+    new_unique = {b[j]: j for j in range(blo, bhi) if new_counts[b[j]] == 1}
+    pairs = [
+        (i, new_unique[a[i]])
+        for i in range(alo, ahi)
+        if old_counts[a[i]] == 1 and a[i] in new_unique
+    ]
+    if not pairs:
+        _myers(a, b, alo, ahi, blo, bhi, matches)
+        return
+    
+    for i, j in _longest_increasing(pairs):
+        # Only gaps with lines on both sides can hold more matches
+        if i > alo and j > blo:
+            _patience(a, b, alo, i, blo, j, matches)
+        matches.append((i, j, 1))
+        alo, blo = i + 1, j + 1
+    if alo < ahi and blo < bhi:
+        _patience(a, b, alo, ahi, blo, bhi, matches)
+
+def diff_opcodes(old: Sequence, new: Sequence) -> List[Opcode]:
+    """Diff two sequences of hashable items.
+    
+    Args:
+        old: Previous sequence (e.g. line ids)
+        new: Current sequence
+    
+    Returns:
+        List[Opcode]: difflib-style ('equal' | 'delete' | 'insert' | 'replace',
+        i1, i2, j1, j2) tuples covering both sequences
+    """
+    a, b = list(old), list(new)
+    matches: List[Block] = []
+    _patience(a, b, 0, len(a), 0, len(b), matches)
+    matches.sort()
+    
+    opcodes: List[Opcode] = []
+    i = j = 0
+    for mi, mj, size in matches + [(len(a), len(b), 0)]:
+        if i < mi or j < mj:
+            tag = 'replace' if i < mi and j < mj else 'delete' if i < mi else 'insert'
+            opcodes.append((tag, i, mi, j, mj))
+        if size:
+            if opcodes and opcodes[-1][0] == 'equal':
+                _, i1, _, j1, _ = opcodes[-1]
+                opcodes[-1] = ('equal', i1, mi + size, j1, mj + size)
+            else:
+                opcodes.append(('equal', mi, mi + size, mj, mj + size))
+        i, j = mi + size, mj + size
+    return opcodes
+
+def analyze_changes(previous_content: str, current_content: str) -> Dict[str, Any]:
+    """Compare two snapshots line by line, keeping order and repeated lines.
+    
+    Lines that disappear in one place and reappear in another are reported
+    as moved rather than as a removal plus an addition. Line numbers are
+    1-based.
+    
+    Args:
+        previous_content: Previous content
+        current_content: Current content
+    
+    Returns:
+        Dict[str, Any]: 'added' and 'removed' ({'line_number', 'text'}),
+        'moved' ({'from_line', 'to_line', 'text'}) and 'change_percentage'
+        (added plus removed lines relative to all lines involved)
+    """
+    old_lines = previous_content.splitlines()
+    new_lines = current_content.splitlines()
+    old, new = _line_ids(old_lines, new_lines)
+    
+    removed_at: Dict[int, deque] = defaultdict(deque)
+    added_at: List[int] = []
+    for tag, i1, i2, j1, j2 in diff_opcodes(old, new):
+        if tag == 'equal':
+            continue
+        for i in range(i1, i2):
+            removed_at[old[i]].append(i)
+        added_at.extend(range(j1, j2))
+    
+    # A removed line that reappears elsewhere is a move, not an edit
+    added, moved = [], []
+    for j in added_at:
+        positions = removed_at.get(new[j])
+        if positions:
+            i = positions.popleft()
+            moved.append({'from_line': i + 1, 'to_line': j + 1, 'text': new_lines[j]})
+        else:
+            added.append({'line_number': j + 1, 'text': new_lines[j]})
+    removed = [
+        {'line_number': i + 1, 'text': old_lines[i]}
+        for i in sorted(i for positions in removed_at.values() for i in positions)
+    ]
+    
+    total_lines = len(old_lines) + len(added)
+    change_percentage = ((len(added) + len(removed)) / total_lines * 100) if total_lines > 0 else 0
+    
+    return {
+        'added': added,
+        'removed': removed,
+        'moved': moved,
+        'change_percentage': round(change_percentage, 2)
+    }
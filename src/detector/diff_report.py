@@ -0,0 +1,61 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Write buffer of the report file; a typical report is written in one call
+REPORT_BUFFER_SIZE = 1024 * 1024
+
+def format_changes(changes: List[Dict[str, Any]]) -> Iterator[str]:
+    """Render detected changes as the lines of a text report.
+    
+    Args:
+        changes: Changes detected, one entry per website
+    
+    Yields:
+        str: Report lines, each ending with a newline
+    """
+    for change in changes:
+        yield f"Changes for {change['website']}:\n"
+        yield f"Time: {change['timestamp']}\n"
+        yield f"Change percentage: {change['change_percentage']}%\n"
+        
+        if change['added']:
+            yield "\nAdded content:\n"
+            for item in change['added']:
+                yield f"+ {item['line_number']}: {item['text']}\n"
+        
+        if change['removed']:
+            yield "\nRemoved content:\n"
+            for item in change['removed']:
+                yield f"- {item['line_number']}: {item['text']}\n"
+        
+        if change.get('moved'):
+            yield "\nMoved content:\n"
+            for item in change['moved']:
+                yield f"~ {item['from_line']} -> {item['to_line']}: {item['text']}\n"
+        yield "\n"
+
+def write_diff_report(
+    changes: List[Dict[str, Any]],
+    directory: str = 'logs',
+    timestamp: Optional[datetime] = None
+) -> Path:
+    """Write the added, removed and moved lines of a run to a report file.
+    
+    The lines are streamed through one buffered file, instead of one log
+    record per line. Runs within the same second share a file.
+    
+    Args:
+        changes: Changes detected, one entry per website
+        directory: Directory for the report
+        timestamp: Time the report is named after, defaults to now
+    
+    Returns:
+        Path: The report file, ``changes_YYYYMMDD_HHMMSS.txt``
+    """
+    report_dir = Path(directory)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_file = report_dir / f"changes_{(timestamp or datetime.now()).strftime('%Y%m%d_%H%M%S')}.txt"
+    with open(report_file, 'a', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as f:
+        f.writelines(format_changes(changes))
+    return report_file
@@ -0,0 +1,172 @@
+import hashlib
+import heapq
+import re
+import struct
+from collections import Counter, defaultdict
+from itertools import combinations
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Number of hashes kept per fingerprint; the error of the similarity
+# estimate shrinks with 1/sqrt(SKETCH_SIZE)
+SKETCH_SIZE = 128
+
+# Hashes used to bucket fingerprints when looking for near-duplicates
+INDEX_BANDS = 8
+
+# Tokens that change on every request, matched on lowercased text: ISO
+# timestamps, times with seconds, UUIDs, Unix epoch seconds or milliseconds,
+# hex hashes and ids of 16+ digits, and base64-like tokens of 32+ characters.
+# Other numbers (job ids, dates, salaries) are content
+_NOISE = re.compile(
+    r'\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:z|[+-]\d{2}:?\d{2})?'
+    r'|\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b'
+    r'|\b[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}\b'
+    r'|\b1\d{9}(?:\d{3})?\b'
+    r'|\b(?=[0-9a-f]*\d)[0-9a-f]{16,}\b'
+    r'|(?<![a-z0-9+/=])(?=[a-z0-9+/=]*\d)[a-z0-9+/=]{32,}'
+)
+
+Fingerprint = Tuple[int, ...]
+
+def normalize_line(line: str) -> str:
+    """Normalize a line so rotating noise doesn't change its fingerprint.
+    
+    Whitespace is collapsed, case is folded and every volatile token
+    (timestamp, UUID, long hash or session token) is replaced by '#', so
+    they compare equal between runs. Other numbers are kept: a new job id,
+    date or salary is a real change.
+    
+    Args:
+        line: Line of extracted content
+    
+    Returns:
+        str: Normalized line
+    """
+    return _NOISE.sub('#', ' '.join(line.lower().split()))
+
+def _normalized_lines(content: str) -> List[str]:
+    """Apply normalize_line() to every line, with one regex pass over the text."""
+    return [' '.join(line.split()) for line in _NOISE.sub('#', content.lower()).splitlines()]
+
+def differs_only_in_noise(previous_content: str, current_content: str) -> bool:
+    """Check whether two snapshots are the same once noise is normalized away.
+    
+    Unlike comparing fingerprints this is exact, so a single new line is
+    never mistaken for noise.
+    
+    Args:
+        previous_content: Previous content
+        current_content: Current content
+    
+    Returns:
+        bool: True if every line matches after normalize_line()
+    """
+    return _normalized_lines(previous_content) == _normalized_lines(current_content)
+
+def _features(content: str) -> Iterator[str]:
+    """Yield one feature per normalized line, numbering repeated lines."""
+    seen: Dict[str, int] = {}
+    for normalized in _normalized_lines(content):
+        if not normalized:
+            continue
+        count = seen.get(normalized, 0)
+        seen[normalized] = count + 1
+        yield f"{normalized}\x00{count}"
+
+def _hash(feature: str) -> int:
+    """Stable 64-bit hash of a feature."""
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def fingerprint(content: str, size: int = SKETCH_SIZE) -> Fingerprint:
+    """Compute a MinHash (bottom-k) fingerprint of a snapshot.
+    
+    The fingerprint holds the smallest hashes of the snapshot's normalized
+    lines, which is enough to estimate the Jaccard similarity of two
+    snapshots without looking at their content.
+    
+    Args:
+        content: Extracted content
+        size: Number of hashes to keep
+    
+    Returns:
+        Fingerprint: Sorted hashes (fewer than size for short content)
+    """
+    return tuple(heapq.nsmallest(size, {_hash(feature) for feature in _features(content)}))
+
+def similarity(first: Sequence[int], second: Sequence[int], size: int = SKETCH_SIZE) -> float:
+    """Estimate the Jaccard similarity of two snapshots from their fingerprints.
+    
+    Args:
+        first: Fingerprint of one snapshot
+        second: Fingerprint of the other snapshot
+        size: Sketch size the fingerprints were computed with
+    
+    Returns:
+        float: Estimated similarity between 0 and 1
+    """
+    if not first and not second:
+        return 1.0
+    if not first or not second:
+        return 0.0
+    shared = set(first).intersection(second)
+    union = sorted(shared.union(first, second))[:size]
+    return sum(1 for value in union if value in shared) / len(union)
+
+def distance(first: Sequence[int], second: Sequence[int], size: int = SKETCH_SIZE) -> float:
+    """Estimate the fraction of lines that differ between two snapshots.
+    
+    Args:
+        first: Fingerprint of one snapshot
+        second: Fingerprint of the other snapshot
+        size: Sketch size the fingerprints were computed with
+    
+    Returns:
+        float: 1 - similarity(), 0 for snapshots that only differ in noise
+    """
+    return 1.0 - similarity(first, second, size)
+
+def pack_fingerprint(value: Sequence[int]) -> bytes:
+    """Serialize a fingerprint for storage."""
+    return struct.pack(f'>{len(value)}Q', *value)
+
+def unpack_fingerprint(data: bytes) -> Fingerprint:
+    """Deserialize a fingerprint written by pack_fingerprint()."""
+    return struct.unpack(f'>{len(data) // 8}Q', data)
+
+def find_near_duplicates(
+    fingerprints: Dict[str, Sequence[int]],
+    min_similarity: float = 0.9
+) -> List[Tuple[str, str, float]]:
+    """Find pairs of sites whose content is nearly the same.
+    
+    Sites are bucketed by the smallest hashes of their fingerprints. Only
+    sites that share enough buckets to possibly reach min_similarity are
+    compared, so the search stays close to linear in the number of sites.
+    
+    Args:
+        fingerprints: Fingerprint of each site's latest snapshot
+        min_similarity: Minimum estimated similarity to report
+    
+    Returns:
+        List[Tuple[str, str, float]]: (site, site, similarity), most similar first
+    """
+    buckets: Dict[int, List[str]] = defaultdict(list)
+    for name, value in fingerprints.items():
+        for band in value[:INDEX_BANDS]:
+            buckets[band].append(name)
+    
+    shared_buckets: Counter = Counter()
+    for names in buckets.values():
+        shared_buckets.update(combinations(sorted(set(names)), 2))
+    
+    # Near-duplicates share most of their smallest hashes
+    required = max(1, int(INDEX_BANDS * min_similarity) // 2)
+    pairs = []
+    for (first, second), count in shared_buckets.items():
+        if count < required:
+            continue
+        score = similarity(fingerprints[first], fingerprints[second])
+        if score >= min_similarity:
+            pairs.append((first, second, round(score, 3)))
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return pairs
@@ -0,0 +1,534 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .blob_store import DEFAULT_COMPRESSION, DEFAULT_DELTA_MIN_BYTES, BlobStore, blob_digest
+from .fingerprint import Fingerprint, fingerprint, pack_fingerprint, unpack_fingerprint
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+DEFAULT_HISTORY_PATH = 'data/history.db'
+
+# Version 1 stored content inline, version 2 keeps it in the blob store,
+# version 3 adds similarity fingerprints, version 4 adds check statistics,
+# version 5 drops fingerprints computed with every number treated as noise
+SCHEMA_VERSION = 5
+
+_SNAPSHOTS_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    content_hash TEXT NOT NULL REFERENCES blobs (hash),
+    selectors TEXT,
+    exclude TEXT,
+    validators TEXT,
+    fingerprint BLOB
+);
+"""
+
+_SCHEMA = _SNAPSHOTS_TABLE.format(table='snapshots') + """
+CREATE INDEX IF NOT EXISTS snapshots_site_time ON snapshots (site, timestamp);
+CREATE TABLE IF NOT EXISTS latest (
+    site TEXT PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS checks (
+    site TEXT PRIMARY KEY,
+    first_checked TEXT NOT NULL,
+    last_checked TEXT NOT NULL,
+    check_count INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+_SNAPSHOT_COLUMNS = 'content_hash, timestamp, selectors, exclude, validators, fingerprint'
+
+def site_key(name: str) -> str:
+    """Get the storage key of a website name (same as the old JSON file stem).
+    
+    Args:
+        name: Website name
+    
+    Returns:
+        str: Storage key
+    """
+    return name.lower().replace(' ', '_')
+
+def _format_time(timestamp: datetime) -> str:
+    """Format a timestamp so that string order is time order."""
+    return timestamp.isoformat(timespec='microseconds')
+
+def _dump(value: Any) -> Optional[str]:
+    """Serialize an optional list/dict column."""
+    return json.dumps(value, ensure_ascii=False) if value else None
+
+def _load(value: Optional[str]) -> Any:
+    """Deserialize an optional list/dict column."""
+    return json.loads(value) if value else None
+
+class HistoryManager:
+    def __init__(
+        self,
+        path: str = DEFAULT_HISTORY_PATH,
+        compression: str = DEFAULT_COMPRESSION,
+        delta_min_bytes: int = DEFAULT_DELTA_MIN_BYTES
+    ):
+        """Open (or create) the snapshot history database.
+        
+        Snapshots are appended, never overwritten. The ``latest`` table keeps a
+        pointer to each site's newest snapshot, so loading it is a single
+        primary-key lookup, and the (site, timestamp) index serves time-range
+        queries. Content lives in a content-addressed BlobStore, so a snapshot
+        identical to an earlier one costs only its metadata row.
+        
+        Args:
+            path: SQLite database file
+            compression: Codec for new content blobs ('zlib' or 'lzma')
+            delta_min_bytes: Store contents of at least this size as deltas
+                against the site's previous version (0 disables deltas)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self.blobs = BlobStore(self._conn, compression, delta_min_bytes)
+        self._migrate()
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+        self._lock = threading.Lock()
+        self._pending: Optional[List[Tuple]] = None
+        self._pending_checks: List[Tuple] = []
+        self._pending_validators: List[Tuple] = []
+        # Duration of the last write transaction, e.g. a batch being flushed
+        self.last_write_seconds = 0.0
+    
+    def _migrate(self) -> None:
+        """Upgrade a database written by an older version."""
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(snapshots)')]
+        if 'content' in columns:
+            self._migrate_inline_content()
+        elif columns and 'fingerprint' not in columns:
+            # Older snapshots get no fingerprint; it is computed when needed
+            self._conn.execute('ALTER TABLE snapshots ADD COLUMN fingerprint BLOB')
+        elif columns and self._conn.execute('PRAGMA user_version').fetchone()[0] < 5:
+            with self._conn:
+                self._conn.execute('UPDATE snapshots SET fingerprint = NULL')
+    
+    def _migrate_inline_content(self) -> None:
+        """Move inline snapshot content of a version 1 database into blobs."""
+        
+        logger.info("Migrating snapshot content in %s to compressed blobs", self.path)
+        previous: Dict[str, str] = {}
+        self._conn.execute('BEGIN')
+        with self._conn:
+            rows = self._conn.execute(
+                'SELECT id, site, timestamp, content, content_hash, selectors, exclude, validators '
+                'FROM snapshots ORDER BY site, timestamp'
+            ).fetchall()
+            migrated = []
+            for snapshot_id, site, timestamp, content, content_hash, selectors, exclude, validators in rows:
+                digest = self.blobs.put(content, content_hash or blob_digest(content), previous.get(site))
+                previous[site] = digest
+                migrated.append((snapshot_id, site, timestamp, digest, selectors, exclude, validators))
+            
+            # SQLite can't drop a column in place: copy into a new table and swap it in
+            self._conn.execute(_SNAPSHOTS_TABLE.format(table='snapshots_v2'))
+            self._conn.executemany(
+                'INSERT INTO snapshots_v2 (id, site, timestamp, content_hash, selectors, exclude, validators) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                migrated
+            )
+            self._conn.execute('DROP TABLE snapshots')
+            self._conn.execute('ALTER TABLE snapshots_v2 RENAME TO snapshots')
+        self._conn.execute('VACUUM')
+    
+    @contextmanager
+    def batch(self) -> Iterator['HistoryManager']:
+        """Group the snapshots added inside the block into one transaction.
+        
+        Snapshots, checks and validator updates recorded in a batch are held
+        in memory and written when the block exits; until then latest()
+        still returns the previous snapshot.
+        """
+        with self._lock:
+            if self._pending is not None:
+                raise RuntimeError("History batch already in progress")
+            self._pending = []
+        try:
+            yield self
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                checks, self._pending_checks = self._pending_checks, []
+                updates, self._pending_validators = self._pending_validators, []
+                self._write(pending, checks, updates)
+    
+    def add_snapshot(
+        self,
+        name: str,
+        content: str,
+        timestamp: datetime,
+        selectors: Optional[list] = None,
+        validators: Optional[Dict[str, str]] = None,
+        content_hash: Optional[str] = None,
+        exclude: Optional[list] = None,
+        fingerprint: Optional[Fingerprint] = None
+    ) -> None:
+        """Append a snapshot for a website.
+        
+        Args:
+            name: Website name
+            content: Extracted content
+            timestamp: Fetch timestamp
+            selectors: Selectors the content was extracted with
+            validators: Cache validators (ETag / Last-Modified / body hash) of the response
+            content_hash: Digest of the extracted content
+            exclude: Exclude selectors the content was extracted with
+            fingerprint: Similarity fingerprint of the content
+        """
+        row = (
+            site_key(name),
+            _format_time(timestamp),
+            content,
+            content_hash or blob_digest(content),
+            _dump(selectors),
+            _dump(exclude),
+            _dump(validators),
+            pack_fingerprint(fingerprint) if fingerprint is not None else None
+        )
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(row)
+            else:
+                self._write([row])
+    
+    def record_check(self, name: str, timestamp: datetime) -> None:
+        """Record a successful check of a website, changed or not.
+        
+        Args:
+            name: Website name
+            timestamp: Time of the check
+        """
+        row = (site_key(name), _format_time(timestamp))
+        with self._lock:
+            if self._pending is not None:
+                self._pending_checks.append(row)
+            else:
+                self._write([], [row])
+    
+    def update_validators(self, name: str, validators: Dict[str, str]) -> None:
+        """Replace the cache validators of a website's newest snapshot.
+        
+        Used when a response's content is unchanged, so no snapshot is
+        added, but its validators are new (e.g. a rotated ETag): the next
+        conditional request must send them to get a 304.
+        
+        Args:
+            name: Website name
+            validators: Cache validators (ETag / Last-Modified / body hash) of the response
+        """
+        row = (_dump(validators), site_key(name))
+        with self._lock:
+            if self._pending is not None:
+                self._pending_validators.append(row)
+            else:
+                self._write([], updates=[row])
+    
+    def _write(self, rows: List[Tuple], checks: List[Tuple] = (), updates: List[Tuple] = ()) -> None:
+        """Store snapshot rows and move the latest pointers in one transaction.
+        
+        Must be called with the lock held.
+        
+        Args:
+            rows: Snapshot rows in insertion order
+            checks: (site, timestamp) rows of checks to record
+            updates: (validators, site) rows of newest snapshot validators to replace
+        """
+        if not rows and not checks and not updates:
+            self.last_write_seconds = 0.0
+            return
+        start = time.perf_counter()
+        with self._conn:
+            self._conn.executemany(
+                'INSERT INTO checks (site, first_checked, last_checked, check_count) VALUES (?, ?, ?, 1) '
+                'ON CONFLICT (site) DO UPDATE SET '
+                'last_checked = MAX(last_checked, excluded.last_checked), check_count = check_count + 1',
+                [(site, timestamp, timestamp) for site, timestamp in checks]
+            )
+            for site, timestamp, content, content_hash, selectors, exclude, validators, packed in rows:
+                previous = self._conn.execute(
+                    'SELECT content_hash FROM latest JOIN snapshots ON snapshots.id = latest.snapshot_id '
+                    'WHERE latest.site = ?',
+                    (site,)
+                ).fetchone()
+                self.blobs.put(content, content_hash, previous[0] if previous else None)
+                cursor = self._conn.execute(
+                    'INSERT INTO snapshots (site, timestamp, content_hash, selectors, exclude, validators, fingerprint) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (site, timestamp, content_hash, selectors, exclude, validators, packed)
+                )
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO latest (site, snapshot_id) VALUES (?, ?)',
+                    (site, cursor.lastrowid)
+                )
+            self._conn.executemany(
+                'UPDATE snapshots SET validators = ? WHERE id = (SELECT snapshot_id FROM latest WHERE site = ?)',
+                updates
+            )
+        self.last_write_seconds = time.perf_counter() - start
+    
+    def _snapshot(self, row: Tuple, cache: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Convert a snapshot row into the dict used by the monitor.
+        
+        Must be called with the lock held.
+        """
+        content_hash, timestamp, selectors, exclude, validators, packed = row
+        return {
+            'content': self.blobs.get(content_hash, cache),
+            'timestamp': datetime.fromisoformat(timestamp),
+            'selectors': _load(selectors),
+            'exclude': _load(exclude),
+            'validators': _load(validators),
+            'content_hash': content_hash,
+            'fingerprint': unpack_fingerprint(packed) if packed is not None else None
+        }
+    
+    def latest(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get the newest snapshot of a website.
+        
+        Args:
+            name: Website name
+        
+        Returns:
+            Optional[Dict[str, Any]]: Snapshot with 'content', 'timestamp',
+            'selectors', 'exclude', 'validators', 'content_hash' and
+            'fingerprint' (None for snapshots stored before fingerprints), if any
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT {_SNAPSHOT_COLUMNS} FROM latest JOIN snapshots ON snapshots.id = latest.snapshot_id '
+                'WHERE latest.site = ?',
+                (site_key(name),)
+            ).fetchone()
+            return self._snapshot(row) if row else None
+    
+    def history(
+        self,
+        name: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Get the snapshots of a website within a time range, oldest first.
+        
+        Args:
+            name: Website name
+            since: Only snapshots taken at or after this time
+            until: Only snapshots taken before this time
+            limit: Maximum number of snapshots, keeping the newest
+        
+        Returns:
+            List[Dict[str, Any]]: Snapshots in time order
+        """
+        query = f'SELECT {_SNAPSHOT_COLUMNS} FROM snapshots WHERE site = ?'
+        params: List[Any] = [site_key(name)]
+        if since is not None:
+            query += ' AND timestamp >= ?'
+            params.append(_format_time(since))
+        if until is not None:
+            query += ' AND timestamp < ?'
+            params.append(_format_time(until))
+        query += ' ORDER BY timestamp DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            cache: Dict[str, str] = {}
+            return [self._snapshot(row, cache) for row in reversed(rows)]
+    
+    def sites(self) -> List[str]:
+        """Get the keys of all websites with at least one snapshot.
+        
+        Returns:
+            List[str]: Site keys
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT site FROM latest ORDER BY site')]
+    
+    def check_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get how often each website was checked and how often it changed.
+        
+        Changes are the snapshots stored after the first recorded check, so
+        the initial snapshot doesn't count.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: By site key, 'first_checked' and
+            'last_checked' (datetime), 'checks' and 'changes'
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT site, first_checked, last_checked, check_count, '
+                '(SELECT COUNT(*) FROM snapshots WHERE snapshots.site = checks.site '
+                'AND snapshots.timestamp > checks.first_checked) '
+                'FROM checks'
+            ).fetchall()
+        return {
+            site: {
+                'first_checked': datetime.fromisoformat(first_checked),
+                'last_checked': datetime.fromisoformat(last_checked),
+                'checks': check_count,
+                'changes': changes
+            }
+            for site, first_checked, last_checked, check_count, changes in rows
+        }
+    
+    def latest_fingerprints(self) -> Dict[str, Fingerprint]:
+        """Get the fingerprint of every site's newest snapshot.
+        
+        Snapshots stored without a fingerprint have it computed from their
+        content.
+        
+        Returns:
+            Dict[str, Fingerprint]: Fingerprint by site key
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT latest.site, snapshots.content_hash, snapshots.fingerprint '
+                'FROM latest JOIN snapshots ON snapshots.id = latest.snapshot_id'
+            ).fetchall()
+            return {
+                site: unpack_fingerprint(packed) if packed is not None else fingerprint(self.blobs.get(content_hash))
+                for site, content_hash, packed in rows
+            }
+    
+    def import_json(self, data_dir: str) -> int:
+        """Import the per-site JSON snapshots written by older versions.
+        
+        Sites that already have history are skipped, so the import can be run
+        more than once. The JSON files are left in place.
+        
+        Args:
+            data_dir: Directory holding ``<site>.json`` files
+        
+        Returns:
+            int: Number of snapshots imported
+        """
+        known = set(self.sites())
+        imported = 0
+        with self.batch():
+            for file_path in sorted(Path(data_dir).glob('*.json')):
+                if file_path.stem in known:
+                    continue
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    self.add_snapshot(
+                        file_path.stem,
+                        data['content'],
+                        datetime.fromisoformat(data['timestamp']),
+                        data.get('selectors'),
+                        data.get('validators'),
+                        data.get('content_hash'),
+                        data.get('exclude')
+                    )
+                    imported += 1
+                except Exception as e:
+                    logger.error("Error importing snapshot %s: %s", file_path, e)
+        
+        if imported:
+            logger.info("Imported %s JSON snapshots from %s into %s", imported, data_dir, self.path)
+        return imported
+    
+    def merge(self, path: str, sites: Optional[Iterable[str]] = None) -> int:
+        """Copy the snapshots and check statistics of another history database.
+        
+        Used to combine the state of sharded runs. Snapshots already present
+        (same site and timestamp) are skipped, so merging the same database
+        again is harmless. A site's check statistics are taken from whichever
+        database checked it last.
+        
+        Args:
+            path: History database to merge into this one
+            sites: Only merge these site keys (default all)
+        
+        Returns:
+            int: Number of snapshots added
+        """
+        source = HistoryManager(path)
+        try:
+            with source._lock:
+                source_rows = source._conn.execute(
+                    'SELECT site, timestamp, content_hash, selectors, exclude, validators, fingerprint '
+                    'FROM snapshots ORDER BY timestamp, id'
+                ).fetchall()
+                checks = source._conn.execute(
+                    'SELECT site, first_checked, last_checked, check_count FROM checks'
+                ).fetchall()
+                if sites is not None:
+                    wanted = set(sites)
+                    source_rows = [row for row in source_rows if row[0] in wanted]
+                    checks = [row for row in checks if row[0] in wanted]
+                
+                with self._lock:
+                    known = set(self._conn.execute('SELECT site, timestamp FROM snapshots'))
+                cache: Dict[str, str] = {}
+                rows = [
+                    (site, timestamp, source.blobs.get(content_hash, cache), content_hash,
+                     selectors, exclude, validators, packed)
+                    for site, timestamp, content_hash, selectors, exclude, validators, packed in source_rows
+                    if (site, timestamp) not in known
+                ]
+        finally:
+            source.close()
+        
+        with self._lock:
+            self._write(rows)
+            with self._conn:
+                # Snapshots older than a site's latest must not move its pointer back
+                for site in {row[0] for row in rows}:
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO latest (site, snapshot_id) '
+                        'SELECT site, id FROM snapshots WHERE site = ? ORDER BY timestamp DESC, id DESC LIMIT 1',
+                        (site,)
+                    )
+                self._conn.executemany(
+                    'INSERT INTO checks (site, first_checked, last_checked, check_count) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (site) DO UPDATE SET first_checked = excluded.first_checked, '
+                    'last_checked = excluded.last_checked, check_count = excluded.check_count '
+                    'WHERE excluded.last_checked > checks.last_checked',
+                    checks
+                )
+        return len(rows)
+    
+    def storage_stats(self) -> Dict[str, int]:
+        """Get snapshot and blob storage statistics.
+        
+        Returns:
+            Dict[str, int]: 'snapshots' plus the BlobStore.stats() counters
+        """
+        with self._lock:
+            snapshots = self._conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+            return {'snapshots': snapshots, **self.blobs.stats()}
+    
+    def compact(self) -> None:
+        """Rewrite the database file without free pages."""
+        with self._lock:
+            self._conn.execute('VACUUM')
+    
+    def close(self) -> None:
+        """Checkpoint the write-ahead log and close the database connection.
+        
+        Truncating the log leaves a single database file behind, which keeps
+        the cached ``data`` directory small.
+        """
+        with self._lock:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self._conn.close()
@@ -1,7 +1,13 @@
 """Website monitoring package."""
 
+from .async_fetcher import AsyncContentFetcher
+from .circuit_breaker import CircuitBreaker
+from .connection_pool import ConnectionManager
 from .content_fetcher import ContentFetcher
 from .rate_limiter import RateLimiter
+from .retry_queue import RetryQueue
+from .revisit import RevisitPolicy
+from .scheduler import Scheduler
 from .website_monitor import WebsiteMonitor
 
-__all__ = ['ContentFetcher', 'RateLimiter', 'WebsiteMonitor']
\ No newline at end of file
+__all__ = ['AsyncContentFetcher', 'CircuitBreaker', 'ConnectionManager', 'ContentFetcher', 'RateLimiter', 'RetryQueue', 'RevisitPolicy', 'Scheduler', 'WebsiteMonitor']
\ No newline at end of file
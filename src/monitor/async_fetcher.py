@@ -0,0 +1,296 @@
+import asyncio
+from concurrent.futures import Executor
+from datetime import datetime
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+import aiohttp
+from .connection_pool import ConnectionManager
+from .content_fetcher import BaseFetcher, FetchInfo, conditional_headers
+from .rate_limiter import RateLimiter
+from .stream_extractor import CHUNK_SIZE, BodyReader, extract_bodies, extract_body
+from .text_extractor import SelectorPlan, compile_plan
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+def _stage_timer(stage: str) -> Tuple[Callable, Callable]:
+    """Create aiohttp trace callbacks that time a stage of a request.
+    
+    The request must be made with a dict as ``trace_request_ctx``; the
+    stage's duration is stored in it under the stage name.
+    
+    Args:
+        stage: Stage name, e.g. 'dns'
+    
+    Returns:
+        Tuple[Callable, Callable]: Callbacks for the start and end signals
+    """
+    async def on_start(session, context, params) -> None:
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx[f"_{stage}_start"] = time.perf_counter()
+    
+    async def on_end(session, context, params) -> None:
+        timings = context.trace_request_ctx
+        if timings is not None and f"_{stage}_start" in timings:
+            timings[stage] = time.perf_counter() - timings.pop(f"_{stage}_start")
+    
+    return on_start, on_end
+
+def _timing_trace_config() -> aiohttp.TraceConfig:
+    """Create a trace config that times DNS lookups and new connections."""
+    trace_config = aiohttp.TraceConfig()
+    for stage, start_signal, end_signal in (
+        ('dns', trace_config.on_dns_resolvehost_start, trace_config.on_dns_resolvehost_end),
+        ('connect', trace_config.on_connection_create_start, trace_config.on_connection_create_end)
+    ):
+        on_start, on_end = _stage_timer(stage)
+        start_signal.append(on_start)
+        end_signal.append(on_end)
+    return trace_config
+
+class AsyncContentFetcher(BaseFetcher):
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_connections: int = 100,
+        max_connections_per_host: int = 0,
+        parser: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        streaming: bool = False,
+        parse_pool: Optional[Executor] = None,
+        connection_manager: Optional[ConnectionManager] = None
+    ):
+        """Initialize the asyncio content fetcher.
+        
+        The aiohttp session is created lazily on first use so the fetcher can
+        be constructed outside of a running event loop.
+        
+        Args:
+            headers: Optional custom headers for requests
+            rate_limiter: Per-domain rate limiter (default: one request per second)
+            max_connections: Maximum number of open connections in total
+            max_connections_per_host: Maximum open connections per host (0 = unlimited)
+            parser: Default HTML parser backend (see text_extractor.PARSER_BACKENDS)
+            max_bytes: Default limit on bytes read per response (None = unlimited)
+            streaming: Extract content incrementally while the body downloads
+            parse_pool: Executor that parses buffered bodies off the event loop
+            connection_manager: Supplies the DNS cache TTL and the stats the
+                session's connections are counted in
+        """
+        super().__init__(headers, rate_limiter, parser, max_bytes, streaming, parse_pool, connection_manager)
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    async def fetch_content(
+        self,
+        url: str,
+        selectors: list,
+        parser: Optional[str] = None,
+        exclude: Optional[list] = None,
+        max_bytes: Optional[int] = None,
+        streaming: Optional[bool] = None,
+        info: Optional[FetchInfo] = None
+    ) -> Tuple[Optional[str], datetime]:
+        """Fetch and extract content from a website.
+        
+        Same contract as ContentFetcher.fetch_content: conditional requests,
+        body-hash short-circuit, size limit and optional streaming extraction.
+        
+        Args:
+            url: Website URL
+            selectors: List of CSS selectors (or a compiled SelectorPlan) to extract content from
+            parser: HTML parser backend for this page, defaults to the fetcher's
+            exclude: CSS selectors whose subtrees are left out of the content
+            max_bytes: Limit on bytes read for this page, defaults to the fetcher's
+            streaming: Stream this page, defaults to the fetcher's setting
+            info: Validators to send, filled in with the response's
+                validators, outcome, stats and timings
+        
+        Returns:
+            Tuple[Optional[str], datetime]: Extracted content (None if the page
+            was not modified) and timestamp
+        
+        Raises:
+            aiohttp.ClientError: If the request fails
+        """
+        plan = selectors if isinstance(selectors, SelectorPlan) else compile_plan(selectors, exclude)
+        return await self._request(
+            url,
+            info or FetchInfo(),
+            lambda encoding: self._body_reader(url, plan, encoding, parser, max_bytes, streaming),
+            self._finish_body_async
+        )
+    
+    async def fetch_shared(
+        self,
+        url: str,
+        plans: Sequence[SelectorPlan],
+        parsers: Optional[Sequence[Optional[str]]] = None,
+        max_bytes: Optional[int] = None,
+        body_hashes: Optional[Sequence[Optional[str]]] = None,
+        info: Optional[FetchInfo] = None
+    ) -> Tuple[Optional[List[Optional[str]]], datetime]:
+        """Fetch a page once and extract the content of several sites from it.
+        
+        Same contract as ContentFetcher.fetch_shared.
+        
+        Args:
+            url: Website URL
+            plans: Compiled selector plan of each site
+            parsers: Parser backend of each site, None for the fetcher's
+            max_bytes: Limit on bytes read for this page, defaults to the fetcher's
+            body_hashes: Body digest each site saw last run
+            info: Validators to send, filled in with the response's
+                validators, outcome, stats and timings
+        
+        Returns:
+            Tuple[Optional[List[Optional[str]]], datetime]: Content of each
+            site (None for a site whose body is unchanged), or None if the
+            page was not modified or is unchanged for every site, and timestamp
+        
+        Raises:
+            aiohttp.ClientError: If the request fails
+        """
+        parsers = parsers or [None] * len(plans)
+        body_hashes = body_hashes or [None] * len(plans)
+        
+        async def finish(url: str, response_headers, reader: BodyReader, info: FetchInfo):
+            if self.parse_pool is None:
+                return self._finish_shared(info, url, response_headers, reader, plans, parsers, body_hashes)
+            start = time.perf_counter()
+            jobs, body_hash = self._shared_jobs(reader, plans, parsers, body_hashes)
+            loop = asyncio.get_running_loop()
+            extracted = await asyncio.gather(*(loop.run_in_executor(self.parse_pool, extract_bodies, *job) for _, job in jobs))
+            results = [(indexes, contents) for (indexes, _), contents in zip(jobs, extracted)]
+            return self._record_shared(info, url, response_headers, reader, len(plans), results, body_hash, time.perf_counter() - start)
+        
+        return await self._request(
+            url,
+            info or FetchInfo(),
+            lambda encoding: self._shared_reader(plans, encoding, max_bytes),
+            finish
+        )
+    
+    async def _request(
+        self,
+        url: str,
+        info: FetchInfo,
+        new_reader: Callable[[str], BodyReader],
+        finish: Callable[..., Awaitable[Tuple[Any, datetime]]]
+    ) -> Tuple[Any, datetime]:
+        """Make a (conditional) GET and feed the body into a reader.
+        
+        Args:
+            url: Website URL
+            info: State of this fetch
+            new_reader: Creates the body reader for the response charset
+            finish: Coroutine called with the URL, response headers, reader
+                and info once the body is read
+        
+        Returns:
+            Tuple[Any, datetime]: Result of finish, or None and the timestamp
+            if the server answered 304
+        
+        Raises:
+            aiohttp.ClientError: If the request fails
+        """
+        await self.rate_limiter.acquire_async(urlparse(url).netloc)
+        session = self._get_session()
+        
+        try:
+            timings = info.timings
+            start = time.perf_counter()
+            async with session.get(
+                url,
+                headers=conditional_headers(info.request_validators),
+                trace_request_ctx=timings
+            ) as response:
+                timings['ttfb'] = time.perf_counter() - start
+                if response.status == 304:
+                    return self._not_modified(info)
+                response.raise_for_status()
+                
+                reader = new_reader(response.charset or 'utf-8')
+                download_start = time.perf_counter()
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    if not reader.feed(chunk):
+                        break
+                timings['download'] = time.perf_counter() - download_start
+            
+            return await finish(url, response.headers, reader, info)
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Error fetching content from %s: %s", url, e)
+            raise
+    
+    async def _finish_body_async(
+        self,
+        url: str,
+        response_headers,
+        reader: BodyReader,
+        info: FetchInfo
+    ) -> Tuple[Optional[str], datetime]:
+        """Extract the content read for a URL without blocking the event loop.
+        
+        Buffered bodies are parsed in the parse pool if there is one, while
+        the loop keeps serving other downloads.
+        
+        Args:
+            url: Website URL
+            response_headers: Response header mapping
+            reader: Reader the body was fed into
+            info: State of this fetch
+        
+        Returns:
+            Tuple[Optional[str], datetime]: Extracted content (None if the body
+            is unchanged) and timestamp
+        """
+        if self.parse_pool is None or reader.streaming:
+            return self._finish_body(url, response_headers, reader, info)
+        
+        start = time.perf_counter()
+        job, body_hash = reader.finish_deferred(info.request_validators.get('body_hash'))
+        content = None
+        if job:
+            content, timings = await asyncio.get_running_loop().run_in_executor(self.parse_pool, extract_body, *job)
+            info.timings.update(timings)
+        return self._record_body(info, url, response_headers, reader, content, body_hash, time.perf_counter() - start)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the aiohttp session, creating it on first use.
+        
+        Returns:
+            aiohttp.ClientSession: Shared client session
+        """
+        if self.session is None or self.session.closed:
+            dns_ttl = self.connection_manager.dns.ttl
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                use_dns_cache=dns_ttl > 0,
+                ttl_dns_cache=dns_ttl or None
+            )
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30),
+                trace_configs=[_timing_trace_config(), self.connection_manager.trace_config()]
+            )
+        return self.session
+    
+    async def close(self) -> None:
+        """Close the aiohttp session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def __aenter__(self):
+        """Async context manager enter."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+DEFAULT_BREAKER_PATH = 'data/circuit_breakers.json'
+
+# Circuit states reported by CircuitBreaker.state()
+CLOSED = 'closed'        # Fetches go through
+OPEN = 'open'            # Fetches are skipped until the cooldown is up
+HALF_OPEN = 'half_open'  # Cooldown is up, one probe fetch decides
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_BREAKER_PATH,
+        failure_threshold: int = 5,
+        cooldown: float = 300,
+        max_cooldown: float = 86400
+    ):
+        """Initialize per-domain circuit breakers, persisted between runs.
+        
+        A domain's circuit opens after failure_threshold fetches from it
+        failed in a row, and its sites are skipped while it is open. Once the
+        cooldown is up a single fetch is let through as a probe: if it
+        succeeds the circuit closes, otherwise it opens again for twice as
+        long, up to max_cooldown.
+        
+        Args:
+            path: JSON file the state is kept in, None to keep it in memory
+            failure_threshold: Consecutive failures that open a circuit
+            cooldown: Seconds a circuit stays open at first
+            max_cooldown: Longest a circuit stays open
+        """
+        self.path = Path(path) if path else None
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown)
+        self.max_cooldown = max(float(max_cooldown), self.cooldown)
+        self._lock = threading.Lock()
+        self._probing: Set[str] = set()
+        self._dirty = False
+        self._domains: Dict[str, Dict[str, Any]] = self._load()
+    
+    @classmethod
+    def from_config(
+        cls,
+        breaker_config: Optional[Dict[str, Any]],
+        path: Optional[str] = None
+    ) -> Optional['CircuitBreaker']:
+        """Create breakers from a ``monitoring.circuit_breaker`` config section.
+        
+        Args:
+            breaker_config: Mapping with optional 'enabled', 'failures',
+                'cooldown', 'max_cooldown' and 'path' keys
+            path: State file to use instead of the configured one
+        
+        Returns:
+            Optional[CircuitBreaker]: Configured breakers, None if disabled
+        """
+        breaker_config = breaker_config or {}
+        if not breaker_config.get('enabled', True):
+            return None
+        return cls(
+            path=path or breaker_config.get('path', DEFAULT_BREAKER_PATH),
+            failure_threshold=breaker_config.get('failures', 5),
+            cooldown=breaker_config.get('cooldown', 300),
+            max_cooldown=breaker_config.get('max_cooldown', 86400)
+        )
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the saved state, empty if there is none."""
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error("Error loading circuit breaker state, starting with closed circuits: %s", e)
+            return {}
+    
+    def save(self) -> None:
+        """Write the state if it changed, replacing the file atomically."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            data = json.dumps(self._domains, indent=2, sort_keys=True)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.path.with_name(self.path.name + '.tmp')
+            temp_file.write_text(data, encoding='utf-8')
+            os.replace(temp_file, self.path)
+        except OSError as e:
+            logger.error("Error saving circuit breaker state: %s", e)
+    
+    def _state(self, domain: str, now: float) -> str:
+        """Get a domain's state. Must be called with the lock held."""
+        entry = self._domains.get(domain)
+        if not entry or entry.get('opened') is None:
+            return CLOSED
+        return OPEN if now < entry['opened'] + entry['cooldown'] else HALF_OPEN
+    
+    def state(self, domain: str, now: Optional[float] = None) -> str:
+        """Get the state of a domain's circuit.
+        
+        Args:
+            domain: Host (and port) of the websites
+            now: Current epoch time, defaults to now
+        
+        Returns:
+            str: CLOSED, OPEN or HALF_OPEN
+        """
+        with self._lock:
+            return self._state(domain, time.time() if now is None else now)
+    
+    def allow(self, domain: str, now: Optional[float] = None) -> bool:
+        """Check whether a domain may be fetched from.
+        
+        The first caller after the cooldown gets to make the probe; the
+        circuit stays half-open for everyone else until its result is recorded.
+        
+        Args:
+            domain: Host (and port) of the website
+            now: Current epoch time, defaults to now
+        
+        Returns:
+            bool: True if the fetch may be made
+        """
+        with self._lock:
+            state = self._state(domain, time.time() if now is None else now)
+            if state == CLOSED:
+                return True
+            if state == OPEN or domain in self._probing:
+                return False
+            self._probing.add(domain)
+            return True
+    
+    def record_success(self, domain: str) -> None:
+        """Record a fetch the domain answered, closing its circuit.
+        
+        Args:
+            domain: Host (and port) of the website
+        """
+        with self._lock:
+            probe = domain in self._probing
+            self._probing.discard(domain)
+            if self._domains.pop(domain, None) is not None:
+                self._dirty = True
+        if probe:
+            logger.info("Probe of %s succeeded, its circuit is closed again", domain)
+    
+    def record_failure(self, domain: str, now: Optional[float] = None) -> bool:
+        """Record a failed fetch, opening the circuit if the domain keeps failing.
+        
+        Args:
+            domain: Host (and port) of the website
+            now: Current epoch time, defaults to now
+        
+        Returns:
+            bool: True if the domain's circuit is open now
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            probe = domain in self._probing
+            self._probing.discard(domain)
+            entry = self._domains.setdefault(domain, {'failures': 0, 'opened': None, 'cooldown': self.cooldown})
+            entry['failures'] += 1
+            self._dirty = True
+            if probe:
+                entry['cooldown'] = min(entry['cooldown'] * 2, self.max_cooldown)
+            elif entry['opened'] is not None or entry['failures'] < self.failure_threshold:
+                return entry['opened'] is not None
+            entry['opened'] = now
+            failures, cooldown = entry['failures'], entry['cooldown']
+        logger.warning(
+            "%s failed %d times in a row, skipping its websites for %ds",
+            domain,
+            failures,
+            cooldown
+        )
+        return True
+    
+    def open_domains(self, now: Optional[float] = None) -> List[str]:
+        """Get the domains whose circuit is open.
+        
+        Args:
+            now: Current epoch time, defaults to now
+        
+        Returns:
+            List[str]: Domains, sorted
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return sorted(domain for domain in self._domains if self._state(domain, now) == OPEN)
@@ -0,0 +1,369 @@
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util import connection
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+DEFAULT_DNS_TTL = 300
+
+# Host pools kept by a session; hosts beyond this evict each other's idle connections
+DEFAULT_MAX_HOSTS = 100
+
+# Connections kept per host, as requests does by default
+DEFAULT_PER_HOST = 10
+
+# Counters kept by ConnectionStats
+STAT_FIELDS = (
+    'requests',
+    'new_connections',
+    'reused_connections',
+    'pool_waits',
+    'pool_wait_seconds',
+    'dns_hits',
+    'dns_misses'
+)
+
+class ConnectionStats:
+    def __init__(self):
+        """Initialize thread-safe connection counters."""
+        self._counts: Dict[str, float] = dict.fromkeys(STAT_FIELDS, 0)
+        self._lock = threading.Lock()
+    
+    def add(self, field: str, amount: float = 1) -> None:
+        """Increase a counter.
+        
+        Args:
+            field: One of STAT_FIELDS
+            amount: Increment
+        """
+        with self._lock:
+            self._counts[field] += amount
+    
+    def snapshot(self) -> Dict[str, float]:
+        """Get the current counter values."""
+        with self._lock:
+            return dict(self._counts)
+    
+    def since(self, previous: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Get the counters accumulated since an earlier snapshot.
+        
+        Args:
+            previous: Result of snapshot(), None for all counts so far
+        
+        Returns:
+            Dict[str, Any]: Counter deltas plus 'reuse_ratio', the share of
+            requests that didn't open a new connection
+        """
+        current = self.snapshot()
+        delta = {field: current[field] - (previous or {}).get(field, 0) for field in STAT_FIELDS}
+        delta['pool_wait_seconds'] = round(delta['pool_wait_seconds'], 6)
+        requests_made = delta['requests']
+        delta['reuse_ratio'] = round(
+            max(0.0, 1 - delta['new_connections'] / requests_made) if requests_made else 0.0,
+            4
+        )
+        return delta
+
+class DnsCache:
+    def __init__(self, ttl: float = DEFAULT_DNS_TTL, stats: Optional[ConnectionStats] = None):
+        """Initialize a thread-safe DNS cache.
+        
+        Args:
+            ttl: Seconds a resolved address is reused (0 disables caching)
+            stats: Counters for cache hits and misses
+        """
+        self.ttl = ttl
+        self.stats = stats or ConnectionStats()
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[tuple]]] = {}
+        self._lock = threading.Lock()
+    
+    def resolve(self, host: str, port: int) -> List[tuple]:
+        """Resolve a host to TCP addresses, from the cache if still fresh.
+        
+        Args:
+            host: Host name or address
+            port: TCP port
+        
+        Returns:
+            List[tuple]: getaddrinfo() results
+        
+        Raises:
+            socket.gaierror: If the name can't be resolved
+        """
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self.stats.add('dns_hits')
+            return entry[1]
+        
+        self.stats.add('dns_misses')
+        addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+    
+    def forget(self, host: str, port: int) -> None:
+        """Drop a cached address, e.g. after connecting to it failed."""
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+class _CachedDnsConnectionMixin:
+    """Connect to the addresses from the manager's DNS cache instead of resolving again."""
+    
+    manager: 'ConnectionManager' = None
+    
+    def connect(self) -> None:
+        """Connect, adding the DNS lookup and the rest of connecting to the request's timings."""
+        self._dns_seconds = 0.0
+        start = time.perf_counter()
+        super().connect()
+        seconds = time.perf_counter() - start
+        self.manager._add_timing('dns', self._dns_seconds)
+        self.manager._add_timing('connect', seconds - self._dns_seconds)
+    
+    def _new_conn(self) -> socket.socket:
+        """Open a socket to the first cached address that accepts it.
+        
+        Addresses are tried in getaddrinfo() order, so a dual-stack host
+        whose first address is unreachable is still reached through the
+        others. The cache entry is only dropped if none of them connects.
+        Errors are raised as urllib3's own _new_conn() raises them.
+        """
+        host, port = self.host, self.port
+        start = time.perf_counter()
+        try:
+            addresses = self.manager.dns.resolve(host, port)
+        except socket.gaierror as e:
+            raise NameResolutionError(host, self, e) from e
+        self._dns_seconds = time.perf_counter() - start
+        
+        error: Optional[OSError] = None
+        for address in addresses:
+            # TLS verification and SNI use self.host, only the socket goes to the address
+            try:
+                sock = connection.create_connection(
+                    (address[4][0], port),
+                    self.timeout,
+                    source_address=self.source_address,
+                    socket_options=self.socket_options
+                )
+            except OSError as e:
+                error = e
+                continue
+            sys.audit("http.client.connect", self, host, port)
+            self.manager.stats.add('new_connections')
+            return sock
+        
+        self.manager.dns.forget(host, port)
+        if isinstance(error, socket.timeout):
+            raise ConnectTimeoutError(
+                self,
+                f"Connection to {host} timed out. (connect timeout={self.timeout})"
+            ) from error
+        raise NewConnectionError(self, f"Failed to establish a new connection: {error}") from error
+
+class _CountingPoolMixin:
+    """Count reused connections and the requests that had to wait for a free one."""
+    
+    manager: 'ConnectionManager' = None
+    
+    def _get_conn(self, timeout: Optional[float] = None):
+        """Take a connection from the pool, timing the wait if it was empty."""
+        if self.pool is None or not self.pool.empty():
+            conn = super()._get_conn(timeout)
+        else:
+            start = time.perf_counter()
+            conn = super()._get_conn(timeout)
+            self.manager.stats.add('pool_waits')
+            self.manager.stats.add('pool_wait_seconds', time.perf_counter() - start)
+        # Pooled connections that are still open keep their socket
+        if getattr(conn, 'sock', None) is not None:
+            self.manager.stats.add('reused_connections')
+        return conn
+
+class _PooledAdapter(HTTPAdapter):
+    def __init__(self, manager: 'ConnectionManager'):
+        """Initialize an adapter whose pools use the manager's DNS cache and counters.
+        
+        Args:
+            manager: Owning connection manager
+        """
+        self.manager = manager
+        super().__init__(
+            pool_connections=manager.max_hosts,
+            pool_maxsize=manager.per_host,
+            pool_block=True
+        )
+    
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        """Create the pool manager with the manager's pool classes."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self.manager.pool_classes
+    
+    def send(self, request, **kwargs):
+        """Send a request, counting it."""
+        self.manager.stats.add('requests')
+        return super().send(request, **kwargs)
+
+class ConnectionManager:
+    def __init__(
+        self,
+        per_host: int = DEFAULT_PER_HOST,
+        max_hosts: int = DEFAULT_MAX_HOSTS,
+        dns_ttl: float = DEFAULT_DNS_TTL
+    ):
+        """Initialize the HTTP connection manager shared by all fetch threads.
+        
+        Each host keeps up to per_host connections alive between requests.
+        A request that finds all of them busy waits for one instead of
+        opening a connection that would be thrown away afterwards. Up to
+        max_hosts hosts keep their pools; beyond that the least recently used
+        host's connections are closed. Host names are resolved once per
+        dns_ttl.
+        
+        Args:
+            per_host: Connections kept per host, at least the number of
+                concurrent requests to one host
+            max_hosts: Hosts whose connections are kept
+            dns_ttl: Seconds a resolved address is reused (0 disables the DNS cache)
+        """
+        self.per_host = max(1, int(per_host))
+        self.max_hosts = max(1, int(max_hosts))
+        self.stats = ConnectionStats()
+        self.dns = DnsCache(dns_ttl, self.stats)
+        connection_classes = {
+            scheme: type(f"CachedDns{base.__name__}", (_CachedDnsConnectionMixin, base), {'manager': self})
+            for scheme, base in (('http', HTTPConnection), ('https', HTTPSConnection))
+        }
+        self.pool_classes = {
+            scheme: type(
+                f"Counting{base.__name__}",
+                (_CountingPoolMixin, base),
+                {'manager': self, 'ConnectionCls': connection_classes[scheme]}
+            )
+            for scheme, base in (('http', HTTPConnectionPool), ('https', HTTPSConnectionPool))
+        }
+        self._sessions: List[requests.Session] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    @classmethod
+    def from_config(
+        cls,
+        config: Optional[Dict[str, Any]],
+        per_host: int = DEFAULT_PER_HOST,
+        hosts: int = 0
+    ) -> 'ConnectionManager':
+        """Create a connection manager from the ``monitoring.connections`` config.
+        
+        Args:
+            config: Mapping with optional 'per_host', 'max_hosts' and 'dns_ttl'
+            per_host: Default connections per host, e.g. the per-domain limit
+            hosts: Number of configured hosts; max_hosts defaults to at least this
+        
+        Returns:
+            ConnectionManager: Configured manager
+        """
+        config = config or {}
+        return cls(
+            per_host=int(config.get('per_host', per_host)),
+            max_hosts=int(config.get('max_hosts', max(DEFAULT_MAX_HOSTS, hosts))),
+            dns_ttl=float(config.get('dns_ttl', DEFAULT_DNS_TTL))
+        )
+    
+    def session(self, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+        """Create a requests session that uses the managed pools.
+        
+        A session can be used by many threads at once.
+        
+        Args:
+            headers: Default headers of the session
+        
+        Returns:
+            requests.Session: Session with pooled adapters mounted
+        """
+        session = requests.Session()
+        if headers:
+            session.headers.update(headers)
+        adapter = _PooledAdapter(self)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        with self._lock:
+            self._sessions.append(session)
+        return session
+    
+    @contextmanager
+    def timing(self, timings: Dict[str, float]) -> Iterator[None]:
+        """Time the connections the calling thread opens for a request.
+        
+        While the block runs, a new connection adds its DNS lookup to
+        timings['dns'] and the rest of connecting, including the TLS
+        handshake, to timings['connect']. A reused connection adds nothing.
+        
+        Args:
+            timings: Timings of the request made in the block
+        """
+        previous = getattr(self._local, 'timings', None)
+        self._local.timings = timings
+        try:
+            yield
+        finally:
+            self._local.timings = previous
+    
+    def _add_timing(self, stage: str, seconds: float) -> None:
+        """Add seconds to a stage of the calling thread's request, if it is timed."""
+        timings = getattr(self._local, 'timings', None)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Create an aiohttp trace config that counts into the same stats.
+        
+        Returns:
+            aiohttp.TraceConfig: Counts requests, new and reused connections,
+            connection queue waits and DNS cache hits
+        """
+        stats = self.stats
+        trace_config = aiohttp.TraceConfig()
+        
+        def counter(field: str):
+            async def on_signal(session, context, params) -> None:
+                stats.add(field)
+            return on_signal
+        
+        async def on_queued_start(session, context, params) -> None:
+            context.pool_wait_start = time.perf_counter()
+        
+        async def on_queued_end(session, context, params) -> None:
+            stats.add('pool_waits')
+            stats.add('pool_wait_seconds', time.perf_counter() - context.pool_wait_start)
+        
+        trace_config.on_request_start.append(counter('requests'))
+        trace_config.on_connection_create_end.append(counter('new_connections'))
+        trace_config.on_connection_reuseconn.append(counter('reused_connections'))
+        trace_config.on_dns_cache_hit.append(counter('dns_hits'))
+        trace_config.on_dns_cache_miss.append(counter('dns_misses'))
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        return trace_config
+    
+    def close(self) -> None:
+        """Close every session created by the manager."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
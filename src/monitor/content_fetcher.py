@@ -1,88 +1,553 @@
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import Executor
 from datetime import datetime
+import hashlib
 import time
-from typing import Dict, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+from .connection_pool import ConnectionManager
+from .rate_limiter import RateLimiter
+from .stream_extractor import CHUNK_SIZE, BodyReader, extract_bodies, extract_body, streaming_supported
+from .text_extractor import SelectorPlan, compile_plan
 from ..utils.logger import Logger
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 logger = Logger.get_logger()
 
-class ContentFetcher:
-    def __init__(self, headers: Optional[Dict[str, str]] = None):
-        """Initialize the content fetcher.
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Fetch outcomes reported in FetchInfo.outcome
+FETCH_MODIFIED = 'modified'
+FETCH_NOT_MODIFIED = 'not_modified'      # Server answered 304
+FETCH_BODY_UNCHANGED = 'body_unchanged'  # Body hash matched, parsing skipped
+
+def content_digest(data) -> str:
+    """Get the SHA-256 hex digest of a response body or extracted text.
+    
+    Args:
+        data: Bytes or text to hash
+        
+    Returns:
+        str: Hex digest
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+def conditional_headers(validators: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Build conditional GET headers from stored validators.
+    
+    Args:
+        validators: Validators saved from a previous response ('etag', 'last_modified')
+        
+    Returns:
+        Dict[str, str]: If-None-Match / If-Modified-Since headers
+    """
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+def response_validators(headers) -> Dict[str, str]:
+    """Extract cache validators from response headers.
+    
+    Args:
+        headers: Case-insensitive response header mapping
+        
+    Returns:
+        Dict[str, str]: Validators present in the response
+    """
+    validators = {}
+    if headers.get('ETag'):
+        validators['etag'] = headers['ETag']
+    if headers.get('Last-Modified'):
+        validators['last_modified'] = headers['Last-Modified']
+    return validators
+
+class FetchInfo:
+    def __init__(self, validators: Optional[Dict[str, str]] = None):
+        """Hold what a single fetch was made with and what it found.
+        
+        Each fetch_content() or fetch_shared() call gets its own, so fetches
+        of the same URL that run at the same time never see each other's
+        validators, outcome or stats.
+        
+        Args:
+            validators: Validators of a stored snapshot ('etag',
+                'last_modified', 'body_hash') to make the request
+                conditional with, None for an unconditional request
+        """
+        self.request_validators: Dict[str, str] = dict(validators or {})
+        # Validators of the full response ('etag', 'last_modified', 'body_hash'), empty after a 304
+        self.validators: Dict[str, str] = {}
+        # FETCH_MODIFIED, FETCH_NOT_MODIFIED or FETCH_BODY_UNCHANGED
+        self.outcome = FETCH_MODIFIED
+        # 'bytes_read', 'peak_bytes', 'truncated', 'streamed' and
+        # 'parse_seconds' (time spent extracting once the body was read),
+        # empty if no body was read
+        self.stats: Dict[str, Any] = {}
+        # Seconds spent per stage: 'ttfb' (from sending the request to the
+        # response headers), 'download' (reading the body, including
+        # streaming extraction), 'dns' and 'connect' when the request opened
+        # a new connection (both part of 'ttfb'), and 'parse' and 'match'
+        # (building the tree of a buffered body and matching the selectors)
+        self.timings: Dict[str, float] = {}
+
+class BaseFetcher:
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        parser: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        streaming: bool = False,
+        parse_pool: Optional[Executor] = None,
+        connection_manager: Optional[ConnectionManager] = None
+    ):
+        """Initialize state shared by the blocking and asyncio fetchers.
         
         Args:
             headers: Optional custom headers for requests
+            rate_limiter: Per-domain rate limiter (default: one request per second)
+            parser: Default HTML parser backend (see text_extractor.PARSER_BACKENDS)
+            max_bytes: Default limit on bytes read per response (None = unlimited)
+            streaming: Extract content incrementally while the body downloads
+            parse_pool: Executor (e.g. a process pool) that parses buffered
+                bodies, instead of the fetching thread
+            connection_manager: Connection pools, DNS cache and connection
+                stats, shared with other fetchers (default: a private one)
         """
-        self.headers = headers or {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        self.session = requests.Session()
-        self._last_request_time: Dict[str, float] = {}
-        self._min_request_interval = 1.0  # Minimum seconds between requests to same domain
-    
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True
-    )
-    def fetch_content(self, url: str, selectors: list) -> Tuple[str, datetime]:
-        """Fetch and extract content from a website.
+        self.headers = headers or dict(DEFAULT_HEADERS)
+        self.parser = parser
+        self.max_bytes = max_bytes
+        self.streaming = streaming
+        self.parse_pool = parse_pool
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.connection_manager = connection_manager or ConnectionManager()
+    
+    def _body_reader(
+        self,
+        url: str,
+        plan: SelectorPlan,
+        encoding: str,
+        parser: Optional[str],
+        max_bytes: Optional[int],
+        streaming: Optional[bool]
+    ) -> BodyReader:
+        """Create the reader for a response body, applying fetcher defaults.
         
         Args:
             url: Website URL
-            selectors: List of CSS selectors to extract content from
+            plan: Compiled selector plan
+            encoding: Character encoding of the response
+            parser: Parser backend override
+            max_bytes: Size limit override
+            streaming: Streaming override
             
         Returns:
-            Tuple[str, datetime]: Extracted content and timestamp
+            BodyReader: Reader to feed the body into
+        """
+        streaming = self.streaming if streaming is None else streaming
+        if streaming and not streaming_supported(plan):
+            logger.warning("Selectors for %s can't be matched while streaming, buffering the body", url)
+            streaming = False
+        return BodyReader(
+            plan,
+            encoding,
+            max_bytes or self.max_bytes,
+            streaming,
+            parser or self.parser
+        )
+    
+    def _finish_body(
+        self,
+        url: str,
+        response_headers,
+        reader: BodyReader,
+        info: FetchInfo
+    ) -> Tuple[Optional[str], datetime]:
+        """Extract the content read for a URL and record validators and stats.
+        
+        Buffered bodies are parsed in the parse pool if there is one; the
+        calling thread waits for the result.
+        
+        Args:
+            url: Website URL
+            response_headers: Response header mapping
+            reader: Reader the body was fed into
+            info: State of this fetch
             
-        Raises:
-            requests.RequestException: If request fails after retries
+        Returns:
+            Tuple[Optional[str], datetime]: Extracted content (None if the body
+            is unchanged) and timestamp
         """
-        self._respect_rate_limit(url)
+        start = time.perf_counter()
+        previous_hash = info.request_validators.get('body_hash')
+        if self.parse_pool is not None and not reader.streaming:
+            job, body_hash = reader.finish_deferred(previous_hash)
+            content = None
+            if job:
+                content, timings = self.parse_pool.submit(extract_body, *job).result()
+                info.timings.update(timings)
+        else:
+            content, body_hash = reader.finish(previous_hash)
+            info.timings.update(reader.timings)
+        return self._record_body(info, url, response_headers, reader, content, body_hash, time.perf_counter() - start)
+    
+    def _shared_reader(
+        self,
+        plans: Sequence[SelectorPlan],
+        encoding: str,
+        max_bytes: Optional[int]
+    ) -> BodyReader:
+        """Create the buffering reader for a page fetched for several sites.
         
-        try:
-            response = self.session.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
+        Args:
+            plans: Compiled selector plans of the sites
+            encoding: Character encoding of the response
+            max_bytes: Size limit override shared by the sites
+        
+        Returns:
+            BodyReader: Configured reader
+        """
+        return BodyReader(plans[0], encoding, max_bytes or self.max_bytes, False)
+    
+    def _shared_jobs(
+        self,
+        reader: BodyReader,
+        plans: Sequence[SelectorPlan],
+        parsers: Sequence[Optional[str]],
+        body_hashes: Sequence[Optional[str]]
+    ) -> Tuple[List[Tuple[List[int], Tuple]], str]:
+        """Finish a shared body and group the plans that need parsing by parser.
+        
+        Args:
+            reader: Buffering reader the body was fed into
+            plans: Compiled selector plans of the sites
+            parsers: Parser backend override of each site
+            body_hashes: Body digest each site saw last run
+        
+        Returns:
+            Tuple[List[Tuple[List[int], Tuple]], str]: Plan indexes and
+            extract_bodies() arguments for each parse, and the body digest
+        """
+        job, body_hash = reader.finish_deferred()
+        body, encoding = job[0], job[1]
+        by_parser: Dict[Optional[str], List[int]] = {}
+        for index, previous_hash in enumerate(body_hashes):
+            if previous_hash != body_hash:
+                by_parser.setdefault(parsers[index] or self.parser, []).append(index)
+        jobs = [
+            (indexes, (body, encoding, [plans[index] for index in indexes], parser))
+            for parser, indexes in by_parser.items()
+        ]
+        return jobs, body_hash
+    
+    def _finish_shared(
+        self,
+        info: FetchInfo,
+        url: str,
+        response_headers,
+        reader: BodyReader,
+        plans: Sequence[SelectorPlan],
+        parsers: Sequence[Optional[str]],
+        body_hashes: Sequence[Optional[str]]
+    ) -> Tuple[Optional[List[Optional[str]]], datetime]:
+        """Extract each site's content from a shared body, parsing it once per parser.
+        
+        Args:
+            info: State of this fetch
+            url: Website URL
+            response_headers: Response header mapping
+            reader: Buffering reader the body was fed into
+            plans: Compiled selector plans of the sites
+            parsers: Parser backend override of each site
+            body_hashes: Body digest each site saw last run
+        
+        Returns:
+            Tuple[Optional[List[Optional[str]]], datetime]: Content of each
+            site (None for sites whose body is unchanged, or None altogether
+            if it is unchanged for all of them) and timestamp
+        """
+        start = time.perf_counter()
+        jobs, body_hash = self._shared_jobs(reader, plans, parsers, body_hashes)
+        if self.parse_pool is not None:
+            futures = [(indexes, self.parse_pool.submit(extract_bodies, *job)) for indexes, job in jobs]
+            results = [(indexes, future.result()) for indexes, future in futures]
+        else:
+            results = [(indexes, extract_bodies(*job)) for indexes, job in jobs]
+        return self._record_shared(info, url, response_headers, reader, len(plans), results, body_hash, time.perf_counter() - start)
+    
+    def _record_shared(
+        self,
+        info: FetchInfo,
+        url: str,
+        response_headers,
+        reader: BodyReader,
+        count: int,
+        results: List[Tuple[List[int], Tuple[List[str], Dict[str, float]]]],
+        body_hash: str,
+        parse_seconds: float
+    ) -> Tuple[Optional[List[Optional[str]]], datetime]:
+        """Put the extracted contents of a shared body in site order and record the response.
+        
+        Args:
+            info: State of this fetch
+            url: Website URL
+            response_headers: Response header mapping
+            reader: Reader the body was fed into
+            count: Number of sites
+            results: Plan indexes, and extract_bodies() result of each parse
+            body_hash: Digest of the body
+            parse_seconds: Time spent extracting after the body was read
+        
+        Returns:
+            Tuple[Optional[List[Optional[str]]], datetime]: See _finish_shared()
+        """
+        contents: List[Optional[str]] = [None] * count
+        for indexes, (extracted, timings) in results:
+            for index, content in zip(indexes, extracted):
+                contents[index] = content
+            for stage, seconds in timings.items():
+                info.timings[stage] = info.timings.get(stage, 0.0) + seconds
+        return self._record_body(
+            info,
+            url,
+            response_headers,
+            reader,
+            contents if results else None,
+            body_hash,
+            parse_seconds
+        )
+    
+    def _record_body(
+        self,
+        info: FetchInfo,
+        url: str,
+        response_headers,
+        reader: BodyReader,
+        content: Optional[Union[str, List[Optional[str]]]],
+        body_hash: str,
+        parse_seconds: float = 0.0
+    ) -> Tuple[Optional[Union[str, List[Optional[str]]]], datetime]:
+        """Record the validators, stats and outcome of a full response.
+        
+        Args:
+            info: State of this fetch, filled in
+            url: Website URL
+            response_headers: Response header mapping
+            reader: Reader the body was fed into
+            content: Extracted content (a list for shared fetches), None if
+                the body is unchanged
+            body_hash: Digest of the body
+            parse_seconds: Time spent extracting after the body was read
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            content = []
+        Returns:
+            Tuple[Optional[str], datetime]: The content and timestamp
+        """
+        if reader.truncated:
+            logger.warning("Response from %s exceeded %s bytes and was truncated", url, reader.max_bytes)
+        
+        info.validators = {**response_validators(response_headers), 'body_hash': body_hash}
+        info.stats = {**reader.stats(), 'parse_seconds': parse_seconds}
+        info.outcome = FETCH_BODY_UNCHANGED if content is None else FETCH_MODIFIED
+        return content, datetime.now()
+    
+    def get_connection_stats(self, previous: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Get the connection counters of the fetcher's connection manager.
+        
+        Args:
+            previous: Earlier connection_manager.stats.snapshot() to count from
             
-            for selector in selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    # Remove script and style elements
-                    for script in element.find_all(['script', 'style']):
-                        script.decompose()
-                    # Get text and normalize whitespace
-                    text = ' '.join(element.get_text().split())
-                    if text:
-                        content.append(text)
+        Returns:
+            Dict[str, Any]: Requests, new and reused connections, pool waits
+            and their total seconds, DNS cache hits and misses, and the
+            reuse ratio (see ConnectionStats.since())
+        """
+        return self.connection_manager.stats.since(previous)
+    
+    @staticmethod
+    def _not_modified(info: FetchInfo) -> Tuple[None, datetime]:
+        """Record a 304 Not Modified answer.
+        
+        Args:
+            info: State of this fetch, filled in
             
-            timestamp = datetime.now()
-            return '\n'.join(content), timestamp
+        Returns:
+            Tuple[None, datetime]: No content and the current timestamp
+        """
+        info.outcome = FETCH_NOT_MODIFIED
+        return None, datetime.now()
+
+class ContentFetcher(BaseFetcher):
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        parser: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        streaming: bool = False,
+        parse_pool: Optional[Executor] = None,
+        connection_manager: Optional[ConnectionManager] = None
+    ):
+        """Initialize the content fetcher.
+        
+        Args:
+            headers: Optional custom headers for requests
+            rate_limiter: Per-domain rate limiter (default: one request per second)
+            parser: Default HTML parser backend (see text_extractor.PARSER_BACKENDS)
+            max_bytes: Default limit on bytes read per response (None = unlimited)
+            streaming: Extract content incrementally while the body downloads
+            parse_pool: Executor that parses buffered bodies (see BaseFetcher)
+            connection_manager: Connection pools shared by the fetch threads
+        """
+        super().__init__(headers, rate_limiter, parser, max_bytes, streaming, parse_pool, connection_manager)
+        self.session = self.connection_manager.session()
+    
+    def fetch_content(
+        self,
+        url: str,
+        selectors: list,
+        parser: Optional[str] = None,
+        exclude: Optional[list] = None,
+        max_bytes: Optional[int] = None,
+        streaming: Optional[bool] = None,
+        info: Optional[FetchInfo] = None
+    ) -> Tuple[Optional[str], datetime]:
+        """Fetch and extract content from a website.
+        
+        If info holds validators the request is made conditional, and a 304
+        Not Modified answer is returned without parsing anything. Likewise,
+        a body whose hash matches the 'body_hash' validator is not parsed.
+        info.outcome tells the two cases apart.
+        
+        The body is read in chunks and never beyond max_bytes. In streaming
+        mode the chunks are extracted as they arrive instead of being buffered.
+        
+        Args:
+            url: Website URL
+            selectors: List of CSS selectors (or a compiled SelectorPlan) to extract content from
+            parser: HTML parser backend for this page, defaults to the fetcher's
+            exclude: CSS selectors whose subtrees are left out of the content
+            max_bytes: Limit on bytes read for this page, defaults to the fetcher's
+            streaming: Stream this page, defaults to the fetcher's setting
+            info: Validators to send, filled in with the response's
+                validators, outcome, stats and timings
             
-        except requests.RequestException as e:
-            logger.error(f"Error fetching content from {url}: {str(e)}")
-            raise
+        Returns:
+            Tuple[Optional[str], datetime]: Extracted content (None if the page
+            was not modified) and timestamp
+            
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        plan = selectors if isinstance(selectors, SelectorPlan) else compile_plan(selectors, exclude)
+        return self._request(
+            url,
+            info or FetchInfo(),
+            lambda encoding: self._body_reader(url, plan, encoding, parser, max_bytes, streaming),
+            self._finish_body
+        )
     
-    def _respect_rate_limit(self, url: str) -> None:
-        """Ensure we don't exceed rate limits for a domain.
+    def fetch_shared(
+        self,
+        url: str,
+        plans: Sequence[SelectorPlan],
+        parsers: Optional[Sequence[Optional[str]]] = None,
+        max_bytes: Optional[int] = None,
+        body_hashes: Optional[Sequence[Optional[str]]] = None,
+        info: Optional[FetchInfo] = None
+    ) -> Tuple[Optional[List[Optional[str]]], datetime]:
+        """Fetch a page once and extract the content of several sites from it.
+        
+        For sites that watch the same URL with different selectors. The body
+        is buffered (never streamed) and parsed once per parser backend; each
+        site's plan is then applied to the shared tree. The sites share one
+        size limit, so a site's content never depends on another site's
+        limit. Validators in info make the request conditional, so only pass
+        validators all sites agree on.
         
         Args:
             url: Website URL
+            plans: Compiled selector plan of each site
+            parsers: Parser backend of each site, None for the fetcher's
+            max_bytes: Limit on bytes read for this page, defaults to the fetcher's
+            body_hashes: Body digest each site saw last run; sites whose
+                digest matches are not parsed
+            info: Validators to send, filled in with the response's
+                validators, outcome, stats and timings
+        
+        Returns:
+            Tuple[Optional[List[Optional[str]]], datetime]: Content of each
+            site (None for a site whose body is unchanged), or None if the
+            page was not modified or is unchanged for every site, and timestamp
+        
+        Raises:
+            requests.RequestException: If the request fails
         """
-        from urllib.parse import urlparse
-        domain = urlparse(url).netloc
+        parsers = parsers or [None] * len(plans)
+        body_hashes = body_hashes or [None] * len(plans)
+        return self._request(
+            url,
+            info or FetchInfo(),
+            lambda encoding: self._shared_reader(plans, encoding, max_bytes),
+            lambda url, headers, reader, info: self._finish_shared(info, url, headers, reader, plans, parsers, body_hashes)
+        )
+    
+    def _request(
+        self,
+        url: str,
+        info: FetchInfo,
+        new_reader: Callable[[str], BodyReader],
+        finish: Callable[..., Tuple[Any, datetime]]
+    ) -> Tuple[Any, datetime]:
+        """Make a (conditional) GET and feed the body into a reader.
         
-        current_time = time.time()
-        if domain in self._last_request_time:
-            elapsed = current_time - self._last_request_time[domain]
-            if elapsed < self._min_request_interval:
-                time.sleep(self._min_request_interval - elapsed)
+        Args:
+            url: Website URL
+            info: State of this fetch
+            new_reader: Creates the body reader for the response encoding
+            finish: Called with the URL, response headers, reader and info
+                once the body is read; its result is returned
         
-        self._last_request_time[domain] = time.time()
+        Returns:
+            Tuple[Any, datetime]: Result of finish, or None and the timestamp
+            if the server answered 304
+        
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        self.rate_limiter.acquire(urlparse(url).netloc)
+        
+        try:
+            headers = {**self.headers, **conditional_headers(info.request_validators)}
+            start = time.perf_counter()
+            with self.connection_manager.timing(info.timings), \
+                    self.session.get(url, headers=headers, timeout=30, stream=True) as response:
+                timings = info.timings
+                timings['ttfb'] = time.perf_counter() - start
+                if response.status_code == 304:
+                    # Reading the empty body hands the connection back to the pool instead of closing it
+                    response.content
+                    return self._not_modified(info)
+                response.raise_for_status()
+                
+                reader = new_reader(response.encoding or 'utf-8')
+                download_start = time.perf_counter()
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if not reader.feed(chunk):
+                        break
+                timings['download'] = time.perf_counter() - download_start
+            
+            return finish(url, response.headers, reader, info)
+            
+        except requests.RequestException as e:
+            logger.error("Error fetching content from %s: %s", url, e)
+            raise
     
     def close(self) -> None:
         """Close the requests session."""
@@ -0,0 +1,211 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .website_monitor import WebsiteMonitor
+from ..detector.history_manager import site_key
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+# Where profiles and allocation reports are written
+DEFAULT_PROFILE_DIR = 'logs/profile'
+
+# Frames kept per allocation traceback
+TRACEBACK_FRAMES = 10
+
+class PeakSnapshotter:
+    """Keep a tracemalloc snapshot taken close to the peak of traced memory.
+    
+    Memory allocated while parsing is mostly freed by the time a check
+    returns, so a snapshot at the end would miss it. A background thread
+    polls the traced size and takes a new snapshot whenever it grew by
+    more than ``growth`` since the last one.
+    """
+    
+    def __init__(self, interval: float = 0.01, growth: float = 1.1):
+        """Initialize snapshotter. tracemalloc must already be tracing.
+        
+        Args:
+            interval: Seconds between polls
+            growth: Factor the traced size must grow by to take a new snapshot
+        """
+        self.interval = interval
+        self.growth = growth
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_size = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='peak-snapshot', daemon=True)
+    
+    def _run(self) -> None:
+        """Poll the traced size until stopped."""
+        while not self._stop.wait(self.interval):
+            self.poll()
+    
+    def poll(self) -> None:
+        """Take a snapshot if traced memory grew enough since the last one."""
+        current, _ = tracemalloc.get_traced_memory()
+        if current > self.snapshot_size * self.growth:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = current
+    
+    def __enter__(self) -> 'PeakSnapshotter':
+        """Start polling."""
+        self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Stop polling and take a last snapshot if memory grew."""
+        self._stop.set()
+        self._thread.join()
+        self.poll()
+
+def allocation_report(
+    name: str,
+    snapshot: Optional[tracemalloc.Snapshot],
+    snapshot_size: int,
+    peak: int,
+    top: int
+) -> str:
+    """Format the largest allocation sites of a snapshot.
+    
+    Args:
+        name: Website name
+        snapshot: Snapshot taken near the peak, None if nothing was traced
+        snapshot_size: Traced bytes when the snapshot was taken
+        peak: Peak traced bytes during the check
+        top: Number of allocation sites to list
+    
+    Returns:
+        str: Report text
+    """
+    lines = [
+        f"Allocations while checking {name}",
+        f"Peak traced memory: {peak / 1048576:.1f} MiB",
+        f"Snapshot taken at: {snapshot_size / 1048576:.1f} MiB",
+        ''
+    ]
+    if snapshot is None:
+        return '\n'.join(lines + ['No allocations traced']) + '\n'
+    
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<unknown>')
+    ))
+    lines.append(f"Top {top} lines by size:")
+    for index, stat in enumerate(snapshot.statistics('lineno')[:top], 1):
+        frame = stat.traceback[0]
+        lines.append(
+            f"{index:3}. {stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {frame.filename}:{frame.lineno}"
+        )
+    
+    lines.extend(['', f"Top {min(top, 5)} tracebacks by size:"])
+    for stat in snapshot.statistics('traceback')[:min(top, 5)]:
+        lines.append(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks")
+        lines.extend(f"    {line}" for line in stat.traceback.format())
+    return '\n'.join(lines) + '\n'
+
+def profile_report(profiler: cProfile.Profile, top: int) -> str:
+    """Format the functions with the most cumulative and own time.
+    
+    Args:
+        profiler: Finished profiler
+        top: Number of functions to list per ordering
+    
+    Returns:
+        str: Report text
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output).strip_dirs()
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+    return output.getvalue()
+
+def profile_websites(
+    monitor: WebsiteMonitor,
+    names: Optional[List[str]] = None,
+    top: int = 25,
+    output_dir: str = DEFAULT_PROFILE_DIR
+) -> List[Dict[str, Any]]:
+    """Check websites one at a time under cProfile and tracemalloc.
+    
+    Each website gets its own profile, so one slow page can be examined
+    without the rest of the run. Per website this writes to output_dir:
+    
+    - ``<site>.prof``: cProfile dump, for pstats, snakeviz or similar
+    - ``<site>.txt``: the top functions by cumulative and own time
+    - ``<site>.alloc.txt``: the largest allocation sites near peak memory
+    
+    The checks are normal checks: snapshots are stored and changes are
+    returned. Adaptive revisit is ignored so the websites are always fetched.
+    Parse workers should be disabled, since work done in other processes
+    is not profiled.
+    
+    Args:
+        monitor: WebsiteMonitor to check with
+        names: Websites to profile, every website of the monitor if empty
+        top: Number of functions and allocation sites per report
+        output_dir: Directory for the reports
+    
+    Returns:
+        List[Dict[str, Any]]: Changes detected
+    
+    Raises:
+        ValueError: If a named website isn't configured
+    """
+    websites = monitor.get_websites()
+    if names:
+        by_key = {site_key(website.get('name', 'Unknown')): website for website in websites}
+        unknown = [name for name in names if site_key(name) not in by_key]
+        if unknown:
+            raise ValueError(f"Unknown websites: {', '.join(unknown)}")
+        websites = [by_key[site_key(name)] for name in names]
+    if monitor.parse_pool is not None:
+        logger.warning("Parse workers are enabled; parsing done in worker processes is not profiled")
+    
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    monitor.revisit_policy = None
+    changes: List[Dict[str, Any]] = []
+    
+    for website in websites:
+        name = website.get('name', 'Unknown')
+        profiler = cProfile.Profile()
+        tracemalloc.start(TRACEBACK_FRAMES)
+        start = time.perf_counter()
+        try:
+            with PeakSnapshotter() as snapshotter:
+                profiler.enable()
+                try:
+                    if monitor.engine == 'async':
+                        site_changes = asyncio.run(monitor.start_monitoring_async([website]))
+                    else:
+                        site_changes = monitor.start_monitoring([website])
+                finally:
+                    profiler.disable()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        elapsed = time.perf_counter() - start
+        changes.extend(site_changes)
+        
+        stem = out_dir / site_key(name)
+        profiler.dump_stats(f"{stem}.prof")
+        with open(f"{stem}.txt", 'w', encoding='utf-8') as f:
+            f.write(profile_report(profiler, top))
+        with open(f"{stem}.alloc.txt", 'w', encoding='utf-8') as f:
+            f.write(allocation_report(name, snapshotter.snapshot, snapshotter.snapshot_size, peak, top))
+        logger.info(
+            "Profiled %s: %.2fs, peak traced memory %.1f MiB, reports in %s.*",
+            name,
+            elapsed,
+            peak / 1048576,
+            stem
+        )
+    return changes
@@ -1,88 +1,215 @@
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+import asyncio
 import threading
+import time
+from typing import Dict, Optional
 from ..utils.logger import Logger
 
 logger = Logger.get_logger()
 
+class _TokenBucket:
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+    
+    def __init__(self, requests_per_minute: float, burst: int):
+        """Initialize a full bucket.
+        
+        Args:
+            requests_per_minute: Refill rate
+            burst: Bucket capacity, i.e. requests allowed back to back
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self, now: float) -> float:
+        """Take a token, borrowing against future refills if none is left.
+        
+        The balance may go negative: every caller gets its own slot in the
+        future, so concurrent callers are spaced out instead of racing.
+        
+        Args:
+            now: Current monotonic time
+        
+        Returns:
+            float: Seconds until the reserved token is available
+        """
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+    
+    def delay(self, now: float) -> float:
+        """Get the seconds until a token is available, without taking it."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
 class RateLimiter:
-    def __init__(self, requests_per_minute: int = 30):
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        burst: int = 1,
+        domain_rates: Optional[Dict[str, float]] = None
+    ):
         """Initialize rate limiter.
         
+        Each domain gets its own token bucket on a monotonic clock, so every
+        call is O(1) regardless of how many requests were made.
+        
         Args:
             requests_per_minute: Maximum number of requests per minute per domain
+                (0 or None disables limiting)
+            burst: Number of requests a domain may receive back to back
+            domain_rates: Requests per minute for specific domains. A rate for
+                'example.com' also applies to its subdomains
         """
         self.requests_per_minute = requests_per_minute
-        self.domain_requests: Dict[str, list] = {}
+        self.burst = burst
+        self.domain_rates = {domain.lower(): rate for domain, rate in (domain_rates or {}).items()}
+        self._buckets: Dict[str, Optional[_TokenBucket]] = {}
         self._lock = threading.Lock()
     
-    def add_request(self, domain: str) -> None:
-        """Record a request for a domain.
+    @classmethod
+    def from_config(cls, rate_config: Optional[Dict]) -> 'RateLimiter':
+        """Create a rate limiter from a ``monitoring.rate_limit`` config section.
+        
+        Args:
+            rate_config: Mapping with optional 'requests_per_minute', 'burst'
+                and 'domains' keys
+        
+        Returns:
+            RateLimiter: Configured rate limiter
+        """
+        rate_config = rate_config or {}
+        return cls(
+            requests_per_minute=rate_config.get('requests_per_minute', 60),
+            burst=int(rate_config.get('burst', 1)),
+            domain_rates=rate_config.get('domains')
+        )
+    
+    def rate_for(self, domain: str) -> Optional[float]:
+        """Get the configured requests per minute for a domain.
+        
+        Args:
+            domain: Domain name, optionally with a port
+        
+        Returns:
+            Optional[float]: Requests per minute, or None if unlimited
+        """
+        domain = domain.lower()
+        candidates = [domain]
+        host = domain.rsplit(':', 1)[0] if ':' in domain else domain
+        parts = host.split('.')
+        candidates.extend('.'.join(parts[i:]) for i in range(len(parts) - 1))
+        
+        rate = self.requests_per_minute
+        for candidate in candidates:
+            if candidate in self.domain_rates:
+                rate = self.domain_rates[candidate]
+                break
+        return rate if rate and rate > 0 else None
+    
+    def _bucket(self, domain: str) -> Optional[_TokenBucket]:
+        """Get the bucket of a domain, creating it on first use.
+        
+        Must be called with the lock held.
+        
+        Args:
+            domain: Domain name
+        
+        Returns:
+            Optional[_TokenBucket]: Bucket, or None if the domain is unlimited
+        """
+        if domain not in self._buckets:
+            rate = self.rate_for(domain)
+            self._buckets[domain] = _TokenBucket(rate, self.burst) if rate else None
+        return self._buckets[domain]
+    
+    def reserve(self, domain: str) -> float:
+        """Reserve a request slot for a domain without waiting for it.
         
         Args:
             domain: Domain name
+        
+        Returns:
+            float: Seconds the caller must wait before making the request
         """
         with self._lock:
-            now = datetime.now()
-            if domain not in self.domain_requests:
-                self.domain_requests[domain] = []
-            
-            # Add current request
-            self.domain_requests[domain].append(now)
-            
-            # Clean up old requests
-            self._cleanup_old_requests(domain)
+            bucket = self._bucket(domain)
+            if bucket is None:
+                return 0.0
+            return bucket.reserve(time.monotonic())
+    
+    def acquire(self, domain: str) -> float:
+        """Block until a request to a domain is allowed.
+        
+        Args:
+            domain: Domain name
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        delay = self.reserve(domain)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+    
+    async def acquire_async(self, domain: str) -> float:
+        """Wait on the event loop until a request to a domain is allowed.
+        
+        Args:
+            domain: Domain name
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        delay = self.reserve(domain)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+    
+    def add_request(self, domain: str) -> None:
+        """Record a request for a domain that was made without acquire().
+        
+        Args:
+            domain: Domain name
+        """
+        self.reserve(domain)
     
     def can_request(self, domain: str) -> bool:
         """Check if a request can be made to a domain.
         
         Args:
             domain: Domain name
-            
+        
         Returns:
             bool: True if request is allowed, False otherwise
         """
-        with self._lock:
-            if domain not in self.domain_requests:
-                return True
-            
-            self._cleanup_old_requests(domain)
-            return len(self.domain_requests[domain]) < self.requests_per_minute
+        return self.wait_time(domain) is None
     
     def wait_time(self, domain: str) -> Optional[float]:
         """Get time to wait before next request is allowed.
         
         Args:
             domain: Domain name
-            
+        
         Returns:
             Optional[float]: Seconds to wait, or None if no wait needed
         """
         with self._lock:
-            if self.can_request(domain):
+            bucket = self._bucket(domain)
+            if bucket is None:
                 return None
-            
-            oldest_allowed = datetime.now() - timedelta(minutes=1)
-            next_available = self.domain_requests[domain][0] + timedelta(minutes=1)
-            
-            if next_available > datetime.now():
-                return (next_available - datetime.now()).total_seconds()
-            return None
+            delay = bucket.delay(time.monotonic())
+        return delay if delay > 0 else None
     
-    def _cleanup_old_requests(self, domain: str) -> None:
-        """Remove requests older than 1 minute.
-        
-        Args:
-            domain: Domain name
-        """
-        now = datetime.now()
-        oldest_allowed = now - timedelta(minutes=1)
-        
-        self.domain_requests[domain] = [
-            req for req in self.domain_requests[domain]
-            if req > oldest_allowed
-        ]
-        
     def reset(self, domain: Optional[str] = None) -> None:
         """Reset rate limiter for a domain or all domains.
         
@@ -91,6 +218,6 @@ class RateLimiter:
         """
         with self._lock:
             if domain:
-                self.domain_requests.pop(domain, None)
+                self._buckets.pop(domain, None)
             else:
-                self.domain_requests.clear()
\ No newline at end of file
+                self._buckets.clear()
@@ -0,0 +1,154 @@
+import asyncio
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+import aiohttp
+import requests
+from .circuit_breaker import HALF_OPEN, CircuitBreaker
+
+# HTTP statuses worth retrying: timeouts, rate limiting and server errors
+RETRY_STATUSES = frozenset([408, 425, 429, 500, 502, 503, 504])
+
+# Errors of a request that may succeed when made again
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError
+)
+
+def is_retryable(error: BaseException) -> bool:
+    """Check whether a fetch error is transient.
+    
+    Transient errors are retried and count against the domain's circuit.
+    Anything else, e.g. a 404 or an invalid URL, would fail the same way again.
+    
+    Args:
+        error: Exception raised by a fetch
+    
+    Returns:
+        bool: True for connection errors, timeouts and retryable HTTP statuses
+    """
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUSES
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRY_STATUSES
+    return isinstance(error, TRANSIENT_ERRORS)
+
+class RetryQueue:
+    def __init__(
+        self,
+        domains: List[str],
+        breaker: Optional[CircuitBreaker] = None,
+        attempts: int = 3,
+        min_delay: float = 4,
+        max_delay: float = 10
+    ):
+        """Schedule a run's checks, re-queueing failed ones with backoff.
+        
+        Items are indexes into domains. Every item is due at once; an item
+        whose fetch failed with a transient error is due again after an
+        exponential backoff, and the other items keep running meanwhile.
+        With a circuit breaker, the items of a domain whose circuit is open
+        are skipped, and while a half-open domain is probed its other items
+        wait for the result.
+        
+        Args:
+            domains: Domain of each item
+            breaker: Per-domain circuit breakers, None to never skip
+            attempts: Tries per item, including the first
+            min_delay: Seconds before the first retry
+            max_delay: Longest delay between tries
+        """
+        self.domains = domains
+        self.breaker = breaker
+        self.attempts = max(1, int(attempts))
+        self.min_delay = float(min_delay)
+        self.max_delay = max(float(max_delay), self.min_delay)
+        self.skipped: List[int] = []
+        self.retries = 0
+        self._tries = [0] * len(domains)
+        self._heap: List[Tuple[float, int]] = [(0.0, index) for index in range(len(domains))]
+        self._waiting: Dict[str, List[int]] = {}
+        self._running = 0
+    
+    @property
+    def finished(self) -> bool:
+        """Whether every item has run or been skipped."""
+        return not self._heap and not self._waiting and not self._running
+    
+    def ready(self, now: Optional[float] = None) -> List[int]:
+        """Take the items that are due and whose domain may be fetched from.
+        
+        Args:
+            now: Current time.monotonic(), defaults to now
+        
+        Returns:
+            List[int]: Items to run; each must be passed to done() afterwards
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        while self._heap and self._heap[0][0] <= now:
+            _, index = heapq.heappop(self._heap)
+            domain = self.domains[index]
+            if self.breaker is None or self.breaker.allow(domain):
+                ready.append(index)
+            elif self.breaker.state(domain) == HALF_OPEN:
+                self._waiting.setdefault(domain, []).append(index)
+            else:
+                self.skipped.append(index)
+        self._running += len(ready)
+        return ready
+    
+    def wait_time(self, now: Optional[float] = None) -> Optional[float]:
+        """Get the seconds until the next queued item is due.
+        
+        Args:
+            now: Current time.monotonic(), defaults to now
+        
+        Returns:
+            Optional[float]: Delay, None if no item is queued
+        """
+        if not self._heap:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._heap[0][0] - now)
+    
+    def done(self, index: int, error: Optional[BaseException] = None, now: Optional[float] = None) -> bool:
+        """Record how a running item ended.
+        
+        Args:
+            index: Item returned by ready()
+            error: Exception the check failed with, None on success
+            now: Current time.monotonic(), defaults to now
+        
+        Returns:
+            bool: True if the item was re-queued, False if it is finished
+        """
+        now = time.monotonic() if now is None else now
+        self._running -= 1
+        domain = self.domains[index]
+        if error is None or not is_retryable(error):
+            if self.breaker is not None:
+                self.breaker.record_success(domain)
+            self._release(domain, now)
+            return False
+        
+        self._tries[index] += 1
+        opened = self.breaker is not None and self.breaker.record_failure(domain)
+        if opened:
+            # Waiting items are skipped once they are taken again
+            self._release(domain, now)
+        if opened or self._tries[index] >= self.attempts:
+            return False
+        delay = min(self.max_delay, self.min_delay * 2 ** (self._tries[index] - 1))
+        heapq.heappush(self._heap, (now + delay, index))
+        self.retries += 1
+        return True
+    
+    def _release(self, domain: str, now: float) -> None:
+        """Queue the items that waited for a domain's probe."""
+        for index in self._waiting.pop(domain, []):
+            heapq.heappush(self._heap, (now, index))
@@ -0,0 +1,111 @@
+import math
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# A site counts as due slightly before its interval is up, so a cron tick
+# that fires a little early doesn't postpone it by a whole period
+DUE_GRACE = 0.1
+
+class RevisitPolicy:
+    def __init__(
+        self,
+        min_interval: float = 0,
+        max_interval: float = 604800,
+        change_probability: float = 0.5,
+        min_checks: int = 5
+    ):
+        """Initialize revisit policy.
+        
+        Each site's change rate is estimated from how many of its checks found
+        a change, assuming changes arrive as a Poisson process. A site is
+        revisited once it has probably changed since its last check.
+        
+        Args:
+            min_interval: Shortest revisit interval in seconds
+            max_interval: Longest revisit interval in seconds, so sites that
+                never change are still checked
+            change_probability: Probability of a change since the last check
+                at which a site is revisited. Lower values revisit sooner
+            min_checks: Checks needed before a site's interval is adapted;
+                until then it is checked on every run
+        """
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.change_probability = min(max(float(change_probability), 0.01), 0.99)
+        self.min_checks = max(2, int(min_checks))
+    
+    @classmethod
+    def from_config(cls, revisit_config: Optional[Dict]) -> Optional['RevisitPolicy']:
+        """Create a policy from a ``monitoring.revisit`` config section.
+        
+        Args:
+            revisit_config: Mapping with 'adaptive' and optional 'min_interval',
+                'max_interval', 'change_probability' and 'min_checks' keys
+        
+        Returns:
+            Optional[RevisitPolicy]: Configured policy, None unless 'adaptive' is set
+        """
+        revisit_config = revisit_config or {}
+        if not revisit_config.get('adaptive'):
+            return None
+        return cls(
+            min_interval=revisit_config.get('min_interval', 0),
+            max_interval=revisit_config.get('max_interval', 604800),
+            change_probability=revisit_config.get('change_probability', 0.5),
+            min_checks=revisit_config.get('min_checks', 5)
+        )
+    
+    @staticmethod
+    def change_rate(stats: Dict[str, Any]) -> Optional[float]:
+        """Estimate how often a site changes.
+        
+        Uses the Cho & Garcia-Molina estimator, which corrects for several
+        changes between two checks being seen as one.
+        
+        Args:
+            stats: The site's check statistics (see HistoryManager.check_stats())
+        
+        Returns:
+            Optional[float]: Changes per second, None without enough history
+        """
+        intervals = stats['checks'] - 1
+        elapsed = (stats['last_checked'] - stats['first_checked']).total_seconds()
+        if intervals < 1 or elapsed <= 0:
+            return None
+        changes = min(stats['changes'], intervals)
+        mean_interval = elapsed / intervals
+        return -math.log((intervals - changes + 0.5) / (intervals + 0.5)) / mean_interval
+    
+    def interval(self, stats: Optional[Dict[str, Any]]) -> float:
+        """Get the revisit interval of a site.
+        
+        Args:
+            stats: The site's check statistics, None if it was never checked
+        
+        Returns:
+            float: Seconds between checks, within min_interval and max_interval
+        """
+        if not stats or stats['checks'] < self.min_checks:
+            return self.min_interval
+        rate = self.change_rate(stats)
+        if rate is None:
+            return self.min_interval
+        if rate == 0:
+            return self.max_interval
+        interval = -math.log(1 - self.change_probability) / rate
+        return min(max(interval, self.min_interval), self.max_interval)
+    
+    def is_due(self, stats: Optional[Dict[str, Any]], now: datetime) -> bool:
+        """Check whether a site should be fetched now.
+        
+        Args:
+            stats: The site's check statistics, None if it was never checked
+            now: Current time
+        
+        Returns:
+            bool: True if the site has probably changed since its last check
+        """
+        if not stats:
+            return True
+        elapsed = (now - stats['last_checked']).total_seconds()
+        return elapsed >= self.interval(stats) * (1 - DUE_GRACE)
@@ -0,0 +1,114 @@
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+# Check interval in seconds for each named frequency
+FREQUENCIES = {
+    'hourly': 3600,
+    'daily': 86400,
+    'weekly': 604800
+}
+
+DEFAULT_FREQUENCY = 'daily'
+
+def frequency_seconds(frequency: Optional[Union[str, int, float]]) -> float:
+    """Get the check interval of a site.
+    
+    Args:
+        frequency: Named frequency (hourly, daily, weekly) or seconds.
+            Missing or unknown values fall back to DEFAULT_FREQUENCY
+    
+    Returns:
+        float: Interval in seconds
+    """
+    if isinstance(frequency, (int, float)) and frequency > 0:
+        return float(frequency)
+    if frequency is not None and str(frequency).lower() not in FREQUENCIES:
+        logger.warning("Unknown frequency %r, using %s", frequency, DEFAULT_FREQUENCY)
+    return float(FREQUENCIES.get(str(frequency).lower(), FREQUENCIES[DEFAULT_FREQUENCY]))
+
+class Scheduler:
+    """Priority queue of the next time each website is due for a check."""
+    
+    def __init__(self, websites: List[Dict[str, Any]], clock: Callable[[], float] = time.monotonic):
+        """Initialize scheduler. Every website is due immediately.
+        
+        Args:
+            websites: Website configurations
+            clock: Monotonic clock in seconds
+        """
+        self._clock = clock
+        self._queue: List[Tuple[float, int, str]] = []
+        self._order = itertools.count()
+        self._websites: Dict[str, Dict[str, Any]] = {}
+        self._due: Dict[str, float] = {}
+        self.update(websites)
+    
+    def update(self, websites: List[Dict[str, Any]]) -> None:
+        """Replace the scheduled websites, e.g. after the config changed.
+        
+        New websites are due immediately. Websites that stay keep their due
+        time; entries of removed websites are dropped when they come up.
+        
+        Args:
+            websites: Website configurations
+        """
+        now = self._clock()
+        self._websites = {website.get('name', 'Unknown'): website for website in websites}
+        for name in list(self._due):
+            if name not in self._websites:
+                del self._due[name]
+        for name in self._websites:
+            if name not in self._due:
+                self._push(name, now)
+    
+    def _push(self, name: str, due: float) -> None:
+        """Schedule a website's next check."""
+        self._due[name] = due
+        heapq.heappush(self._queue, (due, next(self._order), name))
+    
+    def _discard_stale(self) -> None:
+        """Drop queue entries of removed or rescheduled websites."""
+        while self._queue and self._due.get(self._queue[0][2]) != self._queue[0][0]:
+            heapq.heappop(self._queue)
+    
+    def pop_due(self) -> List[Dict[str, Any]]:
+        """Take the websites that are due and schedule their next check.
+        
+        The next check is one interval after the previous due time, so checks
+        don't drift by the time a run takes. A website that fell more than an
+        interval behind is checked once and rescheduled from now.
+        
+        Returns:
+            List[Dict[str, Any]]: Due website configurations, most overdue first
+        """
+        now = self._clock()
+        due = []
+        self._discard_stale()
+        while self._queue and self._queue[0][0] <= now:
+            due_time, _, name = heapq.heappop(self._queue)
+            website = self._websites[name]
+            due.append(website)
+            interval = frequency_seconds(website.get('frequency'))
+            self._push(name, due_time + interval if due_time + interval > now else now + interval)
+            self._discard_stale()
+        return due
+    
+    def time_until_due(self) -> Optional[float]:
+        """Get the seconds until the next website is due.
+        
+        Returns:
+            Optional[float]: Seconds to wait (0 if one is overdue), None if no
+            websites are scheduled
+        """
+        self._discard_stale()
+        if not self._queue:
+            return None
+        return max(0.0, self._queue[0][0] - self._clock())
+    
+    def __len__(self) -> int:
+        return len(self._due)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from ..detector.blob_store import DEFAULT_COMPRESSION, DEFAULT_DELTA_MIN_BYTES
+from ..detector.history_manager import DEFAULT_HISTORY_PATH, HistoryManager, site_key
+from ..utils.config import Config
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+# Changes found by a run, written next to the snapshot history
+DEFAULT_REPORT_PATH = 'data/changes.json'
+
+Shard = Tuple[int, int]
+
+def parse_shard(spec: str) -> Shard:
+    """Parse a shard specification.
+    
+    Args:
+        spec: 'i/n' with 1 <= i <= n, e.g. '2/4'
+    
+    Returns:
+        Shard: (index, count)
+    
+    Raises:
+        ValueError: If the specification is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec!r}, expected i/n such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {spec!r}, index must be between 1 and {max(count, 1)}")
+    return index, count
+
+def shard_of(name: str, count: int) -> int:
+    """Get the shard a website belongs to.
+    
+    Depends only on the website's name, so adding or removing a website
+    never moves another one to a different shard.
+    
+    Args:
+        name: Website name
+        count: Number of shards
+    
+    Returns:
+        int: Shard index, from 1 to count
+    """
+    digest = hashlib.sha256(site_key(name).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+def select_shard(websites: List[Dict[str, Any]], shard: Shard) -> List[Dict[str, Any]]:
+    """Get the websites of one shard, in config order.
+    
+    Args:
+        websites: Website configurations
+        shard: (index, count)
+    
+    Returns:
+        List[Dict[str, Any]]: Websites belonging to the shard
+    """
+    index, count = shard
+    return [website for website in websites if shard_of(website.get('name', 'Unknown'), count) == index]
+
+def shard_path(path: str, shard: Shard) -> str:
+    """Get a shard's own copy of a state or report file.
+    
+    Args:
+        path: Unsharded path, e.g. 'data/history.db'
+        shard: (index, count)
+    
+    Returns:
+        str: e.g. 'data/history.shard-2-of-4.db'
+    """
+    file_path = Path(path)
+    index, count = shard
+    return str(file_path.with_name(f"{file_path.stem}.shard-{index}-of-{count}{file_path.suffix}"))
+
+def write_report(path: str, changes: List[Dict[str, Any]]) -> None:
+    """Write the changes found by a run as JSON.
+    
+    Args:
+        path: Report file
+        changes: Changes detected, one entry per website
+    """
+    report_file = Path(path)
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(
+            {'generated': datetime.now().isoformat(), 'changes': changes},
+            f,
+            ensure_ascii=False,
+            indent=2
+        )
+
+def merge_reports(paths: List[str], websites: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Combine the change reports of several shards.
+    
+    Missing or unreadable reports are logged and skipped.
+    
+    Args:
+        paths: Report files
+        websites: Website configurations, used to order the changes
+    
+    Returns:
+        List[Dict[str, Any]]: Changes of every shard, in config order
+    """
+    changes: List[Dict[str, Any]] = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                changes.extend(json.load(f)['changes'])
+        except Exception as e:
+            logger.error("Error reading change report %s: %s", path, e)
+    
+    order = {website.get('name', 'Unknown'): position for position, website in enumerate(websites)}
+    changes.sort(key=lambda change: order.get(change['website'], len(order)))
+    return changes
+
+def merge_shards(config: Config, count: int) -> List[Dict[str, Any]]:
+    """Combine the state and change reports of a sharded run.
+    
+    Each shard's snapshot history is merged into the configured history
+    database, and their change reports into DEFAULT_REPORT_PATH.
+    
+    Args:
+        config: Configuration the shards ran with
+        count: Number of shards
+    
+    Returns:
+        List[Dict[str, Any]]: Changes of every shard, in config order
+    """
+    storage_config = config.get_storage_config()
+    history_path = storage_config.get('path', DEFAULT_HISTORY_PATH)
+    shards = [(index, count) for index in range(1, count + 1)]
+    
+    history = HistoryManager(
+        history_path,
+        storage_config.get('compression', DEFAULT_COMPRESSION),
+        int(storage_config.get('delta_min_bytes', DEFAULT_DELTA_MIN_BYTES))
+    )
+    try:
+        for shard in shards:
+            path = shard_path(history_path, shard)
+            if not Path(path).exists():
+                logger.warning("No history for shard %s/%s at %s", shard[0], count, path)
+                continue
+            added = history.merge(path)
+            logger.info("Merged %s snapshots from %s", added, path)
+    finally:
+        history.close()
+    
+    changes = merge_reports(
+        [shard_path(DEFAULT_REPORT_PATH, shard) for shard in shards],
+        config.get_websites()
+    )
+    write_report(DEFAULT_REPORT_PATH, changes)
+    return changes
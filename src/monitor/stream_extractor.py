@@ -0,0 +1,487 @@
+import codecs
+import hashlib
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Tuple
+from .text_extractor import SKIPPED_TAGS, SelectorPlan, extract_content, extract_contents
+
+# Elements that never have content or an end tag
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+
+# Bytes requested from the network per read
+CHUNK_SIZE = 64 * 1024
+
+# Elements implicitly closed when a sibling of the same kind starts
+SELF_CLOSING_SIBLINGS = frozenset(['li', 'p', 'dt', 'dd', 'option', 'tr', 'td', 'th'])
+
+class StreamingSelectorError(ValueError):
+    """Raised when a selector needs more context than a streaming parse keeps."""
+
+class _Element:
+    __slots__ = ('tag', 'attrs', 'classes', 'parent')
+    
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional['_Element']):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = attrs.get('class', '').split()
+        self.parent = parent
+
+_ATTR_OPS = {
+    None: lambda actual, expected: True,
+    '=': lambda actual, expected: actual == expected,
+    '~=': lambda actual, expected: expected in actual.split(),
+    '|=': lambda actual, expected: actual == expected or actual.startswith(expected + '-'),
+    '^=': lambda actual, expected: bool(expected) and actual.startswith(expected),
+    '$=': lambda actual, expected: bool(expected) and actual.endswith(expected),
+    '*=': lambda actual, expected: bool(expected) and expected in actual,
+}
+
+_COMPOUND_TOKEN = re.compile(
+    r"""(?:
+        (?P<tag>[a-zA-Z][\w-]*|\*)
+      | \#(?P<id>[\w-]+)
+      | \.(?P<cls>[\w-]+)
+      | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]
+    )""",
+    re.VERBOSE
+)
+
+_COMBINATOR = re.compile(r'\s*>\s*|\s+')
+
+class _Compound:
+    __slots__ = ('tag', 'ids', 'classes', 'attrs')
+    
+    def __init__(self):
+        self.tag: Optional[str] = None
+        self.ids: List[str] = []
+        self.classes: List[str] = []
+        self.attrs: List[Tuple[str, Optional[str], str]] = []
+    
+    def matches(self, element: _Element) -> bool:
+        if self.tag is not None and element.tag != self.tag:
+            return False
+        for element_id in self.ids:
+            if element.attrs.get('id') != element_id:
+                return False
+        for cls in self.classes:
+            if cls not in element.classes:
+                return False
+        for name, op, expected in self.attrs:
+            actual = element.attrs.get(name)
+            if actual is None or not _ATTR_OPS[op](actual, expected):
+                return False
+        return True
+
+def _split_selector_list(css: str) -> List[str]:
+    """Split a selector list on top-level commas."""
+    parts, depth, quote, current = [], 0, None, []
+    for char in css:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+def _compile_compound(selector: str, position: int) -> Tuple[_Compound, int]:
+    """Compile the compound selector starting at position.
+    
+    Returns:
+        Tuple[_Compound, int]: Compound and the position after it
+    """
+    compound = _Compound()
+    start = position
+    while position < len(selector):
+        match = _COMPOUND_TOKEN.match(selector, position)
+        if not match:
+            break
+        if match.group('tag'):
+            if position != start:
+                break
+            if match.group('tag') != '*':
+                compound.tag = match.group('tag').lower()
+        elif match.group('id'):
+            compound.ids.append(match.group('id'))
+        elif match.group('cls'):
+            compound.classes.append(match.group('cls'))
+        else:
+            value = next((v for v in match.group('dq', 'sq', 'bare') if v is not None), '')
+            compound.attrs.append((match.group('attr').lower(), match.group('op'), value))
+        position = match.end()
+    
+    if position == start:
+        raise StreamingSelectorError(f"'{selector}' is not supported when streaming")
+    return compound, position
+
+def _compile_complex(selector: str) -> List[Tuple[_Compound, Optional[str]]]:
+    """Compile one complex selector into right-to-left matching steps.
+    
+    Returns:
+        List of (compound, combinator to the next step) pairs, rightmost first
+    """
+    compounds: List[_Compound] = []
+    combinators: List[str] = []
+    position = 0
+    
+    while True:
+        compound, position = _compile_compound(selector, position)
+        compounds.append(compound)
+        if position == len(selector):
+            break
+        match = _COMBINATOR.match(selector, position)
+        if not match:
+            raise StreamingSelectorError(f"'{selector}' is not supported when streaming")
+        combinators.append('>' if '>' in match.group(0) else ' ')
+        position = match.end()
+    
+    steps = []
+    for index in range(len(compounds) - 1, -1, -1):
+        steps.append((compounds[index], combinators[index - 1] if index > 0 else None))
+    return steps
+
+def _matches(steps, element: _Element, index: int = 0) -> bool:
+    compound, combinator = steps[index]
+    if not compound.matches(element):
+        return False
+    if index + 1 == len(steps):
+        return True
+    if combinator == '>':
+        return element.parent is not None and _matches(steps, element.parent, index + 1)
+    ancestor = element.parent
+    while ancestor is not None:
+        if _matches(steps, ancestor, index + 1):
+            return True
+        ancestor = ancestor.parent
+    return False
+
+class StreamingMatcher:
+    def __init__(self, css: str):
+        """Compile a selector list for matching against open elements only.
+        
+        Supports type, universal, id, class and attribute selectors joined by
+        descendant or child combinators, which covers ordinary career-page
+        selectors. Sibling combinators and pseudo-classes need parts of the
+        document a streaming parse has already discarded.
+        
+        Args:
+            css: Selector list
+        
+        Raises:
+            StreamingSelectorError: If the selectors can't be matched while streaming
+        """
+        self.selectors = [_compile_complex(selector) for selector in _split_selector_list(css)]
+    
+    def match(self, element: _Element) -> bool:
+        return any(_matches(steps, element) for steps in self.selectors)
+
+def streaming_supported(plan: SelectorPlan) -> bool:
+    """Check whether a selector plan can be extracted from a stream.
+    
+    Args:
+        plan: Compiled selector plan
+    
+    Returns:
+        bool: True if every include and exclude selector is supported
+    """
+    try:
+        StreamingMatcher(plan.include_css)
+        if plan.exclude:
+            StreamingMatcher(plan.exclude_css)
+        return True
+    except StreamingSelectorError:
+        return False
+
+class StreamingExtractor(HTMLParser):
+    def __init__(self, plan: SelectorPlan, encoding: str = 'utf-8'):
+        """Incrementally extract a plan's text from chunks of an HTML body.
+        
+        Only the currently open elements and the text of the element being
+        captured are kept, so memory stays bounded by nesting depth and the
+        size of the extracted text rather than by the size of the page. The
+        output follows the same rules as extract_content: one line per
+        match, with the text of nested matches on their own lines and
+        scripts, styles and excluded subtrees dropped.
+        
+        Args:
+            plan: Compiled selector plan
+            encoding: Character encoding of the body
+        
+        Raises:
+            StreamingSelectorError: If the plan can't be matched while streaming
+        """
+        super().__init__(convert_charrefs=True)
+        self.include = StreamingMatcher(plan.include_css)
+        self.exclude = StreamingMatcher(plan.exclude_css) if plan.exclude else None
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._hash = hashlib.sha256()
+        self._stack: List[_Element] = []
+        self._skip_at: Optional[int] = None
+        # Depth, line index and text of each open match, innermost last
+        self._captures: List[Tuple[int, int, List[str]]] = []
+        self._captured_size = 0
+        self.lines: List[str] = []
+        self.bytes_read = 0
+        self.peak_bytes = 0
+    
+    def feed_bytes(self, chunk: bytes) -> None:
+        """Feed the next chunk of the raw body.
+        
+        Args:
+            chunk: Raw bytes
+        """
+        self.bytes_read += len(chunk)
+        self._hash.update(chunk)
+        self.feed(self._decoder.decode(chunk))
+        held = len(chunk) + len(self.rawdata) + self._captured_size
+        self.peak_bytes = max(self.peak_bytes, held)
+    
+    def finish(self) -> Tuple[str, str]:
+        """Flush the parser and close any elements left open.
+        
+        Returns:
+            Tuple[str, str]: Extracted content and SHA-256 digest of the raw body
+        """
+        self.feed(self._decoder.decode(b'', final=True))
+        self.close()
+        while self._stack:
+            self._pop()
+        return '\n'.join(line for line in self.lines if line), self._hash.hexdigest()
+    
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in SELF_CLOSING_SIBLINGS and self._stack and self._stack[-1].tag == tag:
+            self._pop()
+        if tag in VOID_TAGS:
+            return
+        
+        parent = self._stack[-1] if self._stack else None
+        element = _Element(tag, {name: value or '' for name, value in attrs}, parent)
+        self._stack.append(element)
+        depth = len(self._stack) - 1
+        
+        if self._skip_at is not None:
+            return
+        if tag in SKIPPED_TAGS or (self.exclude is not None and self.exclude.match(element)):
+            self._skip_at = depth
+        elif self.include.match(element):
+            if self._captures:
+                # Keep the words on either side of the nested match apart
+                self._captures[-1][2].append(' ')
+                self._captured_size += 1
+            # The line is reserved now, so lines stay in order of their start tags
+            self._captures.append((depth, len(self.lines), []))
+            self.lines.append('')
+    
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+    
+    def handle_endtag(self, tag: str) -> None:
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index].tag == tag:
+                while len(self._stack) > index:
+                    self._pop()
+                return
+    
+    def handle_data(self, data: str) -> None:
+        if self._captures and self._skip_at is None:
+            self._captures[-1][2].append(data)
+            self._captured_size += len(data)
+    
+    def _pop(self) -> None:
+        """Close the innermost open element."""
+        depth = len(self._stack) - 1
+        self._stack.pop()
+        if self._skip_at == depth:
+            self._skip_at = None
+        if self._captures and self._captures[-1][0] == depth:
+            _, line, captured = self._captures.pop()
+            text = ''.join(captured)
+            self.lines[line] = ' '.join(text.split())
+            self._captured_size -= len(text)
+
+def extract_body(
+    body: bytes,
+    encoding: str,
+    plan: SelectorPlan,
+    parser: Optional[str] = None
+) -> Tuple[str, Dict[str, float]]:
+    """Decode a buffered response body and extract its content.
+    
+    A module-level function of compact arguments, so it can run in a
+    process pool: only the raw bytes and the selector strings are pickled.
+    
+    Args:
+        body: Raw response body
+        encoding: Character encoding of the body
+        plan: Compiled selector plan
+        parser: Parser backend
+    
+    Returns:
+        Tuple[str, Dict[str, float]]: Extracted content, and the seconds
+        spent parsing and matching ('parse', 'match') where it ran
+    """
+    timings: Dict[str, float] = {}
+    return extract_content(body.decode(encoding, errors='replace'), plan, parser, timings=timings), timings
+
+def extract_bodies(
+    body: bytes,
+    encoding: str,
+    plans: Sequence[SelectorPlan],
+    parser: Optional[str] = None
+) -> Tuple[List[str], Dict[str, float]]:
+    """Decode a buffered response body and extract the content of several plans.
+    
+    The page is parsed once for all plans. Like extract_body(), it can run
+    in a process pool.
+    
+    Args:
+        body: Raw response body
+        encoding: Character encoding of the body
+        plans: Compiled selector plans
+        parser: Parser backend
+    
+    Returns:
+        Tuple[List[str], Dict[str, float]]: Extracted content of each plan,
+        in order, and the 'parse' and 'match' seconds
+    """
+    timings: Dict[str, float] = {}
+    return extract_contents(body.decode(encoding, errors='replace'), plans, parser, timings), timings
+
+class BodyReader:
+    def __init__(
+        self,
+        plan: SelectorPlan,
+        encoding: str,
+        max_bytes: Optional[int] = None,
+        streaming: bool = False,
+        parser: Optional[str] = None
+    ):
+        """Consume a response body chunk by chunk, up to a size limit.
+        
+        In streaming mode the chunks go straight into a StreamingExtractor and
+        are dropped; otherwise they are buffered and parsed once complete with
+        the configured parser backend. Both fetchers drive this the same way,
+        from a blocking or an async chunk iterator.
+        
+        Args:
+            plan: Compiled selector plan
+            encoding: Character encoding of the body
+            max_bytes: Stop reading after this many bytes (None = unlimited)
+            streaming: Extract incrementally instead of buffering the body
+            parser: Parser backend for buffered mode
+        """
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = 'utf-8'
+        self.plan = plan
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.parser = parser
+        self.truncated = False
+        self.bytes_read = 0
+        # 'parse' and 'match' seconds of a buffered body; a streamed body is
+        # extracted while it downloads
+        self.timings: Dict[str, float] = {}
+        self._extractor = StreamingExtractor(plan, encoding) if streaming else None
+        self._buffer = bytearray()
+        self._peak_bytes = 0
+    
+    @property
+    def streaming(self) -> bool:
+        """Whether the body is being extracted incrementally."""
+        return self._extractor is not None
+    
+    def feed(self, chunk: bytes) -> bool:
+        """Consume the next chunk of the body.
+        
+        Args:
+            chunk: Raw bytes
+        
+        Returns:
+            bool: False once the size limit is reached and reading should stop
+        """
+        if self.max_bytes is not None and self.bytes_read + len(chunk) > self.max_bytes:
+            chunk = chunk[:self.max_bytes - self.bytes_read]
+            self.truncated = True
+        self.bytes_read += len(chunk)
+        
+        if self._extractor is not None:
+            self._extractor.feed_bytes(chunk)
+        else:
+            self._buffer += chunk
+        return not self.truncated
+    
+    def finish(self, previous_body_hash: Optional[str] = None) -> Tuple[Optional[str], str]:
+        """Extract the content from everything read so far.
+        
+        Args:
+            previous_body_hash: Body digest from the last run; a match skips
+                parsing in buffered mode and discards the result when streaming
+        
+        Returns:
+            Tuple[Optional[str], str]: Extracted content (None if the body is
+            unchanged) and SHA-256 digest of the body
+        """
+        if self._extractor is not None:
+            content, body_hash = self._extractor.finish()
+            self._peak_bytes = self._extractor.peak_bytes
+            return (None if body_hash == previous_body_hash else content), body_hash
+        
+        body_hash = hashlib.sha256(self._buffer).hexdigest()
+        self._peak_bytes = len(self._buffer)
+        if body_hash == previous_body_hash:
+            return None, body_hash
+        
+        html = self._buffer.decode(self.encoding, errors='replace')
+        self._peak_bytes += len(html)
+        self._buffer = bytearray()
+        return extract_content(html, self.plan, self.parser, timings=self.timings), body_hash
+    
+    def finish_deferred(self, previous_body_hash: Optional[str] = None) -> Tuple[Optional[Tuple], str]:
+        """Finish a buffered body but leave the extraction to the caller.
+        
+        Args:
+            previous_body_hash: Body digest from the last run
+        
+        Returns:
+            Tuple[Optional[Tuple], str]: Arguments for extract_body() (None if
+            the body is unchanged) and SHA-256 digest of the body
+        """
+        if self._extractor is not None:
+            raise RuntimeError("Streamed bodies are extracted while they are read")
+        body = bytes(self._buffer)
+        self._buffer = bytearray()
+        self._peak_bytes = len(body)
+        body_hash = hashlib.sha256(body).hexdigest()
+        if body_hash == previous_body_hash:
+            return None, body_hash
+        return (body, self.encoding, self.plan, self.parser), body_hash
+    
+    def stats(self) -> Dict[str, object]:
+        """Get byte statistics for the response.
+        
+        Returns:
+            Dict[str, object]: 'bytes_read', 'peak_bytes' (most response data
+            held in memory at once), 'truncated' and 'streamed'
+        """
+        return {
+            'bytes_read': self.bytes_read,
+            'peak_bytes': self._peak_bytes,
+            'truncated': self.truncated,
+            'streamed': self.streaming
+        }
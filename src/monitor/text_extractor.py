@@ -0,0 +1,377 @@
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import soupsieve
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, PreformattedString, Tag
+from ..utils.logger import Logger
+
+try:
+    import lxml  # noqa: F401  (used by BeautifulSoup's 'lxml' tree builder)
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+logger = Logger.get_logger()
+
+DEFAULT_PARSER = 'html.parser'
+
+# Elements whose text is never part of the extracted content
+SKIPPED_TAGS = frozenset(['script', 'style'])
+
+class SelectorPlan:
+    def __init__(self, selectors: Sequence[str], exclude: Optional[Sequence[str]] = None):
+        """Compile a site's include/exclude selectors into a single plan.
+        
+        All include selectors are merged into one selector list so the
+        document is matched in a single pass, and the exclude selectors (plus
+        scripts and styles) prune whole subtrees before anything is emitted.
+        The plan only holds strings until a backend needs compiled patterns,
+        so it stays cheap to pickle.
+        
+        Args:
+            selectors: CSS selectors whose text is extracted
+            exclude: CSS selectors whose subtrees are ignored
+        """
+        self.selectors = tuple(selectors)
+        self.exclude = tuple(exclude or ())
+        self.include_css = ', '.join(self.selectors)
+        self.exclude_css = ', '.join(self.exclude)
+        self._include_pattern = None
+        self._exclude_pattern = None
+    
+    @property
+    def include_pattern(self):
+        """Compiled soupsieve pattern for the include selectors."""
+        if self._include_pattern is None:
+            self._include_pattern = soupsieve.compile(self.include_css)
+        return self._include_pattern
+    
+    @property
+    def exclude_pattern(self):
+        """Compiled soupsieve pattern for the exclude selectors, if any."""
+        if self._exclude_pattern is None and self.exclude:
+            self._exclude_pattern = soupsieve.compile(self.exclude_css)
+        return self._exclude_pattern
+    
+    def __getstate__(self):
+        """Drop compiled patterns when pickling."""
+        state = self.__dict__.copy()
+        state['_include_pattern'] = None
+        state['_exclude_pattern'] = None
+        return state
+    
+    def __repr__(self) -> str:
+        return f"SelectorPlan(selectors={list(self.selectors)!r}, exclude={list(self.exclude)!r})"
+
+@lru_cache(maxsize=1024)
+def _compile_plan(selectors: tuple, exclude: tuple) -> SelectorPlan:
+    return SelectorPlan(selectors, exclude)
+
+def compile_plan(selectors: Sequence[str], exclude: Optional[Sequence[str]] = None) -> SelectorPlan:
+    """Get the (cached) compiled plan for a selector configuration.
+    
+    Args:
+        selectors: CSS selectors whose text is extracted
+        exclude: CSS selectors whose subtrees are ignored
+    
+    Returns:
+        SelectorPlan: Compiled plan, shared between identical configurations
+    """
+    return _compile_plan(tuple(selectors), tuple(exclude or ()))
+
+def _normalize(text: str) -> str:
+    """Collapse all whitespace runs into single spaces."""
+    return ' '.join(text.split())
+
+def _walk_soup(soup: BeautifulSoup, plan: SelectorPlan) -> List[str]:
+    """Extract text from a parsed document in a single walk of the tree.
+    
+    Excluded subtrees, scripts and styles are skipped without being visited.
+    Each text node belongs to the innermost match around it, so a match
+    nested in another one is a line of its own and its text is left out of
+    the enclosing line. The tree is not modified.
+    
+    Args:
+        soup: Parsed document
+        plan: Compiled selector plan
+    
+    Returns:
+        List[str]: Normalized text of each matched element, in order of
+        their start tags
+    """
+    include = plan.include_pattern
+    exclude = plan.exclude_pattern
+    lines: List[List[str]] = []
+    
+    # Children still to visit and the line their text goes to
+    stack: List[Tuple[Iterator, Optional[List[str]]]] = [(iter(soup.contents), None)]
+    while stack:
+        children, line = stack[-1]
+        for child in children:
+            if isinstance(child, Tag):
+                if child.name in SKIPPED_TAGS or (exclude is not None and exclude.match(child)):
+                    continue
+                if include.match(child):
+                    if line is not None:
+                        # Keep the words on either side of the nested match apart
+                        line.append(' ')
+                    lines.append([])
+                    stack.append((iter(child.contents), lines[-1]))
+                else:
+                    stack.append((iter(child.contents), line))
+                break
+            if line is not None and isinstance(child, NavigableString) and not isinstance(child, PreformattedString):
+                line.append(child)
+        else:
+            stack.pop()
+    
+    return [text for text in (_normalize(''.join(line)) for line in lines) if text]
+
+def _extract_with_soup(html: str, plan: SelectorPlan, features: str) -> List[str]:
+    """Extract text with BeautifulSoup.
+    
+    Args:
+        html: Raw HTML document
+        plan: Compiled selector plan
+        features: BeautifulSoup tree builder to use
+    
+    Returns:
+        List[str]: Normalized text of each matched element
+    """
+    return _walk_soup(BeautifulSoup(html, features), plan)
+
+def _extract_html_parser(html: str, plan: SelectorPlan) -> List[str]:
+    """Extract text using Python's built-in html.parser (always available)."""
+    return _extract_with_soup(html, plan, 'html.parser')
+
+def _extract_lxml(html: str, plan: SelectorPlan) -> List[str]:
+    """Extract text using BeautifulSoup on top of the lxml C parser."""
+    return _extract_with_soup(html, plan, 'lxml')
+
+def _is_inside(node, ancestor) -> bool:
+    """Check whether a selectolax node is, or is inside, another node."""
+    while node is not None:
+        if node.mem_id == ancestor.mem_id:
+            return True
+        node = node.parent
+    return False
+
+def _unique(nodes) -> List:
+    """Drop repeated nodes, keeping document order."""
+    seen = set()
+    unique = []
+    for node in nodes:
+        if node.mem_id not in seen:
+            seen.add(node.mem_id)
+            unique.append(node)
+    return unique
+
+def _any_nested(nodes) -> bool:
+    """Check whether any of a list of unique nodes in document order is inside another.
+    
+    The first nested node is always inside the node just before it.
+    """
+    return any(_is_inside(node, previous) for previous, node in zip(nodes, nodes[1:]))
+
+def _outermost(nodes) -> Iterator:
+    """Drop duplicates and nodes nested in an earlier node.
+    
+    lexbor returns matches in document order, so a nested match always
+    follows the match that contains it.
+    """
+    last = None
+    for node in nodes:
+        if last is not None and _is_inside(node, last):
+            continue
+        last = node
+        yield node
+
+def _selectolax_tree(html: str):
+    """Parse a document with lexbor and remove its scripts and styles."""
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(SKIPPED_TAGS))
+    return tree
+
+def _selectolax_text(tree, plan: SelectorPlan) -> List[str]:
+    """Get the normalized text of each include match of a pruned tree.
+    
+    Matches are read innermost first, and nested ones are replaced by a
+    space once read, so their text is left out of the enclosing line. The
+    tree is only modified if matches are nested.
+    """
+    nodes = _unique(tree.css(plan.include_css))
+    nested = _any_nested(nodes)
+    texts = []
+    for node in reversed(nodes):
+        texts.append(_normalize(node.text(deep=True)))
+        if nested:
+            node.replace_with(' ')
+    return [text for text in reversed(texts) if text]
+
+def _extract_selectolax(html: str, plan: SelectorPlan) -> List[str]:
+    """Extract text using selectolax's lexbor engine.
+    
+    Produces the same text as _extract_with_soup, but prunes in C: scripts,
+    styles and excluded subtrees are removed first, then the merged include
+    selector list is matched once.
+    """
+    return _match_selectolax(_selectolax_tree(html), plan)
+
+def _match_selectolax(tree, plan: SelectorPlan) -> List[str]:
+    """Extract text from a parsed lexbor tree, pruning the tree in place."""
+    if plan.exclude:
+        for node in list(_outermost(tree.css(plan.exclude_css))):
+            node.decompose()
+    return _selectolax_text(tree, plan)
+    
+def _walk_selectolax(tree, plan: SelectorPlan) -> List[str]:
+    """Extract text from a parsed lexbor tree without modifying it.
+    
+    Excluded subtrees and nested matches are removed from a copy of the
+    tree; copying in C is much cheaper than parsing the document again.
+    """
+    if plan.exclude or _any_nested(_unique(tree.css(plan.include_css))):
+        tree = tree.clone()
+        if plan.exclude:
+            for node in list(_outermost(tree.css(plan.exclude_css))):
+                node.decompose()
+    return _selectolax_text(tree, plan)
+
+PARSER_BACKENDS: Dict[str, Callable[[str, SelectorPlan], List[str]]] = {
+    'html.parser': _extract_html_parser,
+    'lxml': _extract_lxml,
+    'selectolax': _extract_selectolax,
+}
+
+# Parse and walk halves of each backend, so one parsed page serves several plans
+TREE_BACKENDS: Dict[str, Tuple[Callable[[str], Any], Callable[[Any, SelectorPlan], List[str]]]] = {
+    'html.parser': (lambda html: BeautifulSoup(html, 'html.parser'), _walk_soup),
+    'lxml': (lambda html: BeautifulSoup(html, 'lxml'), _walk_soup),
+    'selectolax': (_selectolax_tree, _walk_selectolax),
+}
+
+# Parse and match halves of each backend for a single plan; matching may prune the tree
+SPLIT_BACKENDS: Dict[str, Tuple[Callable[[str], Any], Callable[[Any, SelectorPlan], List[str]]]] = {
+    'html.parser': TREE_BACKENDS['html.parser'],
+    'lxml': TREE_BACKENDS['lxml'],
+    'selectolax': (_selectolax_tree, _match_selectolax),
+}
+
+def _add_timing(timings: Optional[Dict[str, float]], stage: str, seconds: float) -> None:
+    """Add seconds to a stage of an optional timings dict."""
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+def available_parsers() -> List[str]:
+    """Get the parser backends usable in this environment.
+    
+    Returns:
+        List[str]: Backend names
+    """
+    available = ['html.parser']
+    if HAS_LXML:
+        available.append('lxml')
+    if LexborHTMLParser is not None:
+        available.append('selectolax')
+    return available
+
+_warned_parsers = set()
+
+def resolve_parser(parser: Optional[str] = None) -> str:
+    """Resolve a parser backend name, falling back to html.parser.
+    
+    Args:
+        parser: Requested backend, or None for the default
+    
+    Returns:
+        str: A backend that is installed
+    """
+    if not parser or parser == DEFAULT_PARSER:
+        return DEFAULT_PARSER
+    if parser in available_parsers():
+        return parser
+    if parser not in _warned_parsers:
+        _warned_parsers.add(parser)
+        if parser in PARSER_BACKENDS:
+            logger.warning("Parser backend '%s' is not installed, falling back to %s", parser, DEFAULT_PARSER)
+        else:
+            logger.warning("Unknown parser backend '%s', falling back to %s", parser, DEFAULT_PARSER)
+    return DEFAULT_PARSER
+
+def extract_content(
+    html: str,
+    selectors: Union[SelectorPlan, Sequence[str]],
+    parser: Optional[str] = None,
+    exclude: Optional[Sequence[str]] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> str:
+    """Extract normalized text for a site's selectors.
+    
+    Each element matching any selector yields one line, in order of their
+    start tags. A text node belongs to the innermost match around it, so an
+    element matched inside another match is a line of its own and its text
+    is not repeated in the enclosing line. Text under an excluded selector,
+    a script or a style is dropped.
+    Every backend yields the same text for the same plan on well-formed
+    pages; they differ only in speed.
+    
+    Args:
+        html: Raw HTML document
+        selectors: Compiled plan, or list of CSS selectors to extract content from
+        parser: Parser backend ('html.parser', 'lxml' or 'selectolax')
+        exclude: CSS selectors to ignore (only used with a selector list)
+        timings: Dict the seconds spent building the tree ('parse') and
+            matching the selectors on it ('match') are added to
+    
+    Returns:
+        str: Extracted text, one line per matched element
+    """
+    plan = selectors if isinstance(selectors, SelectorPlan) else compile_plan(selectors, exclude)
+    if not plan.selectors:
+        return ''
+    parse, match = SPLIT_BACKENDS[resolve_parser(parser)]
+    start = time.perf_counter()
+    tree = parse(html)
+    parsed = time.perf_counter()
+    lines = match(tree, plan)
+    _add_timing(timings, 'parse', parsed - start)
+    _add_timing(timings, 'match', time.perf_counter() - parsed)
+    return '\n'.join(lines)
+
+def extract_contents(
+    html: str,
+    plans: Sequence[SelectorPlan],
+    parser: Optional[str] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> List[str]:
+    """Extract the text of several plans from a single parse of a page.
+    
+    Gives the same text as calling extract_content() once per plan, for
+    sites that watch the same page with different selectors.
+    
+    Args:
+        html: Raw HTML document
+        plans: Compiled plans
+        parser: Parser backend ('html.parser', 'lxml' or 'selectolax')
+        timings: Dict the 'parse' and 'match' seconds are added to, as
+            for extract_content()
+    
+    Returns:
+        List[str]: Extracted text of each plan, in order
+    """
+    if not any(plan.selectors for plan in plans):
+        return ['' for _ in plans]
+    parse, walk = TREE_BACKENDS[resolve_parser(parser)]
+    start = time.perf_counter()
+    tree = parse(html)
+    parsed = time.perf_counter()
+    contents = ['\n'.join(walk(tree, plan)) if plan.selectors else '' for plan in plans]
+    _add_timing(timings, 'parse', parsed - start)
+    _add_timing(timings, 'match', time.perf_counter() - parsed)
+    return contents
@@ -1,50 +1,804 @@
-from datetime import datetime
-import json
+import asyncio
+import logging
+from collections import Counter
+from contextlib import contextmanager
 import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+import multiprocessing
+import time
+import threading
 from pathlib import Path
-from typing import Dict, Optional, List, Any
-from .content_fetcher import ContentFetcher
+from typing import Callable, Dict, Iterator, Optional, List, Any, Tuple
+from .async_fetcher import AsyncContentFetcher
+from .circuit_breaker import DEFAULT_BREAKER_PATH, CircuitBreaker
+from .connection_pool import ConnectionManager
+from .content_fetcher import FETCH_BODY_UNCHANGED, ContentFetcher, FetchInfo, content_digest
 from .rate_limiter import RateLimiter
-from ..utils.config import Config
+from .retry_queue import RetryQueue, is_retryable
+from .revisit import RevisitPolicy
+from .scheduler import Scheduler
+from .sharding import Shard, select_shard, shard_path
+from ..detector.blob_store import DEFAULT_COMPRESSION, DEFAULT_DELTA_MIN_BYTES
+from ..detector.diff_analyzer import analyze_changes
+from ..detector.fingerprint import Fingerprint, differs_only_in_noise, distance, fingerprint
+from ..detector.history_manager import DEFAULT_HISTORY_PATH, HistoryManager, site_key
+from ..utils.config import CompiledWebsite, Config
 from ..utils.logger import Logger
+from ..utils.metrics import RunMetrics
 
 logger = Logger.get_logger()
 
+# Longest the daemon sleeps before checking the config file for changes
+CONFIG_POLL_INTERVAL = 60
+
+# Directory the metrics of each run are written to
+DEFAULT_METRICS_DIR = 'logs'
+
+def parse_worker_count(value: Any) -> int:
+    """Get the size of the parse process pool from ``monitoring.parse_workers``.
+    
+    Args:
+        value: Number of processes, 'auto' for one per available core, or
+            0/None to parse in the fetching threads
+    
+    Returns:
+        int: Number of processes, 0 for no pool
+    """
+    if value == 'auto':
+        try:
+            return len(os.sched_getaffinity(0))
+        except AttributeError:
+            return os.cpu_count() or 1
+    return max(0, int(value or 0))
+
 class WebsiteMonitor:
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        per_domain_limit: Optional[int] = None,
+        shard: Optional[Shard] = None,
+        parse_workers: Optional[Any] = None
+    ):
         """Initialize website monitor.
         
         Args:
             config_path: Optional path to config file
+            max_workers: Number of websites checked concurrently. Overrides
+                ``monitoring.max_workers`` from the config (default 1, serial)
+            per_domain_limit: Maximum concurrent checks against one domain.
+                Overrides ``monitoring.per_domain_limit`` (default 1)
+            shard: (index, count) to only check the websites of one shard,
+                with its own snapshot history
+            parse_workers: Size of the parse process pool. Overrides
+                ``monitoring.parse_workers`` (see parse_worker_count())
         """
         self.config = Config(config_path)
-        self.content_fetcher = ContentFetcher()
-        self.rate_limiter = RateLimiter()
+        self.shard = shard
+        monitoring_config = self.config.get_monitoring_config()
+        self.max_workers = max(1, int(max_workers or monitoring_config.get('max_workers', 1)))
+        self.per_domain_limit = max(1, int(per_domain_limit or monitoring_config.get('per_domain_limit', 1)))
+        self.engine = monitoring_config.get('engine', 'threads')
+        self.max_in_flight = max(1, int(monitoring_config.get('max_in_flight', 100)))
+        self.rate_limiter = RateLimiter.from_config(monitoring_config.get('rate_limit'))
+        self.revisit_policy = RevisitPolicy.from_config(monitoring_config.get('revisit'))
+        self.retry_config = monitoring_config.get('retry') or {}
+        breaker_config = monitoring_config.get('circuit_breaker') or {}
+        breaker_path = breaker_config.get('path', DEFAULT_BREAKER_PATH)
+        self.circuit_breaker = CircuitBreaker.from_config(
+            breaker_config,
+            shard_path(breaker_path, shard) if shard else breaker_path
+        )
+        self.connection_manager = ConnectionManager.from_config(
+            monitoring_config.get('connections'),
+            per_host=self.per_domain_limit,
+            hosts=len({self.config.compiled(website).domain for website in self.config.get_websites()})
+        )
+        parse_workers = parse_worker_count(
+            monitoring_config.get('parse_workers') if parse_workers is None else parse_workers
+        )
+        # Spawned workers don't inherit the fetch threads' locks
+        self.parse_pool = ProcessPoolExecutor(
+            max_workers=parse_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        ) if parse_workers else None
+        self.content_fetcher = ContentFetcher(
+            rate_limiter=self.rate_limiter,
+            parser=monitoring_config.get('parser'),
+            max_bytes=monitoring_config.get('max_bytes'),
+            streaming=bool(monitoring_config.get('streaming', False)),
+            parse_pool=self.parse_pool,
+            connection_manager=self.connection_manager
+        )
         self.data_dir = Path('data')
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        storage_config = self.config.get_storage_config()
+        history_path = storage_config.get('path', DEFAULT_HISTORY_PATH)
+        self.history = HistoryManager(
+            shard_path(history_path, shard) if shard else history_path,
+            storage_config.get('compression', DEFAULT_COMPRESSION),
+            int(storage_config.get('delta_min_bytes', DEFAULT_DELTA_MIN_BYTES))
+        )
+        if not self.history.sites():
+            if not shard:
+                # One-time migration of the per-site JSON snapshots
+                self.history.import_json(self.data_dir)
+            elif Path(history_path).exists():
+                # A new shard starts from the shared history of its websites
+                sites = [site_key(website.get('name', 'Unknown')) for website in self.get_websites()]
+                self.history.merge(history_path, sites)
+        self._domain_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._domain_slots_lock = threading.Lock()
+        self.run_stats: Counter = Counter()
+        self.fetch_stats: Dict[str, Dict[str, Any]] = {}
+        self.metrics = RunMetrics()
+        self._connection_baseline = self.connection_manager.stats.snapshot()
+        self.metrics_dir = monitoring_config.get('metrics_dir', DEFAULT_METRICS_DIR)
+        self._run_stats_lock = threading.Lock()
+        self._config_mtime = self._config_file_mtime()
     
-    def start_monitoring(self) -> List[Dict[str, Any]]:
+    def get_websites(self) -> List[Dict[str, Any]]:
+        """Get the configured websites this monitor is responsible for.
+        
+        Returns:
+            List[Dict[str, Any]]: Every website, or only the shard's websites
+        """
+        websites = self.config.get_websites()
+        return select_shard(websites, self.shard) if self.shard else websites
+    
+    def start_monitoring(self, websites: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """Start monitoring all configured websites.
         
+        Websites are checked serially when ``max_workers`` is 1, otherwise
+        they are spread over a thread pool. Websites with the same URL are
+        checked together from a single fetch. Fetches that fail with a
+        transient error are retried later in the run, and websites on a
+        domain whose circuit is open are skipped (see _retry_queue()).
+        Either way the returned changes follow the order of the websites in
+        the config.
+        
+        Args:
+            websites: Websites to check instead of every configured website
+        
         Returns:
             List[Dict[str, Any]]: List of changes detected
         """
-        websites = self.config.get_websites()
+        websites = self.get_websites() if websites is None else websites
+        if not websites:
+            logger.warning("No websites configured for monitoring")
+            return []
+        websites = self._due_for_revisit(websites)
+        if not websites:
+            return []
+        
+        self.run_stats.clear()
+        self.fetch_stats.clear()
+        self.metrics = RunMetrics()
+        self._connection_baseline = self.connection_manager.stats.snapshot()
+        groups = self._group_by_url(websites)
+        with self.history.batch():
+            group_results = self._check_groups(groups)
+        self._record_timing('persist', self.history.last_write_seconds)
+        results = self._in_site_order(websites, groups, group_results)
+        
+        self._log_run_summary()
+        self._write_run_metrics()
+        return [site_changes for site_changes in results if site_changes]
+    
+    def _group_by_url(self, websites: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group websites by normalized URL, so each page is fetched once per run.
+        
+        Websites with different effective max_bytes are kept apart, so that
+        how much of a page a website sees doesn't depend on other websites.
+        
+        Args:
+            websites: Website configurations
+            
+        Returns:
+            List[List[Dict[str, Any]]]: Groups in order of their first website,
+            each in input order. Invalid websites are left on their own
+        """
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        for index, website in enumerate(websites):
+            site = self.config.compiled(website)
+            key = (site.url, site.max_bytes or self.content_fetcher.max_bytes) if site.url and site.selectors else index
+            groups.setdefault(key, []).append(website)
+        shared = [group for group in groups.values() if len(group) > 1]
+        if shared:
+            logger.info(
+                "%d websites share %d pages, each page is fetched once",
+                sum(len(group) for group in shared),
+                len(shared)
+            )
+        return list(groups.values())
+    
+    @staticmethod
+    def _in_site_order(
+        websites: List[Dict[str, Any]],
+        groups: List[List[Dict[str, Any]]],
+        group_results: List[List[Optional[Dict[str, Any]]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Put the results of grouped checks back in the order of the websites.
+        
+        Args:
+            websites: Website configurations
+            groups: Result of _group_by_url()
+            group_results: Result for each website of each group
+        
+        Returns:
+            List[Optional[Dict[str, Any]]]: Result for each website, in input order
+        """
+        by_website = {
+            id(website): result
+            for group, results in zip(groups, group_results)
+            for website, result in zip(group, results)
+        }
+        return [by_website[id(website)] for website in websites]
+    
+    def _retry_queue(self, groups: List[List[Dict[str, Any]]]) -> RetryQueue:
+        """Create the queue that schedules a run's checks.
+        
+        A check whose fetch fails with a transient error is retried after a
+        backoff (``monitoring.retry``: 'attempts', 'min_delay' and
+        'max_delay'), while the other checks go on. Domains that keep failing
+        trip their circuit breaker (``monitoring.circuit_breaker``).
+        
+        Args:
+            groups: Websites grouped by URL
+        
+        Returns:
+            RetryQueue: Queue of the groups
+        """
+        return RetryQueue(
+            [self.config.compiled(group[0]).domain for group in groups],
+            self.circuit_breaker,
+            attempts=self.retry_config.get('attempts', 3),
+            min_delay=self.retry_config.get('min_delay', 4),
+            max_delay=self.retry_config.get('max_delay', 10)
+        )
+    
+    def _check_groups(self, groups: List[List[Dict[str, Any]]]) -> List[List[Optional[Dict[str, Any]]]]:
+        """Check groups of websites serially or on a thread pool, honouring the per-domain limit.
+        
+        Args:
+            groups: Websites grouped by URL
+        
+        Returns:
+            List[List[Optional[Dict[str, Any]]]]: Result for each website of
+            each group, in input order
+        """
+        queue = self._retry_queue(groups)
+        results: List[List[Optional[Dict[str, Any]]]] = [[None] * len(group) for group in groups]
+        workers = min(self.max_workers, len(groups))
+        if workers <= 1:
+            while not queue.finished:
+                for index in queue.ready():
+                    try:
+                        results[index] = self._safe_check_group(groups[index])
+                        queue.done(index)
+                    except Exception as e:
+                        self._check_failed(queue, groups[index], index, e)
+                delay = queue.wait_time()
+                if delay:
+                    time.sleep(delay)
+            self._finish_queue(queue, groups)
+            return results
+        
+        logger.info(
+            "Checking %d websites with %d workers (max %d per domain)",
+            sum(len(group) for group in groups),
+            workers,
+            self.per_domain_limit
+        )
+        pending: Dict[Future, int] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='monitor') as executor:
+            while not queue.finished:
+                for index in queue.ready():
+                    pending[executor.submit(self._check_group_with_domain_limit, groups[index])] = index
+                if not pending:
+                    time.sleep(queue.wait_time() or 0)
+                    continue
+                # Wake up for the next retry that comes due, or the next check that ends
+                done, _ = wait(pending, timeout=queue.wait_time(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        results[index] = future.result()
+                        queue.done(index)
+                    except Exception as e:
+                        self._check_failed(queue, groups[index], index, e)
+        self._finish_queue(queue, groups)
+        return results
+    
+    def _check_failed(self, queue: RetryQueue, group: List[Dict[str, Any]], index: int, error: Exception) -> None:
+        """Re-queue a check whose fetch failed, or record the failure if it is not retried.
+        
+        Args:
+            queue: Queue of the run
+            group: Websites of the check
+            index: The check's index in the queue
+            error: Exception the fetch failed with
+        """
+        url = self.config.compiled(group[0]).url
+        if queue.done(index, error):
+            logger.warning("Fetching %s failed, retrying later in the run: %s", url, error)
+            return
+        logger.error("Error fetching %s: %s", url, error)
+        for website in group:
+            self._record_stat('failed', website.get('name', 'Unknown'))
+    
+    def _finish_queue(self, queue: RetryQueue, groups: List[List[Dict[str, Any]]]) -> None:
+        """Record the websites a run skipped and save the circuit breaker state.
+        
+        Args:
+            queue: Finished queue of the run
+            groups: Websites grouped by URL
+        """
+        for index in queue.skipped:
+            for website in groups[index]:
+                self._record_stat('circuit_open', website.get('name', 'Unknown'))
+        if queue.skipped:
+            logger.warning(
+                "Skipped %d websites on domains that keep failing: %s",
+                sum(len(groups[index]) for index in queue.skipped),
+                ', '.join(sorted({queue.domains[index] for index in queue.skipped}))
+            )
+        if queue.retries:
+            logger.info("Retried %d failed fetches", queue.retries)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.save()
+    
+    def _check_group_with_domain_limit(self, group: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Check a group of websites while holding one of their domain's slots.
+        
+        Args:
+            group: Website configurations sharing a URL
+            
+        Returns:
+            List[Optional[Dict[str, Any]]]: Changes detected for each website, if any
+        """
+        with self._domain_slot(self.config.compiled(group[0]).domain):
+            return self._safe_check_group(group)
+    
+    def _domain_slot(self, domain: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting concurrent checks for a domain.
+        
+        Args:
+            domain: Host (and port) of the website URL
+            
+        Returns:
+            threading.BoundedSemaphore: Semaphore shared by all sites on the domain
+        """
+        with self._domain_slots_lock:
+            slot = self._domain_slots.get(domain)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_domain_limit)
+                self._domain_slots[domain] = slot
+            return slot
+    
+    def _safe_check_group(self, group: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Check a group of websites sharing a URL, logging instead of raising on failure.
+        
+        Args:
+            group: Website configurations
+        
+        Returns:
+            List[Optional[Dict[str, Any]]]: Changes detected for each website, if any
+        """
+        if len(group) == 1:
+            return [self._safe_check_website(group[0])]
+        start = time.perf_counter()
+        try:
+            return self._check_shared(group)
+        except Exception as e:
+            if is_retryable(e):
+                raise
+            logger.error("Error monitoring %s: %s", ', '.join(website.get('name', 'Unknown') for website in group), e)
+            return [None] * len(group)
+        finally:
+            elapsed = time.perf_counter() - start
+            for website in group:
+                self._record_timing('check', elapsed, website.get('name', 'Unknown'))
+    
+    def _safe_check_website(self, website: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Check a website, logging instead of raising on failure.
+        
+        Transient fetch errors are raised, for the retry queue.
+        
+        Args:
+            website: Website configuration
+            
+        Returns:
+            Optional[Dict[str, Any]]: Changes detected, if any
+        """
+        try:
+            with self._timed('check', website.get('name', 'Unknown')):
+                return self._check_website(website)
+        except Exception as e:
+            if is_retryable(e):
+                raise
+            logger.error("Error monitoring %s: %s", website.get('name', 'Unknown'), e)
+            return None
+    
+    async def start_monitoring_async(
+        self,
+        websites: Optional[List[Dict[str, Any]]] = None,
+        fetcher: Optional[AsyncContentFetcher] = None
+    ) -> List[Dict[str, Any]]:
+        """Monitor all configured websites on a single asyncio event loop.
+        
+        Up to ``monitoring.max_in_flight`` fetches run at once, with at most
+        ``per_domain_limit`` of them against the same domain. Websites with
+        the same URL are checked together from a single fetch, and failed
+        fetches are retried as in start_monitoring(). The returned changes
+        follow the order of the websites in the config.
+        
+        Args:
+            websites: Websites to check instead of every configured website
+            fetcher: Open async fetcher to reuse. A new one is opened and
+                closed for the run if None
+        
+        Returns:
+            List[Dict[str, Any]]: List of changes detected
+        """
+        websites = self.get_websites() if websites is None else websites
         if not websites:
             logger.warning("No websites configured for monitoring")
             return []
+        websites = self._due_for_revisit(websites)
+        if not websites:
+            return []
+        
+        self.run_stats.clear()
+        self.fetch_stats.clear()
+        self.metrics = RunMetrics()
+        self._connection_baseline = self.connection_manager.stats.snapshot()
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        domain_slots: Dict[str, asyncio.Semaphore] = {}
+        
+        async def check(group: List[Dict[str, Any]], fetcher: AsyncContentFetcher) -> List[Optional[Dict[str, Any]]]:
+            domain = self.config.compiled(group[0]).domain
+            domain_slot = domain_slots.get(domain)
+            if domain_slot is None:
+                domain_slot = domain_slots[domain] = asyncio.Semaphore(self.per_domain_limit)
+            async with domain_slot, in_flight:
+                start = time.perf_counter()
+                try:
+                    if len(group) == 1:
+                        return [await self._check_website_async(group[0], fetcher)]
+                    return await self._check_shared_async(group, fetcher)
+                except Exception as e:
+                    if is_retryable(e):
+                        raise
+                    logger.error("Error monitoring %s: %s", ', '.join(website.get('name', 'Unknown') for website in group), e)
+                    return [None] * len(group)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    for website in group:
+                        self._record_timing('check', elapsed, website.get('name', 'Unknown'))
+        
+        logger.info(
+            "Checking %d websites asynchronously (%d in flight, max %d per domain)",
+            len(websites),
+            self.max_in_flight,
+            self.per_domain_limit
+        )
+        groups = self._group_by_url(websites)
+        queue = self._retry_queue(groups)
+        
+        async def check_all(fetcher: AsyncContentFetcher) -> List[List[Optional[Dict[str, Any]]]]:
+            results: List[List[Optional[Dict[str, Any]]]] = [[None] * len(group) for group in groups]
+            tasks: Dict[asyncio.Task, int] = {}
+            while not queue.finished:
+                for index in queue.ready():
+                    tasks[asyncio.ensure_future(check(groups[index], fetcher))] = index
+                if not tasks:
+                    await asyncio.sleep(queue.wait_time() or 0)
+                    continue
+                done, _ = await asyncio.wait(tasks, timeout=queue.wait_time(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = tasks.pop(task)
+                    try:
+                        results[index] = task.result()
+                        queue.done(index)
+                    except Exception as e:
+                        self._check_failed(queue, groups[index], index, e)
+            return results
+        
+        if fetcher is not None:
+            with self.history.batch():
+                group_results = await check_all(fetcher)
+        else:
+            async with self._async_fetcher() as fetcher:
+                with self.history.batch():
+                    group_results = await check_all(fetcher)
+        self._finish_queue(queue, groups)
+        self._record_timing('persist', self.history.last_write_seconds)
+        results = self._in_site_order(websites, groups, group_results)
+        
+        self._log_run_summary()
+        self._write_run_metrics()
+        return [site_changes for site_changes in results if site_changes]
+    
+    def _due_for_revisit(self, websites: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop the websites that probably haven't changed since their last check.
+        
+        Only applies when ``monitoring.revisit.adaptive`` is enabled.
         
-        changes = []
+        Args:
+            websites: Website configurations
+            
+        Returns:
+            List[Dict[str, Any]]: Websites to check, in input order
+        """
+        if self.revisit_policy is None:
+            return websites
+        try:
+            stats = self.history.check_stats()
+        except Exception as e:
+            logger.error("Error loading check statistics, checking every website: %s", e)
+            return websites
+        
+        now = datetime.now()
+        due = []
         for website in websites:
-            try:
-                site_changes = self._check_website(website)
-                if site_changes:
-                    changes.append(site_changes)
-            except Exception as e:
-                logger.error(f"Error monitoring {website.get('name', 'Unknown')}: {str(e)}")
-                continue
+            site_stats = stats.get(site_key(website.get('name', 'Unknown')))
+            if self.revisit_policy.is_due(site_stats, now):
+                due.append(website)
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Skipping %s: revisit interval %.1fh not elapsed",
+                    website.get('name', 'Unknown'),
+                    self.revisit_policy.interval(site_stats) / 3600
+                )
+        if len(due) < len(websites):
+            logger.info("Skipping %s of %s websites not due for a revisit", len(websites) - len(due), len(websites))
+        return due
+    
+    def _async_fetcher(self) -> AsyncContentFetcher:
+        """Create an async fetcher with the monitor's fetch settings."""
+        return AsyncContentFetcher(
+            headers=self.content_fetcher.headers,
+            rate_limiter=self.rate_limiter,
+            max_connections=self.max_in_flight,
+            max_connections_per_host=self.per_domain_limit,
+            parser=self.content_fetcher.parser,
+            max_bytes=self.content_fetcher.max_bytes,
+            streaming=self.content_fetcher.streaming,
+            parse_pool=self.parse_pool,
+            connection_manager=self.connection_manager
+        )
+    
+    def run_scheduled(
+        self,
+        on_changes: Callable[[List[Dict[str, Any]]], None],
+        stop: threading.Event
+    ) -> None:
+        """Check each website whenever its ``frequency`` makes it due.
+        
+        Runs until stop is set. Every website is checked once at startup.
+        The fetcher, its connections and the history database stay open
+        between checks, and websites that are due together are checked in
+        one run.
+        
+        Args:
+            on_changes: Called after every run with the changes it found,
+                which may be none
+            stop: Event that ends the loop
+        """
+        scheduler = Scheduler(self.get_websites())
+        logger.info("Scheduling %s websites", len(scheduler))
+        while not stop.is_set():
+            if self._reload_config_if_changed():
+                scheduler.update(self.get_websites())
+            due = scheduler.pop_due()
+            if due:
+                on_changes(self.start_monitoring(due))
+            stop.wait(self._scheduler_sleep(scheduler))
+    
+    async def run_scheduled_async(
+        self,
+        on_changes: Callable[[List[Dict[str, Any]]], None],
+        stop: asyncio.Event
+    ) -> None:
+        """Check each website whenever it is due, on one asyncio event loop.
+        
+        The async counterpart of run_scheduled(); a single fetcher session
+        is kept open for the whole run.
+        
+        Args:
+            on_changes: Called after every run with the changes it found,
+                which may be none
+            stop: Event that ends the loop
+        """
+        scheduler = Scheduler(self.get_websites())
+        logger.info("Scheduling %s websites", len(scheduler))
+        async with self._async_fetcher() as fetcher:
+            while not stop.is_set():
+                if self._reload_config_if_changed():
+                    scheduler.update(self.get_websites())
+                due = scheduler.pop_due()
+                if due:
+                    on_changes(await self.start_monitoring_async(due, fetcher))
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self._scheduler_sleep(scheduler))
+                except asyncio.TimeoutError:
+                    pass
+    
+    @staticmethod
+    def _scheduler_sleep(scheduler: Scheduler) -> float:
+        """Get how long to sleep until the next website is due.
+        
+        Never longer than CONFIG_POLL_INTERVAL, so config edits are noticed.
+        """
+        wait = scheduler.time_until_due()
+        return CONFIG_POLL_INTERVAL if wait is None else min(wait, CONFIG_POLL_INTERVAL)
+    
+    def _config_file_mtime(self) -> Optional[float]:
+        """Get the modification time of the config file, None if unreadable."""
+        try:
+            return os.path.getmtime(self.config.config_path)
+        except OSError:
+            return None
+    
+    def _reload_config_if_changed(self) -> bool:
+        """Reload the config file if it changed since it was last read.
+        
+        Only the website list is picked up; monitoring and storage settings
+        need a restart.
+        
+        Returns:
+            bool: True if the config was reloaded
+        """
+        mtime = self._config_file_mtime()
+        if mtime is None or mtime == self._config_mtime:
+            return False
+        try:
+            self.config.load_config()
+        except Exception as e:
+            logger.error("Error reloading configuration: %s", e)
+            return False
+        self._config_mtime = mtime
+        logger.info("Configuration reloaded: %s websites", len(self.get_websites()))
+        return True
+    
+    def _record_stat(self, key: str, name: Optional[str] = None) -> None:
+        """Increment a run summary counter.
+        
+        Args:
+            key: Counter name
+            name: Website the counter is the outcome of, if any
+        """
+        with self._run_stats_lock:
+            self.run_stats[key] += 1
+        if name is not None:
+            self.metrics.record_site(name, outcome=key)
+    
+    def _record_timing(self, stage: str, seconds: float, name: Optional[str] = None) -> None:
+        """Add a duration to a stage's timings for the current run.
+        
+        Args:
+            stage: 'check', 'fetch', 'dns', 'connect', 'ttfb', 'download',
+                'parse', 'match', 'diff' or 'persist' (writing the run's
+                snapshots, once per run)
+            seconds: Duration
+            name: Website the stage ran for, None for run-wide stages
+        """
+        self.metrics.observe(stage, seconds, name)
+    
+    @contextmanager
+    def _timed(self, stage: str, name: Optional[str] = None) -> Iterator[None]:
+        """Time the block as one occurrence of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record_timing(stage, time.perf_counter() - start, name)
+    
+    def _record_fetch_stats(
+        self,
+        name: str,
+        stats: Dict[str, Any],
+        timings: Dict[str, float],
+        elapsed: float
+    ) -> None:
+        """Keep the byte statistics and timings of a site's response.
+        
+        Args:
+            name: Website name
+            stats: Statistics from the fetcher, empty if no body was read
+            timings: Per-stage timings from the fetcher
+            elapsed: Seconds fetch_content() took, including rate limiting
+                and parsing
+        """
+        self._record_timing('fetch', elapsed - stats.get('parse_seconds', 0.0), name)
+        for stage, seconds in timings.items():
+            self._record_timing(stage, seconds, name)
+        if not stats:
+            return
+        self.metrics.record_site(
+            name,
+            **{key: value for key, value in stats.items() if key != 'parse_seconds'}
+        )
+        with self._run_stats_lock:
+            self.fetch_stats[name] = stats
+    
+    def _write_run_metrics(self) -> None:
+        """Write the run's metrics as JSON and Prometheus text to ``metrics_dir``.
+        
+        Sharded runs write their own files. Nothing is written if
+        ``monitoring.metrics_dir`` is empty.
+        """
+        self.metrics.finish()
+        if not self.metrics_dir:
+            return
+        stem = shard_path('run_metrics', self.shard) if self.shard else 'run_metrics'
+        try:
+            json_path, prom_path = self.metrics.write(self.metrics_dir, stem)
+            logger.debug("Run metrics written to %s and %s", json_path, prom_path)
+        except Exception as e:
+            logger.error("Error writing run metrics: %s", e)
+    
+    def _record_check(self, name: str, timestamp: datetime) -> None:
+        """Record a successful check for the revisit statistics.
+        
+        Args:
+            name: Website name
+            timestamp: Fetch timestamp
+        """
+        try:
+            self.history.record_check(name, timestamp)
+        except Exception as e:
+            logger.error("Error recording check of %s: %s", name, e)
+    
+    def _log_run_summary(self) -> None:
+        """Log the counters collected during the run."""
+        stats = self.run_stats
+        logger.info(
+            "Run summary: %d checked, %d not modified (304), %d identical body (parse skipped), "
+            "%d identical text (diff skipped), %d below threshold (diff skipped), "
+            "%d changed, %d unchanged after diff, %d initial, %d failed, %d skipped (circuit open)",
+            sum(stats.values()),
+            stats['not_modified'],
+            stats['body_unchanged'],
+            stats['content_unchanged'],
+            stats['below_threshold'],
+            stats['changed'],
+            stats['unchanged'],
+            stats['initial'],
+            stats['failed'],
+            stats['circuit_open']
+        )
+        connections = self.metrics.connections = self.content_fetcher.get_connection_stats(self._connection_baseline)
+        if connections['requests']:
+            logger.info(
+                "Connections: %d requests, %d new connections (%.0f%% reused), %d waits for a pooled "
+                "connection (%.3fs), DNS cache %d hits / %d misses",
+                connections['requests'],
+                connections['new_connections'],
+                connections['reuse_ratio'] * 100,
+                connections['pool_waits'],
+                connections['pool_wait_seconds'],
+                connections['dns_hits'],
+                connections['dns_misses']
+            )
+        if not self.fetch_stats:
+            return
         
-        return changes
+        total_bytes = sum(site['bytes_read'] for site in self.fetch_stats.values())
+        truncated = sum(1 for site in self.fetch_stats.values() if site['truncated'])
+        largest = sorted(self.fetch_stats.items(), key=lambda item: item[1]['peak_bytes'], reverse=True)[:3]
+        logger.info(
+            "Bytes read: %d across %d responses, %d truncated; largest peak in memory: %s",
+            total_bytes,
+            len(self.fetch_stats),
+            truncated,
+            ', '.join(
+                f"{name} {site['peak_bytes']} ({'streamed' if site['streamed'] else 'buffered'})"
+                for name, site in largest
+            )
+        )
     
     def _check_website(self, website: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Check a single website for changes.
@@ -55,43 +809,451 @@ class WebsiteMonitor:
         Returns:
             Optional[Dict[str, Any]]: Changes detected, if any
         """
-        name = website.get('name', 'Unknown')
-        url = website.get('url')
-        selectors = website.get('content', {}).get('selectors', [])
+        site = self.config.compiled(website)
+        name, url, selectors, exclude = site.name, site.url, site.selectors, site.exclude
         
         if not url or not selectors:
-            logger.error(f"Invalid configuration for website {name}")
+            logger.error("Invalid configuration for website %s", name)
+            self._record_stat('failed', name)
             return None
         
         try:
+            # Load previous content and reuse its validators for a conditional GET
+            previous_data = self._load_previous_content(name)
+            info = FetchInfo(self._snapshot_validators(previous_data, selectors, exclude))
+            
             # Fetch current content
-            content, timestamp = self.content_fetcher.fetch_content(url, selectors)
+            fetch_start = time.perf_counter()
+            content, timestamp = self.content_fetcher.fetch_content(
+                url,
+                site.plan,
+                site.parser,
+                exclude,
+                site.max_bytes,
+                site.streaming,
+                info
+            )
+            self._record_fetch_stats(name, info.stats, info.timings, time.perf_counter() - fetch_start)
+            self._record_check(name, timestamp)
+            if content is None:
+                self._record_stat(info.outcome, name)
+                logger.info("%s unchanged since last check (%s)", name, info.outcome)
+                if info.outcome == FETCH_BODY_UNCHANGED:
+                    self._refresh_validators(name, previous_data, info.validators)
+                return None
             
-            # Load previous content
-            previous_data = self._load_previous_content(name)
+            return self._process_content(
+                name,
+                selectors,
+                exclude,
+                content,
+                timestamp,
+                previous_data,
+                info.validators,
+                site.threshold
+            )
+            
+        except Exception as e:
+            if is_retryable(e):
+                raise
+            logger.error("Error checking website %s: %s", name, e)
+            self._record_stat('failed', name)
+            return None
+    
+    async def _check_website_async(
+        self,
+        website: Dict[str, Any],
+        fetcher: AsyncContentFetcher
+    ) -> Optional[Dict[str, Any]]:
+        """Check a single website for changes using the async fetcher.
+        
+        Args:
+            website: Website configuration
+            fetcher: Async content fetcher shared by the run
             
-            # Save current content
-            self._save_content(name, content, timestamp)
+        Returns:
+            Optional[Dict[str, Any]]: Changes detected, if any
+        """
+        site = self.config.compiled(website)
+        name, url, selectors, exclude = site.name, site.url, site.selectors, site.exclude
+        
+        if not url or not selectors:
+            logger.error("Invalid configuration for website %s", name)
+            self._record_stat('failed', name)
+            return None
+        
+        try:
+            previous_data = self._load_previous_content(name)
+            info = FetchInfo(self._snapshot_validators(previous_data, selectors, exclude))
             
-            # If no previous content, just save current and return
-            if not previous_data:
-                logger.info(f"Initial content saved for {name}")
+            fetch_start = time.perf_counter()
+            content, timestamp = await fetcher.fetch_content(
+                url,
+                site.plan,
+                site.parser,
+                exclude,
+                site.max_bytes,
+                site.streaming,
+                info
+            )
+            self._record_fetch_stats(name, info.stats, info.timings, time.perf_counter() - fetch_start)
+            self._record_check(name, timestamp)
+            if content is None:
+                self._record_stat(info.outcome, name)
+                logger.info("%s unchanged since last check (%s)", name, info.outcome)
+                if info.outcome == FETCH_BODY_UNCHANGED:
+                    self._refresh_validators(name, previous_data, info.validators)
                 return None
             
-            # Compare content and detect changes
-            changes = self._detect_changes(
+            process_args = (
                 name,
-                previous_data['content'],
+                selectors,
+                exclude,
                 content,
-                previous_data['timestamp'],
-                timestamp
+                timestamp,
+                previous_data,
+                info.validators,
+                site.threshold
             )
+            if self.parse_pool is not None:
+                # The diff waits on the process pool, which must not block the loop
+                return await asyncio.to_thread(self._process_content, *process_args)
+            return self._process_content(*process_args)
             
-            return changes if changes['changes'] else None
-            
         except Exception as e:
-            logger.error(f"Error checking website {name}: {str(e)}")
+            if is_retryable(e):
+                raise
+            logger.error("Error checking website %s: %s", name, e)
+            self._record_stat('failed', name)
+            return None
+    
+    def _check_shared(self, group: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Check websites that share a URL from a single fetch.
+        
+        The page is downloaded and parsed once, then each website's selectors
+        are applied to the parsed tree.
+        
+        Args:
+            group: Valid website configurations with the same URL
+        
+        Returns:
+            List[Optional[Dict[str, Any]]]: Changes detected for each website, if any
+        """
+        sites = [self.config.compiled(website) for website in group]
+        try:
+            previous, body_hashes, info = self._prepare_shared(sites)
+            fetch_start = time.perf_counter()
+            contents, timestamp = self.content_fetcher.fetch_shared(
+                sites[0].url,
+                [site.plan for site in sites],
+                [site.parser for site in sites],
+                sites[0].max_bytes,
+                body_hashes,
+                info
+            )
+            jobs = self._split_shared(sites, previous, contents, timestamp, info, fetch_start)
+        except Exception as e:
+            if is_retryable(e):
+                raise
+            logger.error("Error checking websites %s: %s", ', '.join(site.name for site in sites), e)
+            for site in sites:
+                self._record_stat('failed', site.name)
+            return [None] * len(sites)
+        return [self._safe_process_content(job) if job else None for job in jobs]
+    
+    async def _check_shared_async(
+        self,
+        group: List[Dict[str, Any]],
+        fetcher: AsyncContentFetcher
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Check websites that share a URL from a single fetch, using the async fetcher.
+        
+        Args:
+            group: Valid website configurations with the same URL
+            fetcher: Async content fetcher shared by the run
+        
+        Returns:
+            List[Optional[Dict[str, Any]]]: Changes detected for each website, if any
+        """
+        sites = [self.config.compiled(website) for website in group]
+        try:
+            previous, body_hashes, info = self._prepare_shared(sites)
+            fetch_start = time.perf_counter()
+            contents, timestamp = await fetcher.fetch_shared(
+                sites[0].url,
+                [site.plan for site in sites],
+                [site.parser for site in sites],
+                sites[0].max_bytes,
+                body_hashes,
+                info
+            )
+            jobs = self._split_shared(sites, previous, contents, timestamp, info, fetch_start)
+        except Exception as e:
+            if is_retryable(e):
+                raise
+            logger.error("Error checking websites %s: %s", ', '.join(site.name for site in sites), e)
+            for site in sites:
+                self._record_stat('failed', site.name)
+            return [None] * len(sites)
+        
+        results = []
+        for job in jobs:
+            if job is None:
+                results.append(None)
+            elif self.parse_pool is not None:
+                # The diff waits on the process pool, which must not block the loop
+                results.append(await asyncio.to_thread(self._safe_process_content, job))
+            else:
+                results.append(self._safe_process_content(job))
+        return results
+    
+    def _prepare_shared(
+        self,
+        sites: List[CompiledWebsite]
+    ) -> Tuple[List[Optional[Dict[str, Any]]], List[Optional[str]], FetchInfo]:
+        """Load the snapshots of websites sharing a URL and set up the conditional GET.
+        
+        The request is only made conditional if every website's snapshot
+        has the same ETag and Last-Modified, as a 304 answers for all of them.
+        
+        Args:
+            sites: Compiled websites with the same URL
+        
+        Returns:
+            Tuple[List[Optional[Dict[str, Any]]], List[Optional[str]], FetchInfo]:
+            Previous snapshot and body digest of each website, and the state
+            of the fetch
+        """
+        previous = [self._load_previous_content(site.name) for site in sites]
+        validators = [
+            self._snapshot_validators(previous_data, site.selectors, site.exclude) or {}
+            for previous_data, site in zip(previous, sites)
+        ]
+        conditional = [{key: value.get(key) for key in ('etag', 'last_modified')} for value in validators]
+        shared = any(conditional[0].values()) and all(value == conditional[0] for value in conditional)
+        info = FetchInfo(conditional[0] if shared else None)
+        return previous, [value.get('body_hash') for value in validators], info
+    
+    def _split_shared(
+        self,
+        sites: List[CompiledWebsite],
+        previous: List[Optional[Dict[str, Any]]],
+        contents: Optional[List[Optional[str]]],
+        timestamp: datetime,
+        info: FetchInfo,
+        fetch_start: float
+    ) -> List[Optional[tuple]]:
+        """Record a shared fetch for each website and get the content left to process.
+        
+        The response's bytes and timings are recorded for the first website;
+        the others are marked as sharing its fetch.
+        
+        Args:
+            sites: Compiled websites with the same URL
+            previous: Previous snapshot of each website
+            contents: Result of fetch_shared()
+            timestamp: Fetch timestamp
+            info: State of the fetch
+            fetch_start: perf_counter() before the fetch
+        
+        Returns:
+            List[Optional[tuple]]: _process_content() arguments for each website
+            with new content, None for the others
+        """
+        self._record_fetch_stats(sites[0].name, info.stats, info.timings, time.perf_counter() - fetch_start)
+        outcome, validators = info.outcome, info.validators
+        jobs = []
+        for index, site in enumerate(sites):
+            if index:
+                self.metrics.record_site(site.name, shared_fetch=sites[0].name)
+            self._record_check(site.name, timestamp)
+            content = contents[index] if contents is not None else None
+            if content is None:
+                site_outcome = outcome if contents is None else FETCH_BODY_UNCHANGED
+                self._record_stat(site_outcome, site.name)
+                logger.info("%s unchanged since last check (%s)", site.name, site_outcome)
+                if site_outcome == FETCH_BODY_UNCHANGED:
+                    self._refresh_validators(site.name, previous[index], validators)
+                jobs.append(None)
+                continue
+            jobs.append((
+                site.name,
+                site.selectors,
+                site.exclude,
+                content,
+                timestamp,
+                previous[index],
+                validators,
+                site.threshold
+            ))
+        return jobs
+    
+    def _safe_process_content(self, job: tuple) -> Optional[Dict[str, Any]]:
+        """Run _process_content() for one website of a shared fetch, logging failures.
+        
+        Args:
+            job: _process_content() arguments
+        
+        Returns:
+            Optional[Dict[str, Any]]: Changes detected, if any
+        """
+        try:
+            return self._process_content(*job)
+        except Exception as e:
+            logger.error("Error checking website %s: %s", job[0], e)
+            self._record_stat('failed', job[0])
+            return None
+    
+    @staticmethod
+    def _snapshot_validators(
+        previous_data: Optional[Dict[str, Any]],
+        selectors: list,
+        exclude: list
+    ) -> Optional[Dict[str, str]]:
+        """Get the validators of a snapshot if it can answer a conditional GET.
+        
+        A 304 only means the page is unchanged, so the stored content is only
+        reusable if it was extracted with the same selectors.
+        
+        Args:
+            previous_data: Previous snapshot, if any
+            selectors: Selectors configured for this run
+            exclude: Exclude selectors configured for this run
+            
+        Returns:
+            Optional[Dict[str, str]]: Validators to send, or None
+        """
+        if not previous_data or previous_data.get('selectors') != selectors:
+            return None
+        if (previous_data.get('exclude') or []) != exclude:
+            return None
+        return previous_data.get('validators')
+    
+    def _process_content(
+        self,
+        name: str,
+        selectors: list,
+        exclude: list,
+        content: str,
+        timestamp: datetime,
+        previous_data: Optional[Dict[str, Any]],
+        validators: Optional[Dict[str, str]] = None,
+        threshold: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Store freshly fetched content and compare it with the previous run.
+        
+        Args:
+            name: Name of the website
+            selectors: Selectors the content was extracted with
+            exclude: Exclude selectors the content was extracted with
+            content: Extracted content
+            timestamp: Fetch timestamp
+            previous_data: Previous snapshot, if any
+            validators: Cache validators of the response
+            threshold: The site's notification thresholds
+            
+        Returns:
+            Optional[Dict[str, Any]]: Changes detected, if any
+        """
+        # Identical extracted text: nothing to diff and no snapshot to add
+        content_hash = content_digest(content)
+        if previous_data and previous_data.get('content_hash') == content_hash:
+            self._refresh_validators(name, previous_data, validators)
+            self._record_stat('content_unchanged', name)
+            return None
+        
+        # Changes under the site's threshold are noise: skip the diff and keep
+        # the previous snapshot as the baseline so small changes still add up
+        content_fingerprint = fingerprint(content)
+        if previous_data and self._below_threshold(previous_data, content, content_fingerprint, threshold):
+            logger.info("%s changed below its notification threshold, diff skipped", name)
+            self._record_stat('below_threshold', name)
+            return None
+        
+        # Save current content
+        self._save_content(
+            name,
+            content,
+            timestamp,
+            selectors,
+            validators,
+            content_hash,
+            exclude,
+            content_fingerprint
+        )
+        
+        # If no previous content, just save current and return
+        if not previous_data:
+            logger.info("Initial content saved for %s", name)
+            self._record_stat('initial', name)
             return None
+        
+        # Compare content and detect changes
+        changes = self._detect_changes(
+            name,
+            previous_data['content'],
+            content,
+            previous_data['timestamp'],
+            timestamp
+        )
+        
+        self._record_stat('changed' if changes['changes'] else 'unchanged', name)
+        return changes if changes['changes'] else None
+    
+    def _refresh_validators(
+        self,
+        name: str,
+        previous_data: Optional[Dict[str, Any]],
+        validators: Optional[Dict[str, str]]
+    ) -> None:
+        """Store a response's validators on the latest snapshot if they changed.
+        
+        An unchanged response adds no snapshot, but its ETag, Last-Modified
+        or body hash may still be new; keeping the old ones would make
+        every later check download and extract the page again.
+        
+        Args:
+            name: Name of the website
+            previous_data: Latest snapshot, if any
+            validators: Cache validators of the response
+        """
+        if not previous_data or not validators or validators == previous_data.get('validators'):
+            return
+        try:
+            self.history.update_validators(name, validators)
+        except Exception as e:
+            logger.error("Error updating validators of %s: %s", name, e)
+    
+    @staticmethod
+    def _below_threshold(
+        previous_data: Dict[str, Any],
+        content: str,
+        content_fingerprint: Fingerprint,
+        threshold: Optional[Dict[str, Any]]
+    ) -> bool:
+        """Check whether a change is too small to be worth diffing.
+        
+        Only sites with a ``changed`` threshold are checked. If the site also
+        notifies on single added or removed lines, only changes in volatile
+        tokens (timestamps, hashes, session ids) count as noise; otherwise
+        the fingerprint distance estimates the changed fraction of lines.
+        
+        Args:
+            previous_data: Previous snapshot
+            content: Current content
+            content_fingerprint: Fingerprint of the current content
+            threshold: The site's notification thresholds
+            
+        Returns:
+            bool: True if the diff can be skipped
+        """
+        if not threshold or threshold.get('changed') is None:
+            return False
+        if threshold.get('added') or threshold.get('removed'):
+            return differs_only_in_noise(previous_data['content'], content)
+        
+        previous_fingerprint = previous_data.get('fingerprint') or fingerprint(previous_data['content'])
+        return distance(previous_fingerprint, content_fingerprint) < float(threshold['changed'])
     
     def _load_previous_content(self, website_name: str) -> Optional[Dict[str, Any]]:
         """Load previous content for a website.
@@ -102,39 +1264,51 @@ class WebsiteMonitor:
         Returns:
             Optional[Dict[str, Any]]: Previous content data if exists
         """
-        file_path = self.data_dir / f"{website_name.lower().replace(' ', '_')}.json"
-        if not file_path.exists():
-            return None
-        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return {
-                    'content': data['content'],
-                    'timestamp': datetime.fromisoformat(data['timestamp'])
-                }
+            return self.history.latest(website_name)
         except Exception as e:
-            logger.error(f"Error loading previous content for {website_name}: {str(e)}")
+            logger.error("Error loading previous content for %s: %s", website_name, e)
             return None
     
-    def _save_content(self, website_name: str, content: str, timestamp: datetime) -> None:
-        """Save current content for a website.
+    def _save_content(
+        self,
+        website_name: str,
+        content: str,
+        timestamp: datetime,
+        selectors: Optional[list] = None,
+        validators: Optional[Dict[str, str]] = None,
+        content_hash: Optional[str] = None,
+        exclude: Optional[list] = None,
+        content_fingerprint: Optional[Fingerprint] = None
+    ) -> None:
+        """Append current content to the website's history.
+        
+        Inside a run the snapshot is written with the rest of the run's
+        snapshots in a single transaction.
         
         Args:
             website_name: Name of the website
             content: Current content
             timestamp: Current timestamp
+            selectors: Selectors the content was extracted with
+            validators: Cache validators (ETag / Last-Modified / body hash) of the response
+            content_hash: Digest of the extracted content
+            exclude: Exclude selectors the content was extracted with
+            content_fingerprint: Similarity fingerprint of the content
         """
-        file_path = self.data_dir / f"{website_name.lower().replace(' ', '_')}.json"
         try:
-            data = {
-                'content': content,
-                'timestamp': timestamp.isoformat()
-            }
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.history.add_snapshot(
+                website_name,
+                content,
+                timestamp,
+                selectors,
+                validators,
+                content_hash,
+                exclude,
+                content_fingerprint
+            )
         except Exception as e:
-            logger.error(f"Error saving content for {website_name}: {str(e)}")
+            logger.error("Error saving content for %s: %s", website_name, e)
     
     def _detect_changes(
         self,
@@ -154,31 +1328,30 @@ class WebsiteMonitor:
             current_timestamp: Current timestamp
             
         Returns:
-            Dict[str, Any]: Changes detected
+            Dict[str, Any]: Changes detected. 'added' and 'removed' list lines
+            with their line numbers, 'moved' lists lines that changed position
         """
-        # Split content into lines for comparison
-        prev_lines = set(previous_content.splitlines())
-        curr_lines = set(current_content.splitlines())
-        
-        # Find added and removed lines
-        added = curr_lines - prev_lines
-        removed = prev_lines - curr_lines
-        
-        # Calculate change percentage
-        total_lines = len(prev_lines | curr_lines)
-        changes = len(added) + len(removed)
-        change_percentage = (changes / total_lines * 100) if total_lines > 0 else 0
+        with self._timed('diff', website_name):
+            if self.parse_pool is not None:
+                diff = self.parse_pool.submit(analyze_changes, previous_content, current_content).result()
+            else:
+                diff = analyze_changes(previous_content, current_content)
         
         return {
             'website': website_name,
             'timestamp': current_timestamp.isoformat(),
             'previous_check': previous_timestamp.isoformat(),
-            'changes': bool(added or removed),
-            'added': list(added),
-            'removed': list(removed),
-            'change_percentage': round(change_percentage, 2)
+            'changes': bool(diff['added'] or diff['removed'] or diff['moved']),
+            'added': diff['added'],
+            'removed': diff['removed'],
+            'moved': diff['moved'],
+            'change_percentage': diff['change_percentage']
         }
     
     def close(self) -> None:
         """Clean up resources."""
-        self.content_fetcher.close()
\ No newline at end of file
+        self.content_fetcher.close()
+        self.connection_manager.close()
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown()
+        self.history.close()
\ No newline at end of file
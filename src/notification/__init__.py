@@ -0,0 +1,7 @@
+"""Change notification package."""
+
+from .dispatcher import NotificationDispatcher, meets_threshold
+from .outbox import Outbox
+from .transport import SmtpTransport
+
+__all__ = ['NotificationDispatcher', 'Outbox', 'SmtpTransport', 'meets_threshold']
@@ -0,0 +1,297 @@
+import time
+from collections import OrderedDict
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, Tuple
+from .outbox import DEFAULT_OUTBOX_PATH, Outbox
+from .transport import SmtpTransport
+from ..detector.diff_report import format_changes
+from ..utils.config import expand_env
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+# Added or removed lines listed per change in a digest; the rest are counted
+DIGEST_MAX_LINES = 100
+
+def _expand(value: Any) -> Any:
+    """Expand ${VAR} references, None if a variable is unset."""
+    expanded = expand_env(value)
+    if not isinstance(expanded, str):
+        return expanded
+    return None if '${' in expanded or not expanded else expanded
+
+def parse_recipients(value: Any) -> List[str]:
+    """Get the addresses of a ``to`` setting.
+    
+    Args:
+        value: Address, comma-separated addresses, a list of them or
+            ${VAR} references to any of these
+    
+    Returns:
+        List[str]: Addresses, empty if none are set
+    """
+    values = value if isinstance(value, list) else [value]
+    recipients = []
+    for item in values:
+        expanded = _expand(item)
+        if expanded:
+            recipients.extend(address.strip() for address in str(expanded).split(',') if address.strip())
+    return recipients
+
+def meets_threshold(change: Dict[str, Any], threshold: Optional[Dict[str, Any]]) -> bool:
+    """Check whether a change is big enough to notify about.
+    
+    Args:
+        change: Change detected for a site
+        threshold: The site's ``notification.threshold``: 'added' and
+            'removed' line counts and 'changed' as a fraction (0.05 = 5%).
+            Any one of them being reached is enough
+    
+    Returns:
+        bool: True if any threshold is reached, or if none are set
+    """
+    if not threshold:
+        return True
+    reached = []
+    if threshold.get('added') is not None:
+        reached.append(len(change['added']) >= threshold['added'])
+    if threshold.get('removed') is not None:
+        reached.append(len(change['removed']) >= threshold['removed'])
+    if threshold.get('changed') is not None:
+        reached.append(change['change_percentage'] >= float(threshold['changed']) * 100)
+    return any(reached) if reached else True
+
+def _trim(change: Dict[str, Any]) -> Dict[str, Any]:
+    """Limit the lines a change lists in a digest."""
+    trimmed = dict(change)
+    for key in ('added', 'removed', 'moved'):
+        lines = change.get(key) or []
+        if len(lines) > DIGEST_MAX_LINES:
+            trimmed[key] = lines[:DIGEST_MAX_LINES]
+            trimmed[f"{key}_omitted"] = len(lines) - DIGEST_MAX_LINES
+    return trimmed
+
+class NotificationDispatcher:
+    def __init__(
+        self,
+        transport: SmtpTransport,
+        sender: str,
+        websites: List[Dict[str, Any]],
+        default_recipients: Optional[List[str]] = None,
+        batch_interval: float = 3600,
+        max_emails: int = 50,
+        period: float = 3600,
+        outbox_path: str = DEFAULT_OUTBOX_PATH
+    ):
+        """Initialize notification dispatcher.
+        
+        Changes that reach their site's threshold are queued in a persistent
+        outbox. Once the oldest queued change is batch_interval old, all
+        queued changes are sent as one digest per set of recipients, over a
+        single SMTP connection. At most max_emails are sent per period; the
+        rest wait for a later flush.
+        
+        Args:
+            transport: SMTP delivery
+            sender: From address
+            websites: Website configurations, for thresholds and recipients
+            default_recipients: Recipients of sites without ``notification.email.to``
+            batch_interval: Seconds changes are collected before a digest is sent
+            max_emails: Emails allowed per period
+            period: Rate limit window in seconds
+            outbox_path: SQLite file of the outbox
+        """
+        self.transport = transport
+        self.sender = sender
+        self.websites = {website.get('name', 'Unknown'): website for website in websites}
+        self.default_recipients = default_recipients or []
+        self.batch_interval = float(batch_interval)
+        self.max_emails = max(1, int(max_emails))
+        self.period = float(period)
+        self.outbox = Outbox(outbox_path)
+    
+    @classmethod
+    def from_config(cls, config) -> Optional['NotificationDispatcher']:
+        """Create a dispatcher from the ``email`` config section.
+        
+        Args:
+            config: Config instance
+        
+        Returns:
+            Optional[NotificationDispatcher]: Configured dispatcher, None if
+            email is not configured or its sender is not set
+        """
+        email_config = config.get_email_config() or {}
+        sender = _expand(email_config.get('from'))
+        if not email_config or not sender:
+            return None
+        if email_config.get('service', 'gmail') == 'gmail':
+            credentials = {key: _expand(value) for key, value in (email_config.get('credentials') or {}).items()}
+            if not all(credentials.get(key) for key in ('client_id', 'client_secret', 'refresh_token')):
+                logger.warning("Gmail credentials are not set, notifications are disabled")
+                return None
+            email_config = {**email_config, 'credentials': credentials}
+        elif email_config.get('smtp'):
+            # Unset ${VAR} references fall back to the defaults
+            email_config = {
+                **email_config,
+                'smtp': {key: value for key, value in email_config['smtp'].items() if _expand(value) is not None}
+            }
+        rate_limit = email_config.get('rate_limit') or {}
+        return cls(
+            SmtpTransport.from_config(email_config, sender),
+            sender,
+            config.get_websites(),
+            parse_recipients(email_config.get('to') or '${DEFAULT_EMAIL_RECIPIENTS}'),
+            email_config.get('batch_interval', 3600),
+            rate_limit.get('max_emails', 50),
+            rate_limit.get('period', 3600),
+            email_config.get('outbox', DEFAULT_OUTBOX_PATH)
+        )
+    
+    def recipients_for(self, site: str) -> List[str]:
+        """Get who is notified about a site.
+        
+        Args:
+            site: Website name
+        
+        Returns:
+            List[str]: The site's ``notification.email.to``, or the defaults
+        """
+        notification = (self.websites.get(site) or {}).get('notification') or {}
+        return parse_recipients((notification.get('email') or {}).get('to')) or self.default_recipients
+    
+    def enqueue(self, changes: List[Dict[str, Any]], now: Optional[float] = None) -> int:
+        """Queue the changes that reach their site's threshold.
+        
+        Args:
+            changes: Changes detected by a run
+            now: Current time, defaults to now
+        
+        Returns:
+            int: Number of changes queued
+        """
+        entries = []
+        for change in changes:
+            site = change['website']
+            notification = (self.websites.get(site) or {}).get('notification') or {}
+            if not meets_threshold(change, notification.get('threshold')):
+                logger.info("%s changed below its notification threshold, not notifying", site)
+                continue
+            recipients = self.recipients_for(site)
+            if not recipients:
+                logger.warning("No recipients for %s, not notifying", site)
+                continue
+            entries.append((recipients, change))
+        return self.outbox.add(entries, now)
+    
+    def flush(self, now: Optional[float] = None, force: bool = False) -> int:
+        """Send the queued changes as digests if the batch interval is up.
+        
+        Args:
+            now: Current time, defaults to now
+            force: Send regardless of the batch interval
+        
+        Returns:
+            int: Number of emails sent
+        """
+        now = time.time() if now is None else now
+        oldest = self.outbox.oldest_queued()
+        if oldest is None or (not force and now - oldest < self.batch_interval):
+            return 0
+        
+        self.outbox.prune_sent(now - self.period)
+        allowed = self.max_emails - self.outbox.sent_since(now - self.period)
+        digests = self._digests()
+        if allowed <= 0:
+            logger.warning(
+                "Email rate limit of %d per %ds reached, %d digests stay queued",
+                self.max_emails,
+                self.period,
+                len(digests)
+            )
+            return 0
+        if len(digests) > allowed:
+            logger.warning("Email rate limit reached, sending %d of %d digests", allowed, len(digests))
+            digests = digests[:allowed]
+        
+        messages = [self._message(recipients, changes) for recipients, _, changes in digests]
+        delivered = self.transport.send(messages)
+        for recipients, ids, _ in digests[:delivered]:
+            self.outbox.mark_sent(ids, recipients, now)
+        logger.info(
+            "Sent %d notification emails covering %d changes",
+            delivered,
+            sum(len(ids) for _, ids, _ in digests[:delivered])
+        )
+        return delivered
+    
+    def dispatch(self, changes: List[Dict[str, Any]], now: Optional[float] = None) -> int:
+        """Queue a run's changes, then send digests that are due.
+        
+        Args:
+            changes: Changes detected by the run, may be empty
+            now: Current time, defaults to now
+        
+        Returns:
+            int: Number of emails sent
+        """
+        try:
+            self.enqueue(changes, now)
+            return self.flush(now)
+        except Exception as e:
+            logger.error("Error dispatching notifications: %s", e)
+            return 0
+    
+    def _digests(self) -> List[Tuple[List[str], List[int], List[Dict[str, Any]]]]:
+        """Group the queued changes by recipients.
+        
+        Returns:
+            List[Tuple[List[str], List[int], List[Dict[str, Any]]]]: Recipients,
+            outbox ids and changes of each digest, oldest digest first. Changes
+            are grouped by site, each site's in the order they were found
+        """
+        groups: Dict[Tuple[str, ...], Tuple[List[int], Dict[str, List[Dict[str, Any]]]]] = OrderedDict()
+        for row_id, recipients, _, change in self.outbox.pending():
+            ids, by_site = groups.setdefault(tuple(recipients), ([], OrderedDict()))
+            ids.append(row_id)
+            by_site.setdefault(change['website'], []).append(change)
+        return [
+            (list(recipients), ids, [change for site_changes in by_site.values() for change in site_changes])
+            for recipients, (ids, by_site) in groups.items()
+        ]
+    
+    def _message(self, recipients: List[str], changes: List[Dict[str, Any]]) -> EmailMessage:
+        """Build the digest email of some changes.
+        
+        Args:
+            recipients: To addresses
+            changes: Changes to report, grouped by site
+        
+        Returns:
+            EmailMessage: The digest
+        """
+        sites = list(OrderedDict.fromkeys(change['website'] for change in changes))
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = ', '.join(recipients)
+        if len(sites) == 1:
+            message['Subject'] = f"Website changes: {sites[0]}"
+        else:
+            message['Subject'] = f"Website changes: {len(sites)} sites"
+        
+        lines = [f"Changes detected on {len(sites)} websites: {', '.join(sites)}\n\n"]
+        for change in changes:
+            trimmed = _trim(change)
+            lines.extend(format_changes([trimmed]))
+            omitted = {key: trimmed[f"{key}_omitted"] for key in ('added', 'removed', 'moved') if f"{key}_omitted" in trimmed}
+            if omitted:
+                lines.append(
+                    "Not listed: " + ', '.join(f"{count} more {key} lines" for key, count in omitted.items()) + "\n\n"
+                )
+        message.set_content(''.join(lines))
+        return message
+    
+    def close(self) -> None:
+        """Close the outbox."""
+        self.outbox.close()
@@ -0,0 +1,119 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_OUTBOX_PATH = 'data/notifications.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    id INTEGER PRIMARY KEY,
+    recipients TEXT NOT NULL,
+    site TEXT NOT NULL,
+    queued REAL NOT NULL,
+    change TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sent (
+    id INTEGER PRIMARY KEY,
+    sent_at REAL NOT NULL,
+    recipients TEXT NOT NULL,
+    changes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sent_time ON sent (sent_at);
+"""
+
+class Outbox:
+    def __init__(self, path: str = DEFAULT_OUTBOX_PATH):
+        """Open (or create) the notification outbox.
+        
+        Changes wait in the outbox until their digest is sent, so they
+        survive between cron runs. The outbox also logs when each email was
+        sent, for the rate limit.
+        
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+    
+    def add(self, entries: Iterable[Tuple[List[str], Dict[str, Any]]], queued: Optional[float] = None) -> int:
+        """Queue changes for delivery.
+        
+        Args:
+            entries: (recipients, change) pairs
+            queued: Time the changes were queued, defaults to now
+        
+        Returns:
+            int: Number of changes queued
+        """
+        queued = time.time() if queued is None else queued
+        rows = [
+            (json.dumps(sorted(recipients)), change['website'], queued, json.dumps(change, ensure_ascii=False))
+            for recipients, change in entries
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO pending (recipients, site, queued, change) VALUES (?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+    
+    def pending(self) -> List[Tuple[int, List[str], float, Dict[str, Any]]]:
+        """Get the queued changes, oldest first.
+        
+        Returns:
+            List[Tuple[int, List[str], float, Dict[str, Any]]]: (id, recipients,
+            queued time, change) of each queued change
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, recipients, queued, change FROM pending ORDER BY queued, id'
+            ).fetchall()
+        return [(row_id, json.loads(recipients), queued, json.loads(change)) for row_id, recipients, queued, change in rows]
+    
+    def oldest_queued(self) -> Optional[float]:
+        """Get when the oldest queued change was queued, None if none are."""
+        with self._lock:
+            return self._conn.execute('SELECT MIN(queued) FROM pending').fetchone()[0]
+    
+    def mark_sent(self, ids: List[int], recipients: List[str], sent_at: Optional[float] = None) -> None:
+        """Remove delivered changes and log the email for the rate limit.
+        
+        Args:
+            ids: Ids of the changes the email contained
+            recipients: Recipients of the email
+            sent_at: Delivery time, defaults to now
+        """
+        sent_at = time.time() if sent_at is None else sent_at
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM pending WHERE id = ?', [(row_id,) for row_id in ids])
+            self._conn.execute(
+                'INSERT INTO sent (sent_at, recipients, changes) VALUES (?, ?, ?)',
+                (sent_at, json.dumps(sorted(recipients)), len(ids))
+            )
+    
+    def sent_since(self, since: float) -> int:
+        """Count the emails sent since a time.
+        
+        Args:
+            since: Epoch seconds
+        
+        Returns:
+            int: Number of emails
+        """
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM sent WHERE sent_at > ?', (since,)).fetchone()[0]
+    
+    def prune_sent(self, before: float) -> None:
+        """Forget emails sent before a time, once they no longer count for the rate limit."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM sent WHERE sent_at <= ?', (before,))
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
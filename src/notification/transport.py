@@ -0,0 +1,160 @@
+import base64
+import smtplib
+import ssl
+from email.message import EmailMessage
+from typing import Any, Callable, Dict, List, Optional
+from ..utils.logger import Logger
+
+logger = Logger.get_logger()
+
+GMAIL_SMTP_HOST = 'smtp.gmail.com'
+GMAIL_TOKEN_URI = 'https://oauth2.googleapis.com/token'
+
+def gmail_access_token(credentials: Dict[str, str]) -> Callable[[], str]:
+    """Create a function that gets a Gmail access token from a refresh token.
+    
+    Args:
+        credentials: 'client_id', 'client_secret' and 'refresh_token'
+    
+    Returns:
+        Callable[[], str]: Returns a valid access token, refreshing it if needed
+    """
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    
+    oauth = Credentials(
+        None,
+        refresh_token=credentials['refresh_token'],
+        client_id=credentials['client_id'],
+        client_secret=credentials['client_secret'],
+        token_uri=GMAIL_TOKEN_URI
+    )
+    
+    def access_token() -> str:
+        if not oauth.valid:
+            oauth.refresh(Request())
+        return oauth.token
+    
+    return access_token
+
+class SmtpTransport:
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 25,
+        starttls: bool = False,
+        use_ssl: bool = False,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        access_token: Optional[Callable[[], str]] = None,
+        timeout: float = 30
+    ):
+        """Initialize SMTP delivery.
+        
+        Every send() delivers all of its messages over a single connection.
+        
+        Args:
+            host: SMTP server
+            port: SMTP port
+            starttls: Upgrade the connection with STARTTLS
+            use_ssl: Connect with implicit TLS (e.g. port 465)
+            username: Login name, None to send without authentication
+            password: Password for username
+            access_token: Returns an OAuth2 token for XOAUTH2 login as username,
+                used instead of the password
+            timeout: Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.username = username
+        self.password = password
+        self.access_token = access_token
+        self.timeout = timeout
+    
+    @classmethod
+    def from_config(cls, email_config: Dict[str, Any], sender: str) -> 'SmtpTransport':
+        """Create the transport for an ``email`` config section.
+        
+        Args:
+            email_config: Mapping with 'service' ('gmail' or 'smtp') and
+                either 'credentials' (gmail) or 'smtp' settings
+            sender: Sender address, the login for Gmail
+        
+        Returns:
+            SmtpTransport: Configured transport
+        """
+        if email_config.get('service', 'gmail') == 'gmail':
+            return cls(
+                GMAIL_SMTP_HOST,
+                587,
+                starttls=True,
+                username=sender,
+                access_token=gmail_access_token(email_config.get('credentials') or {})
+            )
+        smtp_config = email_config.get('smtp') or {}
+        return cls(
+            host=smtp_config.get('host', 'localhost'),
+            port=int(smtp_config.get('port', 25)),
+            starttls=bool(smtp_config.get('starttls', False)),
+            use_ssl=bool(smtp_config.get('ssl', False)),
+            username=smtp_config.get('username'),
+            password=smtp_config.get('password'),
+            timeout=float(smtp_config.get('timeout', 30))
+        )
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open and authenticate a connection."""
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.username and self.access_token is not None:
+                auth = f"user={self.username}\1auth=Bearer {self.access_token()}\1\1"
+                code, response = smtp.docmd('AUTH', 'XOAUTH2 ' + base64.b64encode(auth.encode('utf-8')).decode('ascii'))
+                if code != 235:
+                    raise smtplib.SMTPAuthenticationError(code, response)
+            elif self.username:
+                smtp.login(self.username, self.password or '')
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+    
+    def send(self, messages: List[EmailMessage]) -> int:
+        """Deliver messages over one connection, in order.
+        
+        Delivery stops at the first failure; the messages before it were sent.
+        
+        Args:
+            messages: Messages with From and To headers
+        
+        Returns:
+            int: Number of messages delivered
+        """
+        if not messages:
+            return 0
+        delivered = 0
+        try:
+            smtp = self._connect()
+        except Exception as e:
+            logger.error("Error connecting to SMTP server %s:%s: %s", self.host, self.port, e)
+            return 0
+        try:
+            for message in messages:
+                smtp.send_message(message)
+                delivered += 1
+        except Exception as e:
+            logger.error("Error sending email %d of %d: %s", delivered + 1, len(messages), e)
+        finally:
+            try:
+                smtp.quit()
+            except Exception:
+                smtp.close()
+        return delivered
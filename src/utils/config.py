@@ -1,35 +1,447 @@
+import copy
+import gc
+import hashlib
+import json
 import os
+import re
 import yaml
-from typing import Dict, Any, Optional
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+# libyaml parses and dumps large configs an order of magnitude faster
+_Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+DEFAULT_CACHE_DIR = 'data/config_cache'
+
+# Bumped whenever the cached representation changes
+CACHE_VERSION = 3
+
+# Key path of a string inside a config value
+EnvPath = Tuple[Any, ...]
+
+# Indent and dash of a block sequence item, up to its value
+_ITEM_PREFIX = re.compile(r'( *)- +')
+
+def expand_env(value: Any) -> Any:
+    """Expand $VAR and ${VAR} references in a config value.
+    
+    Strings are expanded recursively through lists and mappings. References
+    to unset variables are left as they are.
+    
+    Args:
+        value: Parsed config value
+    
+    Returns:
+        Any: The value with every string expanded
+    """
+    if isinstance(value, str):
+        return os.path.expandvars(value) if '$' in value else value
+    if isinstance(value, dict):
+        return {key: expand_env(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [expand_env(item) for item in value]
+    return value
+
+def _env_paths(value: Any, path: EnvPath = ()) -> Iterator[EnvPath]:
+    """Yield the key paths of the strings in a value that reference variables."""
+    if isinstance(value, str):
+        if '$' in value:
+            yield path
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _env_paths(item, path + (key,))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _env_paths(item, path + (index,))
+
+def _expand_paths(value: Any, paths: List[EnvPath]) -> Any:
+    """Expand the strings at known key paths of a value.
+    
+    Only the containers along the paths are copied; everything else is
+    shared with value, which is left unchanged.
+    
+    Args:
+        value: Parsed config value
+        paths: Key paths found by _env_paths()
+    
+    Returns:
+        Any: The value with those strings expanded
+    """
+    if not paths:
+        return value
+    if paths == [()]:
+        return os.path.expandvars(value)
+    root = copy.copy(value)
+    copied = {id(root)}
+    for path in paths:
+        node = root
+        for key in path[:-1]:
+            child = node[key]
+            if id(child) not in copied:
+                child = node[key] = copy.copy(child)
+                copied.add(id(child))
+            node = child
+        node[path[-1]] = os.path.expandvars(node[path[-1]])
+    return root
+
+def _json_exact(value: Any) -> bool:
+    """Check whether a parsed YAML value survives a JSON round trip unchanged.
+    
+    YAML also has dates and non-string keys, which JSON would turn into
+    strings or refuse.
+    """
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _json_exact(item) for key, item in value.items())
+    if isinstance(value, list):
+        return all(_json_exact(item) for item in value)
+    return value is None or isinstance(value, (str, bool, int, float))
+
+def _dump(value: Any) -> str:
+    """Dump a config value as block YAML, keeping the order of its keys."""
+    return yaml.dump(value, Dumper=_Dumper, default_flow_style=False, allow_unicode=True, sort_keys=False)
+
+def _nodes(root: yaml.Node) -> Iterator[yaml.Node]:
+    """Yield each node of a composed document, again for every alias of it."""
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, yaml.SequenceNode):
+            stack.extend(node.value)
+        elif isinstance(node, yaml.MappingNode):
+            for key, value in node.value:
+                stack.extend((key, value))
+
+def _website_layout(text: str, root: yaml.Node) -> Optional[Dict[str, Any]]:
+    """Find where each website is in the text of a config.
+    
+    A website's span runs from the start of its "- " line to the start of
+    the next website's, so the comments and blank lines after it belong to
+    it. Websites can only be rewritten in place if they are a non-empty
+    block sequence that shares no anchored node with the rest of the file.
+    
+    Args:
+        text: Config file text
+        root: Composed document of text
+    
+    Returns:
+        Optional[Dict[str, Any]]: Indent of the items, end of the text
+        before the first website, start of the text after the last one and
+        the [start, end) span of each website; None if they can't be
+        rewritten in place
+    """
+    if not isinstance(root, yaml.MappingNode):
+        return None
+    websites = None
+    for key, value in root.value:
+        if isinstance(key, yaml.ScalarNode) and key.value == 'websites':
+            websites = value
+    if not isinstance(websites, yaml.SequenceNode) or websites.flow_style or not websites.value:
+        return None
+    visits = Counter(id(node) for node in _nodes(root))
+    if any(visits[id(node)] > 1 for node in _nodes(websites)):
+        return None
+    starts = []
+    indent = 0
+    for item in websites.value:
+        start = text.rfind('\n', 0, item.start_mark.index) + 1
+        prefix = _ITEM_PREFIX.fullmatch(text, start, item.start_mark.index)
+        if not prefix:
+            return None
+        indent = len(prefix.group(1))
+        starts.append(start)
+    end = websites.end_mark.index
+    line_start = text.rfind('\n', 0, end) + 1
+    if not text[line_start:end].strip():
+        end = line_start
+    return {
+        'indent': indent,
+        'head_end': starts[0],
+        'tail_start': end,
+        'spans': [[start, next_start] for start, next_start in zip(starts, starts[1:] + [end])]
+    }
+
+def _parse_config(data: bytes) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Parse a config file, and find where each website is in its text.
+    
+    Args:
+        data: Config file content
+    
+    Returns:
+        Tuple[Dict[str, Any], Optional[Dict[str, Any]]]: Parsed config, and
+        its layout from _website_layout(), None unless the file is UTF-8
+    """
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        text = ''
+    if not text or text.startswith('\ufeff'):
+        return yaml.load(data, Loader=_Loader) or {}, None
+    # The steps of yaml.load(), keeping the composed document for its marks
+    loader = _Loader(text)
+    try:
+        root = loader.get_single_node()
+        config = loader.construct_document(root) if root is not None else None
+    finally:
+        loader.dispose()
+    if not isinstance(config, dict):
+        return config or {}, None
+    return config, _website_layout(text, root)
+
+def normalize_url(url: str) -> str:
+    """Normalize a website URL: trimmed, lowercase scheme and host, no fragment.
+    
+    Args:
+        url: URL as configured
+    
+    Returns:
+        str: Normalized URL, empty if url is empty
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+class CompiledWebsite:
+    def __init__(self, website: Dict[str, Any]):
+        """Precompute what every check of a website needs.
+        
+        Args:
+            website: Website configuration, with environment variables expanded
+        """
+        content = website.get('content') or {}
+        self.website = website
+        self.name = website.get('name', 'Unknown')
+        self.url = normalize_url(website.get('url'))
+        self.domain = urlsplit(self.url).netloc
+        self.selectors = list(content.get('selectors') or [])
+        self.exclude = list(content.get('exclude') or [])
+        self.parser = content.get('parser')
+        self.max_bytes = content.get('max_bytes')
+        self.streaming = content.get('streaming')
+        self.threshold = (website.get('notification') or {}).get('threshold')
+        self._plan = None
+    
+    @property
+    def plan(self):
+        """Compiled selector plan, built on first use."""
+        if self._plan is None:
+            # Imported here, the monitor package itself depends on utils
+            from ..monitor.text_extractor import compile_plan
+            self._plan = compile_plan(self.selectors, self.exclude)
+        return self._plan
 
 class Config:
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
         """Initialize configuration manager.
         
+        The parsed file is cached as JSON in cache_dir, keyed by the file's
+        SHA-256, so an unchanged config is not parsed again.
+        ${VAR} references are expanded on load; the raw values are what
+        save_config() writes back. Website edits only rewrite the text of
+        the edited websites.
+        
         Args:
             config_path: Optional path to config file. If None, uses default.
+            cache_dir: Directory of the parsed config cache, None to disable
         """
         self.config_path = config_path or os.path.join('config', 'websites.yml')
+        self.cache_dir = cache_dir
         self.config: Dict[str, Any] = {}
+        self._expanded: Dict[str, Any] = {}
+        self._websites: List[Optional[Dict[str, Any]]] = []
+        self._compiled: List[Optional[CompiledWebsite]] = []
+        self._index: Dict[str, int] = {}
+        self._env_paths: List[List[EnvPath]] = []
+        self._exact = True
+        # File text as last read or written, and the span of each website's text in it, None once edited
+        self._text = ''
+        self._sources: Optional[List[Optional[Tuple[int, int]]]] = None
+        self._indent = 0
+        self._head_end = 0
+        self._tail_start = 0
+        self._gaps = 0
+        self._batch_depth = 0
+        self._dirty = False
         self.load_config()
     
     def load_config(self) -> None:
-        """Load configuration from YAML file."""
+        """Load configuration from YAML file, or from its cache if unchanged."""
         try:
             config_file = Path(self.config_path)
             if not config_file.exists():
                 self._create_default_config(config_file)
             
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+            self.config, env_paths, text, layout, self._exact = self._read_config(config_file)
         except Exception as e:
             raise RuntimeError(f"Failed to load configuration: {str(e)}")
+        self._compile(env_paths)
+        self._set_layout(text, layout)
+    
+    def _cache_file(self) -> Optional[Path]:
+        """Get the cache file of this config, None if caching is disabled."""
+        if not self.cache_dir:
+            return None
+        key = hashlib.sha1(str(Path(self.config_path).resolve()).encode('utf-8')).hexdigest()[:12]
+        return Path(self.cache_dir) / f"{Path(self.config_path).stem}.{key}.json"
+    
+    def _read_config(
+        self,
+        config_file: Path
+    ) -> Tuple[Dict[str, Any], List[List[EnvPath]], str, Optional[Dict[str, Any]], bool]:
+        """Get the parsed config, from the cache when the file is unchanged.
+        
+        The file is always read and hashed: a matching mtime and size alone
+        would miss an edit that keeps the size within one mtime tick. The
+        cache is used if the content hash matches, and its mtime and size
+        are refreshed if they changed.
+        
+        Args:
+            config_file: YAML file
+        
+        Returns:
+            Tuple[Dict[str, Any], List[List[EnvPath]], str, Optional[Dict[str, Any]], bool]:
+            Parsed config, the paths of each website's strings that
+            reference variables, the file text, where each website is in
+            it, and whether JSON can represent the config exactly
+        """
+        stat = config_file.stat()
+        data = config_file.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        text = data.decode('utf-8', errors='replace')
+        cache_file = self._cache_file()
+        cached = self._read_cache(cache_file) if cache_file else None
+        if cached and cached['sha256'] == digest:
+            config, env_paths, layout = cached['config'], cached['env_paths'], cached['layout']
+            exact = True
+            if cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                return config, env_paths, text, layout, exact
+        else:
+            config, layout = _parse_config(data)
+            env_paths = [list(_env_paths(website)) for website in config.get('websites') or []]
+            exact = _json_exact(config)
+        if cache_file and exact:
+            self._write_cache(cache_file, config, env_paths, stat, digest, layout)
+        return config, env_paths, text, layout, exact
+    
+    @staticmethod
+    def _read_cache(cache_file: Path) -> Optional[Dict[str, Any]]:
+        """Read a cache file, None if it is missing, stale or unreadable.
+        
+        The cache is plain JSON, never pickle: data/ is restored from the
+        CI cache, and loading it must not be able to run code.
+        """
+        # Decoding allocates many containers at once, which would trigger repeated full collections
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = json.loads(f.read())
+            if not isinstance(cached, dict) or cached.get('version') != CACHE_VERSION:
+                return None
+            if not isinstance(cached.get('config'), dict) or not isinstance(cached.get('env_paths'), list):
+                return None
+            if not isinstance(cached.get('layout'), (dict, type(None))):
+                return None
+            # JSON has no tuples
+            cached['env_paths'] = [[tuple(path) for path in paths] for paths in cached['env_paths']]
+        except Exception:
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return cached
+    
+    @staticmethod
+    def _write_cache(
+        cache_file: Path,
+        config: Dict[str, Any],
+        env_paths: List[List[EnvPath]],
+        stat: os.stat_result,
+        digest: str,
+        layout: Optional[Dict[str, Any]]
+    ) -> None:
+        """Write the parsed config, its layout and the key of the file it came from.
+        
+        Only the paths of variable references are cached, never their
+        values, so no secrets from the environment end up on disk. Callers
+        only cache configs that JSON can represent exactly (no dates or
+        non-string keys). The cache is an optimization, so failing to
+        write it is ignored.
+        """
+        try:
+            data = json.dumps(
+                {
+                    'version': CACHE_VERSION,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'sha256': digest,
+                    'config': config,
+                    'env_paths': env_paths,
+                    'layout': layout
+                },
+                ensure_ascii=False,
+                separators=(',', ':')
+            )
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_name(cache_file.name + '.tmp')
+            temp_file.write_text(data, encoding='utf-8')
+            os.replace(temp_file, cache_file)
+        except (OSError, ValueError):
+            pass
+    
+    def _compile(self, env_paths: List[List[EnvPath]]) -> None:
+        """Expand the loaded config and rebuild the website index.
+        
+        Args:
+            env_paths: Paths of each website's strings that reference variables
+        """
+        self._expanded = {key: expand_env(value) for key, value in self.config.items() if key != 'websites'}
+        raw_websites = self.config.get('websites') or []
+        self.config['websites'] = raw_websites
+        self._websites = [_expand_paths(website, paths) for website, paths in zip(raw_websites, env_paths)]
+        self._env_paths = env_paths
+        # Compiled on first use, most callers only need a few sites' plans
+        self._compiled = [None] * len(self._websites)
+        self._gaps = 0
+        self._reindex()
+    
+    def _set_layout(self, text: str, layout: Optional[Dict[str, Any]]) -> None:
+        """Remember the file text and where each website is in it."""
+        self._text = text
+        if layout is None:
+            self._sources = None
+            return
+        self._indent = layout['indent']
+        self._head_end = layout['head_end']
+        self._tail_start = layout['tail_start']
+        self._sources = [tuple(span) for span in layout['spans']]
     
     def _create_default_config(self, config_file: Path) -> None:
         """Create default configuration file if it doesn't exist."""
         default_config = {
             'websites': [],
+            'monitoring': {
+                'max_workers': 8,
+                'per_domain_limit': 2,
+                'rate_limit': {
+                    'requests_per_minute': 60,
+                    'burst': 1
+                }
+            },
+            'storage': {
+                'path': 'data/history.db',
+                'compression': 'zlib'
+            },
             'email': {
                 'service': 'gmail',
                 'credentials': {
@@ -48,60 +460,277 @@ class Config:
         
         config_file.parent.mkdir(parents=True, exist_ok=True)
         with open(config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(default_config, f, default_flow_style=False)
+            yaml.dump(default_config, f, Dumper=_Dumper, default_flow_style=False)
     
     def get_websites(self) -> list:
-        """Get list of websites to monitor."""
-        return self.config.get('websites', [])
+        """Get list of websites to monitor, with environment variables expanded."""
+        self._compact()
+        return self._websites
+    
+    def get_website(self, name: str, raw: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a website's configuration by name.
+        
+        Args:
+            name: Website name
+            raw: Return the configuration as written in the file, with
+                ${VAR} references unexpanded. Use it as the base of edits
+                passed to update_website(), so no expanded values are saved
+        
+        Returns:
+            Optional[Dict[str, Any]]: Configuration, None if not configured
+        """
+        position = self._index.get(name)
+        if position is None:
+            return None
+        return self.config['websites'][position] if raw else self._websites[position]
+    
+    def compiled(self, website: Dict[str, Any]) -> CompiledWebsite:
+        """Get the precompiled form of a website configuration.
+        
+        Websites returned by get_websites() are compiled once per load;
+        any other configuration is compiled on the spot.
+        
+        Args:
+            website: Website configuration
+        
+        Returns:
+            CompiledWebsite: Normalized URL, domain and selector plan of the website
+        """
+        position = self._index.get(website.get('name'))
+        if position is None or self._websites[position] is not website:
+            return CompiledWebsite(website)
+        compiled = self._compiled[position]
+        if compiled is None:
+            compiled = self._compiled[position] = CompiledWebsite(website)
+        return compiled
     
     def get_email_config(self) -> Dict[str, Any]:
         """Get email configuration."""
-        return self.config.get('email', {})
+        return self._expanded.get('email', {})
+    
+    def get_monitoring_config(self) -> Dict[str, Any]:
+        """Get monitoring run configuration."""
+        return self._expanded.get('monitoring', {}) or {}
+    
+    def get_storage_config(self) -> Dict[str, Any]:
+        """Get snapshot history storage configuration."""
+        return self._expanded.get('storage', {}) or {}
     
     def save_config(self) -> None:
-        """Save current configuration to file."""
+        """Save current configuration to file.
+        
+        The whole config is dumped again, so direct changes to config are
+        saved too; update_website() and remove_website() save on their own.
+        Inside batch() the save is deferred to the end of the batch.
+        """
+        self._sources = None
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._write_config()
+    
+    def _save_websites(self) -> None:
+        """Save website edits, or defer them to the end of the batch."""
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._write_config()
+    
+    def _write_config(self) -> None:
+        """Write the config file and its cache.
+        
+        The text of every website not edited since the file was read or
+        written is copied from it, comments included, and the rest of the
+        file is kept as it is; only edited and added websites are dumped.
+        Without a known layout the whole config is dumped. The file is
+        replaced atomically and the cache is updated with it, so the next
+        load doesn't parse it again.
+        """
+        self._compact()
+        websites = self.config['websites']
+        if self._sources is None or not websites:
+            self._env_paths = [list(_env_paths(website)) for website in websites]
+            self._exact = _json_exact(self.config)
+            keys = list(self.config)
+            split = keys.index('websites')
+            head = _dump({key: self.config[key] for key in keys[:split]}) if split else ''
+            head += 'websites:\n' if websites else 'websites: []\n'
+            tail = _dump({key: self.config[key] for key in keys[split + 1:]}) if keys[split + 1:] else ''
+            text = ''
+            sources = [None] * len(websites)
+            indent = 0
+        else:
+            head = self._text[:self._head_end]
+            tail = self._text[self._tail_start:]
+            text = self._text
+            sources = self._sources
+            indent = self._indent
+            # Unedited websites were checked when they were read
+            self._exact = self._exact and all(
+                _json_exact(value) for key, value in self.config.items() if key != 'websites'
+            ) and all(_json_exact(website) for website, source in zip(websites, sources) if source is None)
+        margin = ' ' * indent
+        pieces = [head]
+        spans = []
+        position = len(head)
+        for website, source in zip(websites, sources):
+            if source is None:
+                piece = ''.join(margin + line for line in _dump([website]).splitlines(True))
+            else:
+                piece = text[source[0]:source[1]]
+            if not piece.endswith('\n'):
+                piece += '\n'
+            pieces.append(piece)
+            spans.append([position, position + len(piece)])
+            position += len(piece)
+        pieces.append(tail)
+        text = ''.join(pieces)
+        layout = None
+        if websites:
+            layout = {'indent': indent, 'head_end': len(head), 'tail_start': position, 'spans': spans}
         try:
             config_file = Path(self.config_path)
             config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False)
+            data = text.encode('utf-8')
+            temp_file = config_file.with_name(config_file.name + '.tmp')
+            temp_file.write_bytes(data)
+            os.replace(temp_file, config_file)
         except Exception as e:
             raise RuntimeError(f"Failed to save configuration: {str(e)}")
-
+        self._set_layout(text, layout)
+        cache_file = self._cache_file()
+        if cache_file and self._exact:
+            self._write_cache(
+                cache_file,
+                self.config,
+                self._env_paths,
+                config_file.stat(),
+                hashlib.sha256(data).hexdigest(),
+                layout
+            )
+    
+    @contextmanager
+    def batch(self) -> Iterator['Config']:
+        """Apply several website edits as one transaction.
+        
+        The file is written once when the outermost batch ends. If the block
+        raises, every edit made in it is rolled back and nothing is written.
+        
+        Yields:
+            Config: This config
+        """
+        if self._batch_depth:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+            return
+        
+        saved = (
+            list(self.config['websites']),
+            list(self._websites),
+            list(self._compiled),
+            dict(self._index),
+            list(self._env_paths),
+            None if self._sources is None else list(self._sources),
+            self._gaps
+        )
+        self._batch_depth = 1
+        self._dirty = False
+        try:
+            yield self
+        except BaseException:
+            (
+                self.config['websites'],
+                self._websites,
+                self._compiled,
+                self._index,
+                self._env_paths,
+                self._sources,
+                self._gaps
+            ) = saved
+            self._dirty = False
+            raise
+        finally:
+            self._batch_depth = 0
+        if self._dirty:
+            self._dirty = False
+            self._write_config()
+    
     def update_website(self, name: str, config: Dict[str, Any]) -> None:
         """Update or add website configuration.
         
+        Only this website's text in the file is rewritten.
+        
         Args:
             name: Website name
             config: Website configuration
+        
+        Raises:
+            ValueError: If config renames the website to the name of another one
         """
-        websites = self.get_websites()
-        # Find existing website config
-        for i, website in enumerate(websites):
-            if website.get('name') == name:
-                websites[i] = config
-                break
-        else:
+        config = copy.deepcopy(config)
+        expanded = expand_env(config)
+        new_name = expanded.get('name', name)
+        if new_name != name and new_name in self._index:
+            raise ValueError(f"Website '{new_name}' already exists")
+        position = self._index.pop(name, None)
+        if position is None:
             # Add new website
-            websites.append(config)
-        
-        self.config['websites'] = websites
-        self.save_config()
+            position = len(self._websites)
+            self.config['websites'].append(config)
+            self._websites.append(expanded)
+            self._compiled.append(None)
+            self._env_paths.append(list(_env_paths(config)))
+            if self._sources is not None:
+                self._sources.append(None)
+        else:
+            self.config['websites'][position] = config
+            self._websites[position] = expanded
+            self._compiled[position] = None
+            self._env_paths[position] = list(_env_paths(config))
+            if self._sources is not None:
+                self._sources[position] = None
+        self._index[new_name] = position
+        self._save_websites()
     
     def remove_website(self, name: str) -> bool:
         """Remove website configuration.
         
         Args:
             name: Website name
-            
+        
         Returns:
             bool: True if website was removed, False if not found
         """
-        websites = self.get_websites()
-        for i, website in enumerate(websites):
-            if website.get('name') == name:
-                websites.pop(i)
-                self.config['websites'] = websites
-                self.save_config()
-                return True
-        return False
\ No newline at end of file
+        position = self._index.pop(name, None)
+        if position is None:
+            return False
+        # Left as a gap until the list is next read, so removals in a batch don't each shift the list
+        self.config['websites'][position] = None
+        self._websites[position] = None
+        self._compiled[position] = None
+        self._gaps += 1
+        self._save_websites()
+        return True
+    
+    def _compact(self) -> None:
+        """Close the gaps left by removed websites and reindex the rest."""
+        if not self._gaps:
+            return
+        keep = [i for i, website in enumerate(self._websites) if website is not None]
+        self.config['websites'] = [self.config['websites'][i] for i in keep]
+        self._websites = [self._websites[i] for i in keep]
+        self._compiled = [self._compiled[i] for i in keep]
+        self._env_paths = [self._env_paths[i] for i in keep]
+        if self._sources is not None:
+            self._sources = [self._sources[i] for i in keep]
+        self._gaps = 0
+        self._reindex()
+    
+    def _reindex(self) -> None:
+        """Map each website name to its position; the first one wins for duplicate names."""
+        self._index = {}
+        for position, website in enumerate(self._websites):
+            self._index.setdefault(website.get('name'), position)
@@ -1,10 +1,55 @@
+import atexit
+import json
 import logging
 import logging.handlers
 import os
+import queue
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+# Set to "json" to write the main log file as JSON lines
+LOG_FORMAT_ENV = 'WEBSITE_TRACKER_LOG_FORMAT'
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record.
+        
+        Args:
+            record: Log record
+        
+        Returns:
+            str: JSON object with time, level, logger, file, line, thread and
+            message, plus the formatted exception if there is one
+        """
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'file': record.filename,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the listener thread.
+    
+    The stock QueueHandler merges the message and its arguments on the
+    calling thread so records can be pickled. The queue here never leaves
+    the process, so the record is passed on as is. Arguments must not be
+    mutated after they were logged.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Pass the record on unformatted."""
+        return record
+
 class Logger:
     _instance: Optional['Logger'] = None
     
@@ -18,6 +63,7 @@ class Logger:
             raise RuntimeError("Logger is a singleton - use get_logger() instead")
         
         self.log_dir = log_dir
+        self.listener: Optional[logging.handlers.QueueListener] = None
         self._setup_logger()
         Logger._instance = self
     
@@ -27,7 +73,7 @@ class Logger:
         
         Args:
             log_dir: Directory to store log files
-            
+        
         Returns:
             logging.Logger: Configured logger instance
         """
@@ -36,16 +82,22 @@ class Logger:
         return logging.getLogger('website_tracker')
     
     def _setup_logger(self) -> None:
-        """Set up logging configuration."""
+        """Set up logging configuration.
+        
+        The logger itself only puts records on a queue. A listener thread
+        formats them and writes them to the files and the console, so
+        logging never waits on I/O in the monitoring threads.
+        """
         logger = logging.getLogger('website_tracker')
         logger.setLevel(logging.INFO)
         
         # Create logs directory if it doesn't exist
         log_path = Path(self.log_dir)
         log_path.mkdir(parents=True, exist_ok=True)
+        json_lines = os.environ.get(LOG_FORMAT_ENV, '').lower() == 'json'
         
         # File handler for all logs
-        log_file = log_path / f"tracker_{datetime.now().strftime('%Y%m%d')}.log"
+        log_file = log_path / f"tracker_{datetime.now().strftime('%Y%m%d')}.{'jsonl' if json_lines else 'log'}"
         file_handler = logging.handlers.RotatingFileHandler(
             log_file,
             maxBytes=10*1024*1024,  # 10MB
@@ -76,14 +128,29 @@ class Logger:
             '%(asctime)s [%(levelname)s] %(message)s'
         )
         
-        file_handler.setFormatter(detailed_formatter)
+        file_handler.setFormatter(JsonFormatter() if json_lines else detailed_formatter)
         error_handler.setFormatter(detailed_formatter)
         console_handler.setFormatter(simple_formatter)
         
-        # Add handlers to the logger
-        logger.addHandler(file_handler)
-        logger.addHandler(error_handler)
-        logger.addHandler(console_handler)
+        # Hand records to a background thread that writes them
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.listener = logging.handlers.QueueListener(
+            log_queue,
+            file_handler,
+            error_handler,
+            console_handler,
+            respect_handler_level=True
+        )
+        self.listener.start()
+        # Runs before logging's own exit hook, so queued records are written first
+        atexit.register(self.stop)
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+    
+    def stop(self) -> None:
+        """Write the queued records and stop the listener thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
     
     @staticmethod
     def log_exception(e: Exception, context: str = '') -> None:
@@ -95,6 +162,6 @@ class Logger:
         """
         logger = logging.getLogger('website_tracker')
         if context:
-            logger.error(f"{context}: {str(e)}", exc_info=True)
+            logger.error("%s: %s", context, e, exc_info=True)
         else:
-            logger.error(str(e), exc_info=True)
\ No newline at end of file
+            logger.error(str(e), exc_info=True)
@@ -0,0 +1,240 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds of the stage duration histogram buckets, in seconds
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Upper bounds of the response size histogram buckets, in bytes
+BYTE_BUCKETS = (1024, 10240, 102400, 1048576, 10485760)
+
+METRIC_PREFIX = 'website_tracker'
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+    
+    def __init__(self, bounds: Sequence[float]):
+        """Initialize an empty histogram.
+        
+        Args:
+            bounds: Sorted upper bounds of the buckets; larger values land in +Inf
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        """Add a sample."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+    
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Get (upper bound, samples at or below it) pairs, ending with +Inf."""
+        result = []
+        running = 0
+        for bound, count in zip(list(self.bounds) + ['+Inf'], self.counts):
+            running += count
+            result.append((str(bound), running))
+        return result
+
+class RunMetrics:
+    def __init__(self):
+        """Collect the timings and byte counts of one monitoring run.
+        
+        Stage durations are kept per site and per stage, and aggregated into
+        histograms when the run is written out. Safe to use from several
+        threads.
+        """
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.sites: Dict[str, Dict[str, Any]] = {}
+        self.outcomes: Counter = Counter()
+        self.connections: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, stage: str, seconds: float, site: Optional[str] = None) -> None:
+        """Record the duration of a stage.
+        
+        Args:
+            stage: Stage name, e.g. 'fetch' or 'diff'
+            seconds: Duration
+            site: Website the stage ran for, None for run-wide stages
+        """
+        with self._lock:
+            self.samples[stage].append(seconds)
+            if site is not None:
+                timings = self._site(site).setdefault('timings', {})
+                timings[stage] = timings.get(stage, 0.0) + seconds
+    
+    def record_site(self, site: str, **fields: Any) -> None:
+        """Attach values such as the outcome or byte counts to a site.
+        
+        Args:
+            site: Website name
+            **fields: Values to store; 'outcome' is also counted
+        """
+        with self._lock:
+            self._site(site).update(fields)
+            if 'outcome' in fields:
+                self.outcomes[fields['outcome']] += 1
+    
+    def _site(self, site: str) -> Dict[str, Any]:
+        """Get the record of a site. Must be called with the lock held."""
+        return self.sites.setdefault(site, {})
+    
+    def finish(self) -> None:
+        """Mark the end of the run."""
+        self.finished = time.time()
+    
+    def _stage_histograms(self) -> Dict[str, Histogram]:
+        """Aggregate the stage samples. Must be called with the lock held."""
+        histograms = {}
+        for stage, values in self.samples.items():
+            histogram = Histogram(STAGE_BUCKETS)
+            for value in values:
+                histogram.observe(value)
+            histograms[stage] = histogram
+        return histograms
+    
+    def _byte_histogram(self) -> Histogram:
+        """Aggregate the response sizes. Must be called with the lock held."""
+        histogram = Histogram(BYTE_BUCKETS)
+        for record in self.sites.values():
+            if 'bytes_read' in record:
+                histogram.observe(record['bytes_read'])
+        return histogram
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the run metrics as a JSON-serializable dict.
+        
+        Returns:
+            Dict[str, Any]: Run times, outcome counts, per-stage aggregates
+            (count, sum, p50, p90, p99, max and cumulative buckets) and the
+            per-site records
+        """
+        with self._lock:
+            stages = {}
+            for stage, histogram in self._stage_histograms().items():
+                ordered = sorted(self.samples[stage])
+                stages[stage] = {
+                    'count': histogram.count,
+                    'sum': round(histogram.total, 6),
+                    'p50': round(_percentile(ordered, 0.5), 6),
+                    'p90': round(_percentile(ordered, 0.9), 6),
+                    'p99': round(_percentile(ordered, 0.99), 6),
+                    'max': round(ordered[-1], 6),
+                    'buckets': dict(histogram.cumulative())
+                }
+            byte_histogram = self._byte_histogram()
+            finished = self.finished or time.time()
+            return {
+                'started': self.started,
+                'finished': finished,
+                'duration_seconds': round(finished - self.started, 6),
+                'outcomes': dict(self.outcomes),
+                'connections': dict(self.connections),
+                'stages': stages,
+                'bytes': {
+                    'count': byte_histogram.count,
+                    'sum': int(byte_histogram.total),
+                    'buckets': dict(byte_histogram.cumulative())
+                },
+                'sites': {
+                    site: {
+                        **record,
+                        'timings': {stage: round(value, 6) for stage, value in record.get('timings', {}).items()}
+                    }
+                    for site, record in self.sites.items()
+                }
+            }
+    
+    def to_prometheus(self) -> str:
+        """Render the aggregates in the Prometheus text exposition format.
+        
+        Per-site records are left out to keep the label cardinality low.
+        
+        Returns:
+            str: Metrics text
+        """
+        prefix = METRIC_PREFIX
+        with self._lock:
+            stage_histograms = self._stage_histograms()
+            byte_histogram = self._byte_histogram()
+            outcomes = dict(self.outcomes)
+            connections = dict(self.connections)
+        finished = self.finished or time.time()
+        
+        lines = [
+            f"# HELP {prefix}_run_duration_seconds Wall time of the last monitoring run",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {finished - self.started:.6f}",
+            f"# HELP {prefix}_run_finished_timestamp_seconds When the last monitoring run finished",
+            f"# TYPE {prefix}_run_finished_timestamp_seconds gauge",
+            f"{prefix}_run_finished_timestamp_seconds {finished:.3f}",
+            f"# HELP {prefix}_checks_total Website checks by outcome",
+            f"# TYPE {prefix}_checks_total counter"
+        ]
+        for outcome, count in sorted(outcomes.items()):
+            lines.append(f'{prefix}_checks_total{{outcome="{outcome}"}} {count}')
+        
+        if connections:
+            lines.append(f"# HELP {prefix}_http_connection_events_total HTTP requests and connection pool events")
+            lines.append(f"# TYPE {prefix}_http_connection_events_total counter")
+            for event, count in sorted(connections.items()):
+                if event not in ('pool_wait_seconds', 'reuse_ratio'):
+                    lines.append(f'{prefix}_http_connection_events_total{{event="{event}"}} {count}')
+            lines.append(f"# HELP {prefix}_http_pool_wait_seconds Time requests waited for a free pooled connection")
+            lines.append(f"# TYPE {prefix}_http_pool_wait_seconds counter")
+            lines.append(f"{prefix}_http_pool_wait_seconds {connections.get('pool_wait_seconds', 0):.6f}")
+            lines.append(f"# HELP {prefix}_http_connection_reuse_ratio Share of requests that reused a connection")
+            lines.append(f"# TYPE {prefix}_http_connection_reuse_ratio gauge")
+            lines.append(f"{prefix}_http_connection_reuse_ratio {connections.get('reuse_ratio', 0)}")
+        
+        lines.append(f"# HELP {prefix}_stage_seconds Duration of each stage of a check")
+        lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+        for stage, histogram in sorted(stage_histograms.items()):
+            for bound, count in histogram.cumulative():
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        
+        lines.append(f"# HELP {prefix}_response_bytes Bytes read per response body")
+        lines.append(f"# TYPE {prefix}_response_bytes histogram")
+        for bound, count in byte_histogram.cumulative():
+            lines.append(f'{prefix}_response_bytes_bucket{{le="{bound}"}} {count}')
+        lines.append(f"{prefix}_response_bytes_sum {int(byte_histogram.total)}")
+        lines.append(f"{prefix}_response_bytes_count {byte_histogram.count}")
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, directory: str = 'logs', stem: str = 'run_metrics') -> Tuple[Path, Path]:
+        """Write the metrics as ``<stem>.json`` and ``<stem>.prom``.
+        
+        Args:
+            directory: Output directory
+            stem: File name without extension
+        
+        Returns:
+            Tuple[Path, Path]: Paths of the JSON and Prometheus files
+        """
+        out_dir = Path(directory)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        json_path = out_dir / f"{stem}.json"
+        prom_path = out_dir / f"{stem}.prom"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        with open(prom_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path